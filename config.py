@@ -4,16 +4,20 @@
 改进版配置管理器 - 集中管理所有配置项
 """
 
+import copy
 import json
 import os
-from enum import Enum
+from enum import IntEnum
 
 
-class Commands(Enum):
-    """命令枚举，避免魔法数字"""
+class Commands(IntEnum):
+    """命令枚举，避免魔法数字（各命令的数据布局见 utils.command_table）"""
+    PASSTHROUGH = 0x00
+    SERIAL_CONFIG = 0x01
     SET_CURRENT = 0x03
     READ_SCR = 0x04
     WRITE_SCR = 0x05
+    GET_RUNTIME = 0xF2
     GET_TEMPERATURE = 0xF6
     GET_VOLTAGE = 0xF7
 
@@ -27,18 +31,62 @@ class Config:
             "default_ip": "127.0.0.1",
             "default_port": 9420,
             "socket_timeout": 3,
+            "auto_reconnect": True,
             "reconnect_attempts": 3,
-            "reconnect_delay": 1
+            "reconnect_delay": 1,
+            "reconnect_max_delay": 30,
+            "reconnect_jitter": 0.2,
+            "max_in_flight": 4,
+            "request_timeout": 3.0,
+            "min_request_timeout": 0.02,
+            "max_retries": 2,
+            "dead_after_timeouts": 3,
+            "engine": "thread"
         },
         "polling": {
             "status_interval": 1.0,
             "temperature_interval": 2.0,
-            "voltage_interval": 2.0
+            "voltage_interval": 2.0,
+            "addresses": "0xFF",
+            "max_request_rate": 50,
+            "adaptive": {
+                "enabled": False,
+                "backoff": 1.5,
+                "max_interval": 30.0,
+                "deadband": {"temperature": 1, "voltage": 0.2},
+                "thresholds": {"temperature": [], "voltage": []}
+            }
+        },
+        "telemetry": {
+            "capacity": 100000,
+            "archive_enabled": False,
+            "archive_dir": "telemetry_data",
+            "flush_interval": 1.0
+        },
+        "capture": {
+            "enabled": False,
+            "dir": "captures",
+            "replay_speed": 1.0
         },
         "ui": {
             "max_history_length": 20,
-            "log_max_lines": 1000,
-            "animation_duration": 1500
+            "log_max_lines": 10000,
+            "log_flush_interval": 0.1,
+            "animation_duration": 1500,
+            "chart_fps": 10,
+            "max_fps": 30,
+            "fleet_fps": 10
+        },
+        "logging": {
+            "file_enabled": False,
+            "file": "logs/serial_board.log",
+            "rotation": "size",
+            "max_bytes": 10485760,
+            "backup_count": 10,
+            "when": "midnight",
+            "compress": True,
+            "console": False,
+            "ui_max_rate": 2000
         },
         "protocol": {
             "frame_header": [0xAA, 0x55],
@@ -62,7 +110,7 @@ class Config:
                 return self._merge_config(self.DEFAULT_CONFIG, user_config)
             except Exception as e:
                 print(f"加载配置文件失败: {e}，使用默认配置")
-        return self.DEFAULT_CONFIG.copy()
+        return copy.deepcopy(self.DEFAULT_CONFIG)
 
     def save_config(self):
         """保存配置到文件"""
@@ -74,7 +122,7 @@ class Config:
 
     def _merge_config(self, default, user):
         """递归合并配置"""
-        result = default.copy()
+        result = copy.deepcopy(default)
         for key, value in user.items():
             if key in result and isinstance(result[key], dict) and isinstance(value, dict):
                 result[key] = self._merge_config(result[key], value)
@@ -116,10 +164,31 @@ class Config:
     def socket_timeout(self):
         return self.get('network.socket_timeout')
 
+    @property
+    def max_in_flight(self):
+        return self.get('network.max_in_flight')
+
+    @property
+    def request_timeout(self):
+        return self.get('network.request_timeout')
+
+    @property
+    def engine(self):
+        """通信引擎：thread（QThread + 阻塞socket）或 asyncio"""
+        return self.get('network.engine', 'thread')
+
     @property
     def status_interval(self):
         return self.get('polling.status_interval')
 
+    @property
+    def temperature_interval(self):
+        return self.get('polling.temperature_interval')
+
+    @property
+    def voltage_interval(self):
+        return self.get('polling.voltage_interval')
+
     @property
     def max_history_length(self):
         return self.get('ui.max_history_length')
@@ -133,5 +202,19 @@ class Config:
         return self.get('protocol.frame_footer')
 
 
-# 全局配置实例
-config = Config()
\ No newline at end of file
+# 全局配置实例，首次访问 config.config 时才创建（导入本模块不读取文件）
+_config = None
+
+
+def get_config():
+    """获取全局配置实例"""
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+def __getattr__(name):
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 核心库（无Qt依赖）
+
+协议、传输、轮询和客户端逻辑，可在没有图形界面的自动化服务器上直接使用；
+Qt界面（workers/、ui/）只是它的一个使用者。
+"""
+
+from core.bulk import BulkOperation, run_bulk
+from core.client import BoardClient, BoardError
+from core.poller import PollerListener, StatusPoller
+from core.transport import BoardTransport, TransportListener
+from utils.frame_decoder import FrameDecoder
+from utils.serial_board_client import SerialBoardClient
+from utils.telemetry_store import RingBuffer, TelemetryStore
+
+__all__ = [
+    "BoardClient",
+    "BoardError",
+    "BoardTransport",
+    "BulkOperation",
+    "FrameDecoder",
+    "PollerListener",
+    "RingBuffer",
+    "SerialBoardClient",
+    "StatusPoller",
+    "TelemetryStore",
+    "TransportListener",
+    "run_bulk",
+]
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - asyncio传输层（无Qt依赖）
+
+所有连接共享一个专用的事件循环线程，每个连接只是循环中的几个协程，
+不再为每个socket占用一个阻塞线程，也没有队列轮询带来的空闲延迟。
+事件通过 TransportListener 回调通知，回调在事件循环线程中调用。
+"""
+
+import asyncio
+import queue
+import threading
+import time
+
+from config import get_config
+from core.transport import TransportListener
+from utils.frame_decoder import FrameDecoder
+from utils.reconnect_policy import FAIL, HOLD, ReconnectBackoff, disconnect_policy
+from utils.request_pipeline import DUPLICATE, InFlightWindow, mark_sent, request_key
+from utils.rtt_estimator import AdaptiveTimeouts
+from utils.task_scheduler import TaskScheduler
+
+
+class AsyncLoopThread:
+    """进程内共享的事件循环线程"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="AsyncTransportLoop", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def instance(cls):
+        """获取（必要时启动）共享事件循环线程"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = AsyncLoopThread()
+            return cls._instance
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """在事件循环中执行协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """线程安全地在事件循环中调度回调"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+class AsyncBoardTransport:
+    """单块转发板的asyncio流水线传输，接口与 BoardTransport 相同（无需 run()）"""
+
+    def __init__(self, max_in_flight=None, request_timeout=None, loop_thread=None, listener=None):
+        config = get_config()
+        self.listener = listener or TransportListener()
+        self.loop_thread = loop_thread or AsyncLoopThread.instance()
+        self.decoder = FrameDecoder()
+        self.window = InFlightWindow(
+            max_in_flight if max_in_flight is not None else config.max_in_flight,
+            request_timeout if request_timeout is not None else config.request_timeout
+        )
+        # 按测得的往返时间自适应计算每个请求的超时，幂等读命令超时自动重发
+        self.timeouts = AdaptiveTimeouts.from_config(config, request_timeout)
+        self.ip = '127.0.0.1'
+        self.port = 9420
+        self._reader = None
+        self._writer = None
+        self._tasks = []
+        self.task_queue = TaskScheduler(self._on_coalesced)  # 交互命令优先，重复请求合并
+        self._task_event = None  # 有新任务入队时置位
+        self._window_event = None  # 窗口有空位时置位
+        self._receive_event = None  # 新请求的超时早于接收协程当前的等待截止时间时置位
+        self._receive_deadline = None  # 接收协程当前等待到的时间点，None 表示无限等待
+        self._connected = False
+
+        # 自动重连：连接意外中断后在事件循环中按指数退避重连
+        self.auto_reconnect = config.get('network.auto_reconnect', True)
+        self.socket_timeout = config.socket_timeout
+        self.backoff = ReconnectBackoff.from_config(config)
+        self.reconnecting_active = False
+        self._reconnect_task = None
+        self.capture = None  # WireCapture，记录收发的原始数据
+
+    def connect(self, ip, port):
+        """连接到服务器（阻塞直到连接成功或失败，手动连接会取消自动重连）"""
+        self.ip = ip
+        self.port = port
+        future = self.loop_thread.submit(self._manual_open())
+        try:
+            future.result(timeout=self.socket_timeout + 1)
+        except Exception as e:
+            self.listener.on_error(str(e))
+            return False
+        self.listener.on_status(True)
+        return True
+
+    def disconnect(self):
+        """断开连接（手动断开不会触发自动重连）"""
+        if not self._connected and not self.reconnecting_active:
+            return
+        was_connected = self._connected
+        self.loop_thread.submit(self._shutdown()).result()
+        if was_connected:
+            self.listener.on_status(False)
+
+    def is_connected(self):
+        """检查是否已连接"""
+        return self._connected
+
+    def add_task(self, frame, context=None):
+        """添加通信任务（线程安全，按上下文类型确定优先级与合并策略，立即唤醒发送协程）
+
+        重连期间按任务的断线策略处理：保留到重连后发送，或立即失败。
+        """
+        if self.reconnecting_active:
+            if disconnect_policy(context) == FAIL:
+                self.listener.on_failed(context, "连接中断，正在重连")
+            else:
+                self.task_queue.put((frame, context))
+            return
+        if not self._connected:
+            self.listener.on_error("未连接到服务器")
+            self.listener.on_failed(context, "未连接到服务器")
+            return
+        if self.task_queue.put((frame, context)):
+            self.loop_thread.call_soon(self._task_event.set)
+
+    def _on_coalesced(self, dropped_context, kept_context):
+        self.listener.on_coalesced(dropped_context, kept_context)
+
+    def set_max_in_flight(self, max_in_flight):
+        """调整在途请求窗口大小"""
+        self.window.max_in_flight = max(1, int(max_in_flight))
+        self.loop_thread.call_soon(self._window_event.set)
+
+    def stop(self):
+        """停止通信"""
+        self.disconnect()
+
+    async def _manual_open(self):
+        await self._cancel_reconnect()
+        await self._open()
+
+    async def _shutdown(self):
+        await self._cancel_reconnect()
+        await self._close()
+
+    async def _cancel_reconnect(self):
+        self.reconnecting_active = False
+        task, self._reconnect_task = self._reconnect_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _open(self):
+        if self._connected:
+            await self._close()
+        self.decoder.reset()
+        self.window.clear()
+        self.timeouts.reset_link()
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.ip, self.port), timeout=self.socket_timeout
+        )
+        self._task_event = asyncio.Event()
+        self._window_event = asyncio.Event()
+        self._receive_event = asyncio.Event()
+        self._receive_deadline = None
+        self._connected = True
+        self.backoff.reset()
+        if not self.task_queue.empty():
+            self._task_event.set()  # 重连后继续发送保留的任务
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._send_loop()),
+            loop.create_task(self._receive_loop()),
+        ]
+
+    async def _close(self):
+        self._connected = False
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+        self.window.clear()
+
+    async def _send_loop(self):
+        """发送协程：窗口未满时立即发送排队的请求"""
+        try:
+            while True:
+                self._task_event.clear()
+                try:
+                    frame, context = self.task_queue.get_nowait()
+                except queue.Empty:
+                    await self._task_event.wait()
+                    continue
+                while self.window.is_full():
+                    self._window_event.clear()
+                    await self._window_event.wait()
+                self._writer.write(frame)
+                mark_sent(context)
+                if self.capture is not None:
+                    self.capture.record_send((self.ip, self.port), frame, context)
+                pending = self.window.add(frame, context, self._timeout_for(frame, context))
+                if self._receive_deadline is None or pending.deadline < self._receive_deadline:
+                    self._receive_event.set()  # 接收协程按新的最早超时重新等待
+                await self._writer.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._fail(f"通信错误: {str(e)}")
+
+    async def _receive_loop(self):
+        """接收协程：解码、匹配响应，并处理在途请求超时
+
+        等待数据时同时等待 _receive_event：之后发出的请求超时更早时立即按新的截止时间重新等待。
+        未完成的读取和事件等待跨多次等待保留，不会因唤醒或超时而取消重建。
+        """
+        read = woke = None
+        try:
+            while True:
+                if read is None:
+                    read = asyncio.ensure_future(self._reader.read(4096))
+                if woke is None:
+                    self._receive_event.clear()
+                    woke = asyncio.ensure_future(self._receive_event.wait())
+                deadline = self.window.next_deadline()
+                self._receive_deadline = deadline
+                done, _ = await asyncio.wait(
+                    (read, woke),
+                    timeout=None if deadline is None else max(deadline - time.monotonic(), 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if woke in done:
+                    woke = None
+                if read not in done:
+                    # 超时，或有更早超时的新请求：处理超时后重新计算等待时间
+                    if self._expire():
+                        await self._fail("连续多个请求无响应，判定连接失效")
+                        return
+                    continue
+                chunk = read.result()
+                read = None
+
+                if not chunk:
+                    await self._fail("服务器已关闭连接")
+                    return
+                if self.capture is not None:
+                    self.capture.record_recv((self.ip, self.port), chunk)
+                now = time.monotonic()
+                for frame in self.decoder.feed(chunk):
+                    pending = self.window.match(frame, now)
+                    if pending is DUPLICATE:
+                        continue
+                    if pending is not None:
+                        self.timeouts.on_response(pending, now)
+                    self.listener.on_response(frame, pending.context if pending else None)
+                if self._expire():
+                    await self._fail("连续多个请求无响应，判定连接失效")
+                    return
+                self._window_event.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._fail(f"通信错误: {str(e)}")
+        finally:
+            # 连接关闭时一并取消，避免遗留挂起的任务
+            for future in (read, woke):
+                if future is not None:
+                    future.cancel()
+
+    def _timeout_for(self, frame, context, attempts=0):
+        """上下文中指定的超时优先，否则按测得的往返时间计算"""
+        timeout = context.get("timeout") if isinstance(context, dict) else None
+        if timeout is not None:
+            return timeout
+        return self.timeouts.timeout_for(request_key(frame), attempts)
+
+    def _expire(self):
+        """处理超时请求：幂等命令重发，其余上报超时；返回是否判定连接失效"""
+        expired = self.window.expire()
+        for i, pending in enumerate(expired):
+            if self.timeouts.should_retry(pending):
+                attempts = pending.attempts + 1
+                self._writer.write(pending.frame)
+                if self.capture is not None:
+                    self.capture.record_send((self.ip, self.port), pending.frame, pending.context)
+                self.window.add(pending.frame, pending.context,
+                                self._timeout_for(pending.frame, pending.context, attempts),
+                                attempts=attempts)
+                continue
+            self.listener.on_timeout(pending.context)
+            if self.timeouts.on_timeout():
+                # 尚未处理的超时请求放回窗口，随断线策略一起处理
+                for rest in expired[i + 1:]:
+                    self.window.add(rest.frame, rest.context, 0, attempts=rest.attempts)
+                return True
+        if expired:
+            self._window_event.set()
+        return False
+
+    async def _fail(self, message):
+        was_connected = self._connected
+        current = asyncio.current_task()
+        self._tasks = [task for task in self._tasks if task is not current]
+        in_flight = self.window.clear()
+        await self._close()
+        self.listener.on_error(message)
+        if not was_connected:
+            return
+        self.listener.on_status(False)
+        if not self.auto_reconnect:
+            for pending in in_flight:
+                self.listener.on_failed(pending.context, message)
+            return
+
+        # 在途请求中需要保留的重新排队，其余与排队中的可失败任务一起立即失败
+        for pending in in_flight:
+            if disconnect_policy(pending.context) == HOLD:
+                self.task_queue.requeue((pending.frame, pending.context))
+            else:
+                self.listener.on_failed(pending.context, message)
+        for _, context in self.task_queue.remove_if(lambda f, c: disconnect_policy(c) == FAIL):
+            self.listener.on_failed(context, message)
+
+        self.backoff.reset()
+        self.reconnecting_active = True
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        """按指数退避反复尝试重连"""
+        while not self.backoff.exhausted():
+            delay = self.backoff.next_delay()
+            attempt = self.backoff.attempt
+            self.listener.on_reconnecting(attempt, delay)
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+            except Exception as e:
+                self.listener.on_error(f"第 {attempt} 次重连失败: {str(e)}")
+                continue
+            self.reconnecting_active = False
+            self._reconnect_task = None
+            self.listener.on_status(True)
+            return
+
+        self.reconnecting_active = False
+        self._reconnect_task = None
+        for _, context in self.task_queue.clear():
+            self.listener.on_failed(context, "自动重连失败")
+        self.listener.on_error(f"自动重连失败: 已尝试 {self.backoff.attempt} 次")
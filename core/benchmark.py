@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 闭环负载测试（无Qt依赖）
+
+    python -m core.benchmark --clients 50 --duration 10
+    python -m core.benchmark --mix poll=80,set-current=10,read-scr=5,write-scr=5 --window 8
+    python -m core.benchmark --latency 0.002 --jitter 0.001 --drop-rate 0.01 --output result.json
+    python -m core.benchmark --compare baseline.json --tolerance 0.1
+
+在本进程内启动 serial_board_server.MockMCUServer（或用 --host/--port 连接已有服务端），
+N 个客户端各自通过真实的传输层（BoardTransport / AsyncBoardTransport）发送请求：
+每个客户端保持 window 个请求在途，收到响应、超时或失败后立即按请求比例发送下一个（闭环）。
+结果（吞吐量、延迟分位数、按操作分类的统计、服务端统计）以JSON输出，便于版本间自动比较。
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from config import Commands, get_config
+from core.async_transport import AsyncBoardTransport
+from core.transport import BoardTransport, TransportListener
+from utils import command_table, frame_codec
+
+# 操作名 -> 命令表项（命令字、上下文类型、请求布局）
+OPERATIONS = {
+    "temperature": command_table.lookup(Commands.GET_TEMPERATURE),
+    "voltage": command_table.lookup(Commands.GET_VOLTAGE),
+    "set-current": command_table.lookup(Commands.SET_CURRENT),
+    "read-scr": command_table.lookup(Commands.READ_SCR),
+    "write-scr": command_table.lookup(Commands.WRITE_SCR),
+}
+DEFAULT_MIX = "poll=80,set-current=10,read-scr=5,write-scr=5"
+
+
+def parse_mix(text):
+    """解析 "poll=80,set-current=10" 形式的请求比例，poll 平分为温度和电压，返回 [(操作, 权重)]"""
+    mix = {}
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        name, _, weight = part.partition('=')
+        weight = float(weight) if weight else 1.0
+        if weight < 0:
+            raise ValueError(f"权重不能为负: {part}")
+        if name == "poll":
+            for metric in ("temperature", "voltage"):
+                mix[metric] = mix.get(metric, 0.0) + weight / 2
+        elif name in OPERATIONS:
+            mix[name] = mix.get(name, 0.0) + weight
+        else:
+            raise ValueError(f"未知操作: {name}（可用: poll, {', '.join(OPERATIONS)}）")
+    mix = [(name, weight) for name, weight in mix.items() if weight > 0]
+    if not mix:
+        raise ValueError("请求比例为空")
+    return mix
+
+
+def percentiles(latencies):
+    """延迟样本（秒）的分位数和均值，单位毫秒"""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    n = len(ordered)
+
+    def pick(q):
+        return round(ordered[min(n - 1, int(q * n))] * 1000, 3)
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "p999": pick(0.999),
+            "max": round(ordered[-1] * 1000, 3), "mean": round(sum(ordered) / n * 1000, 3)}
+
+
+class LoadClient(TransportListener):
+    """一个闭环客户端：每完成一个请求就发送下一个"""
+
+    def __init__(self, bench, index):
+        self.bench = bench
+        self.rng = random.Random(bench.seed * 1000 + index if bench.seed is not None else None)
+        self.names = [name for name, _ in bench.mix]
+        self.weights = [weight for _, weight in bench.mix]
+        # 样本：(操作, 发送时间, 延迟秒数或None, 结果)
+        self.samples = []
+        transport_class = AsyncBoardTransport if bench.engine == "asyncio" else BoardTransport
+        self.transport = transport_class(bench.window, bench.request_timeout, listener=self)
+        self.thread = None
+
+    def connect(self, host, port):
+        if not self.transport.connect(host, port):
+            return False
+        if isinstance(self.transport, BoardTransport):
+            self.thread = threading.Thread(target=self.transport.run, name="LoadClient", daemon=True)
+            self.thread.start()
+        return True
+
+    def start(self):
+        for _ in range(self.bench.window):
+            self._issue()
+
+    def stop(self):
+        self.transport.stop()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+
+    def _issue(self):
+        if not self.bench.running:
+            return
+        name = self.rng.choices(self.names, self.weights)[0]
+        spec = OPERATIONS[name]
+        address = self.rng.choice(self.bench.addresses)
+        data = bytes([self.rng.randrange(256)]) if spec.request_struct.size else b""
+        context = {"type": spec.request_type, "address": address, "op": name, "coalesce": False,
+                   "sent_at": time.monotonic()}
+        self.transport.add_task(frame_codec.encode(address, spec.opcode, data), context)
+
+    def _record(self, context, outcome):
+        if not isinstance(context, dict) or "op" not in context:
+            return
+        now = time.monotonic()
+        latency = now - context["sent_at"] if outcome == "ok" else None
+        self.samples.append((context["op"], context["sent_at"], latency, outcome))
+        self._issue()
+
+    # TransportListener 回调
+    def on_response(self, frame, context):
+        self._record(context, "ok")
+
+    def on_timeout(self, context):
+        self._record(context, "timeout")
+
+    def on_failed(self, context, reason):
+        self._record(context, "failed")
+
+    def on_error(self, message):
+        self.bench.errors.append(message)
+
+
+class LoadBenchmark:
+    """启动服务端（可选）和 N 个闭环客户端，运行指定时长并汇总结果"""
+
+    def __init__(self, clients=10, window=4, duration=10.0, warmup=1.0, mix=DEFAULT_MIX,
+                 addresses=range(16), engine="thread", request_timeout=None, seed=None,
+                 host=None, port=None, faults=None):
+        self.clients = clients
+        self.window = max(1, window)
+        self.duration = duration
+        self.warmup = warmup
+        self.mix_text = mix
+        self.mix = parse_mix(mix)
+        self.addresses = list(addresses)
+        self.engine = engine
+        self.request_timeout = request_timeout
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.faults = faults  # 内置服务端的 FaultProfile
+        self.running = False
+        self.errors = []
+
+    def run(self):
+        server = None
+        host, port = self.host, self.port
+        if host is None:
+            from serial_board_server import MockMCUServer
+
+            server = MockMCUServer('127.0.0.1', 0, addresses=self.addresses, faults=self.faults,
+                                   seed=self.seed, quiet=True)
+            server.start_in_thread()
+            host, port = '127.0.0.1', server.port
+
+        clients = [LoadClient(self, i) for i in range(self.clients)]
+        try:
+            connected = [client for client in clients if client.connect(host, port)]
+            if len(connected) < len(clients):
+                raise ConnectionError(f"只有 {len(connected)}/{len(clients)} 个客户端连接成功")
+
+            self.running = True
+            started = time.monotonic()
+            for client in clients:
+                client.start()
+            measure_start = started + self.warmup
+            measure_end = measure_start + self.duration
+            time.sleep(max(0.0, measure_end - time.monotonic()))
+            self.running = False
+            # 等待在途请求完成，避免统计被截断
+            time.sleep(min(1.0, self.request_timeout or 1.0))
+        finally:
+            self.running = False
+            for client in clients:
+                client.stop()
+            server_stats = server.stats() if server is not None else None
+            if server is not None:
+                server.stop()
+
+        return self._report(clients, measure_start, measure_end, server_stats)
+
+    def _report(self, clients, measure_start, measure_end, server_stats):
+        latencies = []
+        per_op = {}
+        outcomes = {"ok": 0, "timeout": 0, "failed": 0}
+        for client in clients:
+            for op, sent_at, latency, outcome in client.samples:
+                if not measure_start <= sent_at < measure_end:
+                    continue
+                outcomes[outcome] += 1
+                entry = per_op.setdefault(op, {"count": 0, "timeouts": 0, "failed": 0, "latencies": []})
+                if outcome == "ok":
+                    entry["count"] += 1
+                    entry["latencies"].append(latency)
+                    latencies.append(latency)
+                else:
+                    entry["timeouts" if outcome == "timeout" else "failed"] += 1
+
+        config = get_config()
+        result = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "clients": self.clients,
+                "window": self.window,
+                "duration": self.duration,
+                "warmup": self.warmup,
+                "mix": self.mix_text,
+                "addresses": len(self.addresses),
+                "engine": self.engine,
+                "request_timeout": self.request_timeout or config.request_timeout,
+                "seed": self.seed,
+                "server": "external" if server_stats is None else "embedded",
+                "faults": self.faults.to_dict() if self.faults is not None else None,
+            },
+            "requests": outcomes["ok"],
+            "timeouts": outcomes["timeout"],
+            "failed": outcomes["failed"],
+            "throughput": round(outcomes["ok"] / self.duration, 1) if self.duration else 0.0,
+            "latency_ms": percentiles(latencies),
+            "operations": {
+                op: {"count": entry["count"], "timeouts": entry["timeouts"], "failed": entry["failed"],
+                     "latency_ms": percentiles(entry["latencies"])}
+                for op, entry in sorted(per_op.items())
+            },
+            "errors": self.errors[:20],
+        }
+        if server_stats is not None:
+            result["server"] = {k: server_stats[k] for k in (
+                "requests", "responses", "peak_connections", "bytes_in", "bytes_out",
+                "dropped", "corrupted", "split", "merged", "latency_ms")}
+        return result
+
+
+def _git_commit():
+    """本代码所在仓库的提交号（与运行时的工作目录无关）"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(result, baseline, tolerance=0.1):
+    """与基线结果比较，返回 (是否退化, 说明行列表)
+
+    吞吐量下降或 p99 延迟上升超过 tolerance（比例）判定为退化。
+    """
+    lines = []
+    regressed = False
+    old, new = baseline.get("throughput") or 0, result.get("throughput") or 0
+    if old:
+        change = (new - old) / old
+        lines.append(f"吞吐量: {old:.1f} -> {new:.1f} 次/秒 ({change:+.1%})")
+        regressed |= change < -tolerance
+    for key in ("p50", "p95", "p99", "p999"):
+        old = baseline.get("latency_ms", {}).get(key)
+        new = result.get("latency_ms", {}).get(key)
+        if old and new is not None:
+            change = (new - old) / old
+            lines.append(f"{key}: {old:.3f} -> {new:.3f} ms ({change:+.1%})")
+            if key == "p99":
+                regressed |= change > tolerance
+    return regressed, lines
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core.benchmark", description="闭环负载测试")
+    parser.add_argument("--clients", type=int, default=10, help="并发客户端（连接）数")
+    parser.add_argument("--window", type=int, default=4, help="每个客户端的在途请求数")
+    parser.add_argument("--duration", type=float, default=10.0, help="统计时长（秒）")
+    parser.add_argument("--warmup", type=float, default=1.0, help="预热时长（秒），不计入统计")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"请求比例（默认 {DEFAULT_MIX}）")
+    parser.add_argument("--addresses", default="0-15", help="请求的设备地址")
+    parser.add_argument("--engine", choices=("thread", "asyncio"), help="传输引擎（默认取配置 network.engine）")
+    parser.add_argument("--timeout", type=float, help="最大请求超时（秒）")
+    parser.add_argument("--seed", type=int, help="随机种子（请求序列、遥测漂移和故障注入）")
+    parser.add_argument("--host", help="连接已有服务端，不在本进程内启动")
+    parser.add_argument("--port", type=int, help="已有服务端的端口")
+    parser.add_argument("--profile", help="内置服务端的故障注入配置（JSON）")
+    parser.add_argument("--latency", type=float, help="内置服务端处理时延（秒）")
+    parser.add_argument("--jitter", type=float, help="内置服务端额外随机时延上限（秒）")
+    parser.add_argument("--drop-rate", type=float, help="丢弃应答的概率")
+    parser.add_argument("--corrupt-rate", type=float, help="校验和错误的概率")
+    parser.add_argument("--split-rate", type=float, help="响应拆成两段发送的概率")
+    parser.add_argument("--merge-rate", type=float, help="响应与后续响应合并发送的概率")
+    parser.add_argument("--output", help="把结果JSON写入文件")
+    parser.add_argument("--compare", metavar="BASELINE", help="与基线结果JSON比较，退化时返回1")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="--compare 允许的退化比例")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from core.bulk import parse_addresses
+    from serial_board_server import fault_profile
+
+    try:
+        addresses = parse_addresses(args.addresses, range(256))
+        faults = fault_profile(args) if args.host is None else None
+        bench = LoadBenchmark(
+            clients=args.clients, window=args.window, duration=args.duration, warmup=args.warmup,
+            mix=args.mix, addresses=addresses, engine=args.engine or get_config().engine,
+            request_timeout=args.timeout, seed=args.seed, host=args.host,
+            port=args.port or get_config().default_port,
+            faults=faults,
+        )
+        baseline = None
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+    except (ValueError, OSError) as e:
+        print(f"参数错误: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        result = bench.run()
+    except (ConnectionError, OSError) as e:
+        print(f"负载测试失败: {e}", file=sys.stderr)
+        return 1
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+    if baseline is not None:
+        regressed, lines = compare(result, baseline, args.tolerance)
+        for line in lines:
+            print(line, file=sys.stderr)
+        if regressed:
+            print("性能退化超过允许范围", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
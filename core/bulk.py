@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 批量操作（无Qt依赖）
+
+把 SET_CURRENT / READ_SCR / WRITE_SCR 一次下发到一组设备地址（可跨多块转发板），
+请求同时进入各板的发送队列并流水线发送，结果汇总为一份报告：
+每个设备是否成功、延迟和返回值。
+"""
+
+import itertools
+import time
+
+from config import Commands
+from core.client import BoardError
+from utils import command_table
+
+# 操作名 -> (命令, 显示名称)，数据布局和上下文类型取自命令表
+BULK_OPERATIONS = {
+    "set-current": (Commands.SET_CURRENT, "设置电流"),
+    "read-scr": (Commands.READ_SCR, "读取SCR"),
+    "write-scr": (Commands.WRITE_SCR, "写入SCR"),
+}
+
+_bulk_ids = itertools.count(1)
+
+
+def parse_addresses(text, all_addresses=range(16)):
+    """解析 "0-15"、"1,3,5"、"0x0A-0x0F"、"all" 形式的地址列表"""
+    text = text.strip().lower()
+    if text in ("", "all", "*"):
+        return list(all_addresses)
+    addresses = []
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(x, 0) for x in part.split('-', 1))
+            values = range(start, end + 1)
+        else:
+            values = [int(part, 0)]
+        for address in values:
+            if not 0 <= address <= 255:
+                raise ValueError(f"设备地址 {address} 超出范围 [0-255]")
+            if address not in addresses:
+                addresses.append(address)
+    return addresses
+
+
+class DeviceResult:
+    """单个设备的执行结果"""
+
+    __slots__ = ("endpoint", "address", "ok", "latency", "value", "error")
+
+    def __init__(self, endpoint, address, ok, latency=None, value=None, error=None):
+        self.endpoint = endpoint
+        self.address = address
+        self.ok = ok
+        self.latency = latency
+        self.value = value
+        self.error = error
+
+    def to_dict(self):
+        return {
+            "endpoint": f"{self.endpoint[0]}:{self.endpoint[1]}" if self.endpoint else None,
+            "address": self.address,
+            "ok": self.ok,
+            "latency_ms": round(self.latency * 1000, 3) if self.latency is not None else None,
+            "value": self.value,
+            "error": self.error,
+        }
+
+
+class BulkOperation:
+    """一次批量操作：生成请求并汇总结果
+
+    请求上下文中带有 "bulk" 字段指向本对象，响应/超时/失败时调用 record_* 记录结果。
+    """
+
+    def __init__(self, operation, value=None, on_complete=None):
+        if operation not in BULK_OPERATIONS:
+            raise ValueError(f"不支持的批量操作: {operation}")
+        self.id = next(_bulk_ids)
+        self.operation = operation
+        self.command, self.title = BULK_OPERATIONS[operation]
+        self.spec = command_table.lookup(self.command)
+        self.request_type = self.spec.request_type
+        self.value = value
+        self.on_complete = on_complete
+        self.results = {}  # (endpoint, address) -> DeviceResult
+        self.expected = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def build_requests(self, targets):
+        """为 (endpoint, address) 目标生成 (endpoint, frame, context) 列表"""
+        self.started_at = time.monotonic()
+        requests = []
+        values = (self.value,) if self.spec.request_struct.size else ()
+        for endpoint, address in targets:
+            context = {
+                "type": self.request_type,
+                "address": address,
+                "value": self.value,
+                "bulk": self,
+                "endpoint": endpoint,
+                "queued_at": time.monotonic(),  # 传输层在实际发送时另记 wire_sent_at
+                "coalesce": False,  # 批量请求不与其他排队请求合并，保证每个都有结果
+            }
+            requests.append((endpoint, self.spec.encode(address, *values), context))
+        self.expected = len(requests)
+        return requests
+
+    @staticmethod
+    def _latency(context):
+        """从帧实际发出到现在的时间；从未发出的请求从入队时算起"""
+        return time.monotonic() - context.get("wire_sent_at", context["queued_at"])
+
+    def record_response(self, context, frame, latency=None):
+        try:
+            value = self.spec.decode(frame)
+        except ValueError as e:
+            self.record_failure(context, str(e))
+            return
+        if latency is None:
+            latency = self._latency(context)
+        self._record(DeviceResult(context["endpoint"], context["address"], True, latency, value))
+
+    def record_failure(self, context, reason):
+        self._record(DeviceResult(context["endpoint"], context["address"], False,
+                                  self._latency(context), error=reason))
+
+    def _record(self, result):
+        key = (result.endpoint, result.address)
+        if key in self.results:
+            return
+        self.results[key] = result
+        if self.done():
+            self.finished_at = time.monotonic()
+            if self.on_complete is not None:
+                self.on_complete(self)
+
+    def done(self):
+        return len(self.results) >= self.expected
+
+    def report(self):
+        """汇总报告"""
+        results = sorted(self.results.values(), key=lambda r: (r.endpoint or ("", 0), r.address))
+        latencies = [r.latency for r in results if r.ok]
+        end = self.finished_at or time.monotonic()
+        return {
+            "operation": self.operation,
+            "value": self.value,
+            "total": self.expected,
+            "succeeded": len(latencies),
+            "failed": len(results) - len(latencies),
+            "pending": self.expected - len(results),
+            "elapsed_ms": round((end - self.started_at) * 1000, 3) if self.started_at else None,
+            "latency_ms": {
+                "min": round(min(latencies) * 1000, 3),
+                "avg": round(sum(latencies) / len(latencies) * 1000, 3),
+                "max": round(max(latencies) * 1000, 3),
+            } if latencies else None,
+            "results": [r.to_dict() for r in results],
+        }
+
+
+def run_bulk(client, operation, addresses, value=None, timeout=None):
+    """用 core.client.BoardClient 执行批量操作并等待全部完成，返回汇总报告"""
+    bulk = BulkOperation(operation, value)
+    endpoint = (client.host, client.port)
+    futures = []
+    for _, frame, context in bulk.build_requests([(endpoint, a) for a in addresses]):
+        context.pop("bulk")
+        futures.append((context, client.send_frame(frame, **context)))
+    for context, future in futures:
+        try:
+            response = future.result(timeout)
+            bulk.record_response(context, response["frame"], response["wire_rtt"])
+        except (BoardError, TimeoutError) as e:
+            bulk.record_failure(context, str(e) or "请求超时")
+    return bulk.report()
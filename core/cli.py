@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 命令行工具（无Qt依赖）
+
+    python -m core --host 127.0.0.1 read-scr 3
+    python -m core runtime 3
+    python -m core set-current 0x03 120
+    python -m core poll --interval 1 --count 10
+    python -m core --json batch commands.txt
+    python -m core bulk read-scr 0-15
+    python -m core bulk set-current all 120
+    python -m core --capture session.sbcap poll --count 100
+
+batch 文件每行一条命令（格式同命令行，# 开头为注释），所有请求先全部提交再统一等待，
+在传输层中流水线发送。
+"""
+
+import argparse
+import json
+import shlex
+import sys
+import time
+
+from config import Commands, get_config
+from core.bulk import BULK_OPERATIONS, parse_addresses, run_bulk
+from core.client import BoardClient, BoardError
+from utils.wire_capture import WireCapture
+
+DEFAULT_SCR_VALUE = 0x48
+
+# 无参数的查询命令，地址省略时为广播地址
+READ_OPERATIONS = {
+    "temp": Commands.GET_TEMPERATURE,
+    "volt": Commands.GET_VOLTAGE,
+    "runtime": Commands.GET_RUNTIME,
+}
+
+
+def _byte(text):
+    value = int(text, 0)
+    if not 0 <= value <= 255:
+        raise ValueError(f"字节值 {value} 超出范围 [0-255]")
+    return value
+
+
+def _value(response):
+    return response["value"]
+
+
+def _hex(response):
+    return response["data"].hex(' ').upper()
+
+
+def parse_operation(tokens):
+    """把一条命令解析为 (名称, 地址, 命令字, 数据, 结果解码函数)"""
+    if not tokens:
+        raise ValueError("空命令")
+    op, args = tokens[0], tokens[1:]
+    if op in READ_OPERATIONS:
+        address = _byte(args[0]) if args else 0xFF
+        return op, address, READ_OPERATIONS[op], b"", _value
+    if op == "read-scr" and len(args) == 1:
+        return op, _byte(args[0]), Commands.READ_SCR, b"", _value
+    if op == "write-scr" and len(args) in (1, 2):
+        value = _byte(args[1]) if len(args) == 2 else DEFAULT_SCR_VALUE
+        return op, _byte(args[0]), Commands.WRITE_SCR, bytes([value]), _hex
+    if op == "set-current" and len(args) == 2:
+        return op, _byte(args[0]), Commands.SET_CURRENT, bytes([_byte(args[1])]), _hex
+    if op == "send" and len(args) in (2, 3):
+        data = bytes.fromhex(args[2]) if len(args) == 3 else b""
+        return op, _byte(args[0]), _byte(args[1]), data, _hex
+    raise ValueError(f"无法解析命令: {' '.join(tokens)}")
+
+
+def _report(out, as_json, op, address, result=None, error=None):
+    if as_json:
+        record = {"op": op, "address": address, "ok": error is None}
+        if error is None:
+            record["value"] = result[0]
+            record["rtt_ms"] = round(result[1] * 1000, 3)
+        else:
+            record["error"] = error
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    elif error is None:
+        out.write(f"设备 {address:02X} {op}: {result[0]} ({result[1] * 1000:.1f} ms)\n")
+    else:
+        out.write(f"设备 {address:02X} {op}: 失败 - {error}\n")
+    out.flush()
+
+
+def run_operations(client, operations, as_json=False, out=sys.stdout, timeout=None):
+    """流水线执行多条命令，返回失败数"""
+    submitted = []
+    for op, address, command, data, decode in operations:
+        submitted.append((op, address, decode, client.send(address, command, data)))
+
+    failures = 0
+    for op, address, decode, future in submitted:
+        try:
+            response = future.result(timeout)
+            _report(out, as_json, op, address, (decode(response), response["rtt"]))
+        except (BoardError, TimeoutError) as e:
+            failures += 1
+            _report(out, as_json, op, address, error=str(e) or "请求超时")
+    return failures
+
+
+def run_poll(client, interval, count, as_json=False, out=sys.stdout):
+    """按固定间隔轮询温度和电压，count 为 0 时一直运行"""
+    failures = 0
+    n = 0
+    next_time = time.monotonic()
+    while not count or n < count:
+        failures += run_operations(client, [parse_operation(["temp"]), parse_operation(["volt"])],
+                                   as_json, out)
+        n += 1
+        next_time += interval
+        time.sleep(max(0.0, next_time - time.monotonic()))
+    return failures
+
+
+def parse_bulk(tokens):
+    """解析 bulk 参数：操作 地址列表 [数值]，返回 (操作, 地址列表, 数值)"""
+    if len(tokens) not in (2, 3) or tokens[0] not in BULK_OPERATIONS:
+        raise ValueError(f"无法解析批量命令: {' '.join(tokens)}")
+    op = tokens[0]
+    value = _byte(tokens[2]) if len(tokens) == 3 else None
+    if op == "set-current" and value is None:
+        raise ValueError("set-current 需要指定电流值")
+    if op == "write-scr" and value is None:
+        value = DEFAULT_SCR_VALUE
+    return op, parse_addresses(tokens[1]), value
+
+
+def print_bulk_report(report, as_json=False, out=sys.stdout):
+    """输出批量操作汇总报告"""
+    if as_json:
+        out.write(json.dumps(report, ensure_ascii=False) + "\n")
+        return
+    for r in report["results"]:
+        if r["ok"]:
+            out.write(f"设备 {r['address']:02X}: {r['value']} ({r['latency_ms']:.1f} ms)\n")
+        else:
+            out.write(f"设备 {r['address']:02X}: 失败 - {r['error']}\n")
+    latency = report["latency_ms"]
+    summary = f"{report['operation']}: {report['succeeded']}/{report['total']} 成功，耗时 {report['elapsed_ms']:.1f} ms"
+    if latency:
+        summary += f"，延迟 min/avg/max {latency['min']:.1f}/{latency['avg']:.1f}/{latency['max']:.1f} ms"
+    out.write(summary + "\n")
+    out.flush()
+
+
+def read_batch(path):
+    stream = sys.stdin if path in (None, "-") else open(path, encoding='utf-8')
+    try:
+        operations = []
+        for line in stream:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                operations.append(parse_operation(shlex.split(line)))
+        return operations
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core", description="串口转发板命令行客户端")
+    parser.add_argument("--host", help="转发板IP（默认取配置 network.default_ip）")
+    parser.add_argument("--port", type=int, help="转发板端口（默认取配置 network.default_port）")
+    parser.add_argument("--window", type=int, help="在途请求窗口大小")
+    parser.add_argument("--timeout", type=float, help="最大请求超时（秒）")
+    parser.add_argument("--json", action="store_true", help="以JSON行格式输出结果")
+    parser.add_argument("--interval", type=float, default=1.0, help="poll 的轮询间隔（秒）")
+    parser.add_argument("--count", type=int, default=0, help="poll 的轮询次数，0 表示一直运行")
+    parser.add_argument("--capture", metavar="FILE", help="把收发的原始数据记录到抓包文件（用 python -m core.replay 回放）")
+    parser.add_argument("op", help="temp | volt | runtime | read-scr | write-scr | set-current | send | poll | batch | bulk")
+    parser.add_argument("args", nargs="*", help="命令参数，地址和数值支持 0x 前缀")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = get_config()
+    host = args.host or config.default_ip
+    port = args.port or config.default_port
+
+    try:
+        if args.op == "batch":
+            operations = read_batch(args.args[0] if args.args else None)
+        elif args.op == "bulk":
+            bulk = parse_bulk(args.args)
+        elif args.op != "poll":
+            operations = [parse_operation([args.op] + args.args)]
+    except (ValueError, IndexError, OSError) as e:
+        print(f"参数错误: {e}", file=sys.stderr)
+        return 2
+
+    client = BoardClient(host, port, args.window, args.timeout)
+    capture = WireCapture(args.capture) if args.capture else None
+    client.transport.capture = capture
+    try:
+        client.connect()
+    except ConnectionError as e:
+        print(f"连接失败: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.op == "poll":
+            failures = run_poll(client, args.interval, args.count, args.json)
+        elif args.op == "bulk":
+            report = run_bulk(client, *bulk)
+            print_bulk_report(report, args.json)
+            failures = report["failed"]
+        else:
+            failures = run_operations(client, operations, args.json)
+    except KeyboardInterrupt:
+        failures = 0
+    finally:
+        client.close()
+        if capture is not None:
+            capture.close()
+    return 1 if failures else 0
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 同步客户端（无Qt依赖）
+
+供脚本和自动化服务器使用：每个请求返回一个 Future，可以先批量提交再统一等待结果，
+请求在传输层中流水线发送。
+
+    with BoardClient("127.0.0.1", 9420) as board:
+        print(board.read_scr(3))
+        board.set_current(3, 120)
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from config import Commands
+from core.transport import BoardTransport, TransportListener
+from utils import command_table, frame_codec
+
+
+class BoardError(Exception):
+    """请求失败（超时或连接中断）"""
+
+
+class BoardClient(TransportListener):
+    """单块转发板的阻塞式客户端，传输层在后台线程中运行"""
+
+    def __init__(self, host, port, max_in_flight=None, request_timeout=None):
+        self.host = host
+        self.port = int(port)
+        self.transport = BoardTransport(max_in_flight, request_timeout, listener=self)
+        self._thread = None
+        self.last_error = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def connect(self):
+        """建立连接并启动传输线程，失败时抛出 ConnectionError"""
+        if not self.transport.connect(self.host, self.port):
+            raise ConnectionError(self.last_error or f"无法连接 {self.host}:{self.port}")
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.transport.run, name="BoardTransport", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self.transport.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def is_connected(self):
+        return self.transport.is_connected()
+
+    # 与 ConnectionManager 相同的路由接口，便于 StatusPoller 复用
+    def connected_endpoints(self):
+        return [(self.host, self.port)] if self.is_connected() else []
+
+    def add_task(self, frame, context=None, endpoint=None):
+        self.transport.add_task(frame, context)
+
+    def send(self, address, command, data=b"", **context):
+        """发送一个命令，返回 Future，结果为解析后的响应字典（附带 rtt 秒数）
+
+        rtt 从调用时算起，包含排队时间；wire_rtt 从帧实际发出时算起。
+
+        响应字典的 value 为按命令表解码、换算后的值，未登记的命令为数据区 bytes。
+        """
+        frame = frame_codec.encode(address, command, bytes(data))
+        return self.send_frame(frame, type=command_table.request_type(command), address=address, **context)
+
+    def send_frame(self, frame, **context):
+        """发送原始帧，返回 Future"""
+        future = Future()
+        context["future"] = future
+        context["sent_at"] = time.monotonic()
+        self.transport.add_task(frame, context)
+        return future
+
+    def request(self, address, command, data=b"", timeout=None):
+        """发送命令并等待响应"""
+        return self.send(address, command, data).result(timeout)
+
+    # 常用命令
+    def command(self, command, address, *values, timeout=None):
+        """按命令表打包参数、发送并返回解码后的值"""
+        data = command_table.lookup(command).pack(*values)
+        return self.request(address, command, data, timeout)["value"]
+
+    def set_current(self, address, value):
+        return self.command(Commands.SET_CURRENT, address, value)
+
+    def read_scr(self, address):
+        return self.command(Commands.READ_SCR, address)
+
+    def write_scr(self, address, value):
+        return self.command(Commands.WRITE_SCR, address, value)
+
+    def temperature(self, address=0xFF):
+        """温度（°C）"""
+        return self.command(Commands.GET_TEMPERATURE, address)
+
+    def voltage(self, address=0xFF):
+        """电压（V）"""
+        return self.command(Commands.GET_VOLTAGE, address)
+
+    def runtime(self, address=0xFF):
+        """运行时间（秒）"""
+        return self.command(Commands.GET_RUNTIME, address)
+
+    # TransportListener 回调，在传输线程中调用
+    def on_response(self, frame, context):
+        future = context.get("future") if isinstance(context, dict) else None
+        if future is None or future.done():
+            return
+        try:
+            spec, value = command_table.decode(frame)
+        except ValueError as e:
+            future.set_exception(BoardError(str(e)))
+            return
+        result = {
+            "address": frame[2],
+            "command": frame[3],
+            "data": frame[frame_codec.PAYLOAD_OFFSET:frame_codec.PAYLOAD_OFFSET + frame[4]],
+            "value": value,
+        }
+        result["frame"] = frame
+        now = time.monotonic()
+        result["rtt"] = now - context["sent_at"]
+        result["wire_rtt"] = now - context.get("wire_sent_at", context["sent_at"])  # 不含排队时间
+        future.set_result(result)
+
+    def on_timeout(self, context):
+        self._fail(context, "请求超时")
+
+    def on_failed(self, context, reason):
+        self._fail(context, reason)
+
+    def on_error(self, message):
+        self.last_error = message
+
+    def on_coalesced(self, dropped_context, kept_context):
+        # 被合并的请求与保留的请求共享同一个结果
+        dropped = dropped_context.get("future") if isinstance(dropped_context, dict) else None
+        kept = kept_context.get("future") if isinstance(kept_context, dict) else None
+        if dropped is not None and kept is not None:
+            kept.add_done_callback(lambda f: self._copy_result(f, dropped))
+
+    @staticmethod
+    def _copy_result(source, target):
+        if target.done():
+            return
+        if source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    @staticmethod
+    def _fail(context, reason):
+        future = context.get("future") if isinstance(context, dict) else None
+        if future is not None and not future.done():
+            future.set_exception(BoardError(reason))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 帧编解码微基准（无Qt依赖）
+
+    python -m core.microbench
+    python -m core.microbench --number 200000 --json > codec.json
+
+对比 utils.frame_codec / utils.command_table（接收路径上的解码）与原先逐字节构建 bytearray、
+切片复制数据的实现（legacy_*，原样保留在本模块中作为基线），输出每种操作的 帧/秒 和
+每帧新分配的内存块数。
+
+内存块数用 sys.getallocatedblocks() 统计：把 N 个结果保存在预分配的列表里，
+前后差值除以 N，即每帧留存的对象数（调用过程中已释放的临时对象不计入）。
+"""
+
+import argparse
+import gc
+import json
+import sys
+import timeit
+
+from utils import command_table, frame_codec
+from utils.frame_decoder import FrameDecoder
+
+
+def legacy_build_frame(address, command, data):
+    """原 SerialBoardClient.build_frame"""
+    frame = bytearray([0xAA, 0x55, address, command, len(data)])
+    frame.extend(data)
+    checksum = (address + command + len(data) + sum(data)) & 0xFFFF
+    frame.append((checksum >> 8) & 0xFF)
+    frame.append(checksum & 0xFF)
+    frame.extend([0x0D, 0x0A])
+    return bytes(frame)
+
+
+def legacy_parse_response(response):
+    """原 SerialBoardClient.parse_response"""
+    if len(response) < 7:
+        raise ValueError("响应数据长度不足")
+    address = response[2]
+    command = response[3]
+    data_len = response[4]
+    data = response[5:5 + data_len] if data_len > 0 else b""
+    if response[0] != 0xAA or response[1] != 0x55:
+        raise ValueError("响应帧头错误")
+    return {"address": address, "command": command, "data": data}
+
+
+POLL_FRAME = legacy_build_frame(0x03, 0xF6, b"")
+TEMPERATURE_RESPONSE = legacy_build_frame(0x03, 0xF6, b"\x00\x2D")
+VOLTAGE_RESPONSE = legacy_build_frame(0x03, 0xF7, b"\x00\xF0")
+
+
+def _cases():
+    """(名称, 基线函数, 新实现函数)，函数无参数、返回一个结果"""
+    return [
+        ("encode 0xF6（无参数）",
+         lambda: legacy_build_frame(0x03, 0xF6, b""),
+         lambda: frame_codec.encode(0x03, 0xF6)),
+        ("encode 0x03（1字节）",
+         lambda: legacy_build_frame(0x03, 0x03, b"\x78"),
+         lambda: frame_codec.encode(0x03, 0x03, b"\x78")),
+        ("encode 0x00（16字节）",
+         lambda: legacy_build_frame(0x03, 0x00, b"0123456789abcdef"),
+         lambda: frame_codec.encode(0x03, 0x00, b"0123456789abcdef")),
+        ("decode 温度值（命令表）",
+         lambda: int.from_bytes(legacy_parse_response(TEMPERATURE_RESPONSE)["data"], 'big'),
+         lambda: command_table.decode(TEMPERATURE_RESPONSE)[1]),
+        ("decode 电压值（命令表）",
+         lambda: int.from_bytes(legacy_parse_response(VOLTAGE_RESPONSE)["data"], 'big') / 10,
+         lambda: command_table.decode(VOLTAGE_RESPONSE)[1]),
+    ]
+
+
+def frames_per_second(func, number, repeat=5):
+    """取多次测量中最快的一次"""
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return number / best
+
+
+def blocks_per_frame(func, number):
+    """每次调用留存的内存块数"""
+    results = [None] * number
+    gc.collect()
+    gc.disable()
+    try:
+        before = sys.getallocatedblocks()
+        for i in range(number):
+            results[i] = func()
+        after = sys.getallocatedblocks()
+    finally:
+        gc.enable()
+    del results
+    return (after - before) / number
+
+
+def decoder_throughput(number):
+    """FrameDecoder 在 4096 字节数据块上的解帧速率（帧/秒）"""
+    stream = TEMPERATURE_RESPONSE * 1000
+    chunks = [stream[i:i + 4096] for i in range(0, len(stream), 4096)]
+
+    def run():
+        decoder = FrameDecoder()
+        for chunk in chunks:
+            decoder.feed(chunk)
+
+    repeats = max(1, number // 1000)
+    return frames_per_second(run, repeats) * 1000
+
+
+def run(number=100000):
+    results = []
+    for name, legacy, codec in _cases():
+        baseline_fps = frames_per_second(legacy, number)
+        codec_fps = frames_per_second(codec, number)
+        results.append({
+            "case": name,
+            "legacy_fps": round(baseline_fps),
+            "codec_fps": round(codec_fps),
+            "speedup": round(codec_fps / baseline_fps, 2),
+            "legacy_blocks": round(blocks_per_frame(legacy, min(number, 50000)), 2),
+            "codec_blocks": round(blocks_per_frame(codec, min(number, 50000)), 2),
+        })
+    return {
+        "python": sys.version.split()[0],
+        "number": number,
+        "cases": results,
+        "decoder_fps": round(decoder_throughput(number)),
+    }
+
+
+def print_report(report, out=sys.stdout):
+    print(f"{'操作':<20}{'原实现 帧/秒':>14}{'新实现 帧/秒':>14}{'加速':>8}{'原 块/帧':>10}{'新 块/帧':>10}", file=out)
+    for case in report["cases"]:
+        print(f"{case['case']:<20}{case['legacy_fps']:>14,}{case['codec_fps']:>14,}"
+              f"{case['speedup']:>7.2f}x{case['legacy_blocks']:>10.2f}{case['codec_blocks']:>10.2f}", file=out)
+    print(f"FrameDecoder 解帧: {report['decoder_fps']:,} 帧/秒", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.microbench", description="帧编解码微基准")
+    parser.add_argument("--number", type=int, default=100000, help="每次测量的调用次数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出")
+    args = parser.parse_args(argv)
+
+    # 先确认新旧实现结果一致
+    for name, legacy, codec in _cases():
+        expected, actual = legacy(), codec()
+        if expected != actual:
+            print(f"结果不一致: {name}: {expected!r} != {actual!r}", file=sys.stderr)
+            return 1
+
+    report = run(args.number)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
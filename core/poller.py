@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 状态轮询（无Qt依赖）
+
+每个 (转发板, 设备地址, 指标) 按各自的周期轮询，周期取自配置
+polling.temperature_interval / polling.voltage_interval，可在运行时调整。
+开启 polling.adaptive 后，读数稳定时周期自动拉长，变化时恢复（见 utils.adaptive_polling）。
+
+polling.addresses 指定轮询的设备地址（默认只查询广播地址 0xFF，"all" 为 0-15），
+所有转发板共享 polling.max_request_rate 的请求速率预算：到期的任务按先后顺序排队，
+令牌不足时依次顺延，地址再多也不会冲垮转发板，每个地址的数据在有限时间内刷新。
+"""
+
+import threading
+import time
+from collections import deque
+
+from config import Commands, get_config
+from core.bulk import parse_addresses
+from utils import frame_codec
+from utils.adaptive_polling import AdaptivePolicy
+from utils.poll_scheduler import PollScheduler
+from utils.rate_limiter import TokenBucket
+from utils.request_pipeline import BROADCAST_ADDRESS
+
+# 轮询指标：名称（同时作为请求上下文 "type"） -> 命令字
+POLL_METRICS = {
+    "temperature": Commands.GET_TEMPERATURE,
+    "voltage": Commands.GET_VOLTAGE,
+}
+
+# 没有任务到期时也至少每隔这么久检查一次已连接的转发板
+ENDPOINT_REFRESH_INTERVAL = 1.0
+
+
+class PollerListener:
+    """轮询事件回调，默认实现忽略所有事件"""
+
+    def on_status(self, status):
+        """状态更新（如运行时间）"""
+
+    def on_error(self, message):
+        """状态查询错误"""
+
+
+class StatusPoller:
+    """定期向所有已连接的转发板发送温度/电压查询
+
+    connections 需提供 connected_endpoints() 和 add_task(frame, context, endpoint)，
+    如 workers.connection_manager.ConnectionManager 或 core.client.BoardClient。
+    """
+
+    def __init__(self, connections, listener=None, interval=None, intervals=None, adaptive=None,
+                 addresses=None, max_request_rate=None):
+        config = get_config()
+        self.connections = connections
+        self.listener = listener or PollerListener()
+        self.interval = interval if interval is not None else config.status_interval  # 运行时间上报间隔
+        self.intervals = {
+            "temperature": config.temperature_interval,
+            "voltage": config.voltage_interval,
+        }
+        if intervals:
+            self.intervals.update(intervals)
+        if addresses is None:
+            addresses = parse_addresses(str(config.get('polling.addresses', BROADCAST_ADDRESS)))
+        self.addresses = list(addresses)
+        if max_request_rate is None:
+            max_request_rate = config.get('polling.max_request_rate', 0)
+        self.bucket = TokenBucket(max_request_rate)  # 所有转发板共享的请求速率预算
+        self._backlog = deque()  # 已到期、等待令牌的任务键，先到先发
+        self._backlog_keys = set()
+        self.readings = {}  # (端点, 地址, 指标) -> (读数, 时间)
+        self.adaptive = adaptive if adaptive is not None else AdaptivePolicy.from_config(config)
+        self._adaptive = {}  # 任务键 -> AdaptiveInterval
+        self.scheduler = PollScheduler()
+        self.is_running = False
+        self.start_time = None
+        self._lock = threading.Lock()  # 保护 scheduler 和 intervals，set_interval 可能在其他线程调用
+        self._wake = threading.Event()
+
+    def set_interval(self, metric, interval):
+        """运行时修改某个指标的轮询周期（秒）"""
+        if metric not in POLL_METRICS:
+            raise ValueError(f"未知的轮询指标: {metric}")
+        if interval <= 0:
+            raise ValueError("轮询周期必须大于0")
+        with self._lock:
+            self.intervals[metric] = interval
+            for key in self.scheduler.keys():
+                if key[2] == metric:
+                    if key in self._adaptive:
+                        self._adaptive[key].reset(interval)
+                    self.scheduler.set_interval(key, interval)
+        self._wake.set()
+
+    def set_addresses(self, addresses):
+        """运行时修改轮询的设备地址列表"""
+        with self._lock:
+            self.addresses = list(addresses)
+        self._wake.set()
+
+    def set_max_request_rate(self, rate):
+        """运行时修改请求速率预算（请求/秒，0 为不限速）"""
+        with self._lock:
+            self.bucket.set_rate(rate)
+        self._wake.set()
+
+    def latest(self, endpoint, address, metric):
+        """某个设备某项指标的最新读数，返回 (读数, time.monotonic() 时间) 或 None"""
+        return self.readings.get((endpoint, address, metric))
+
+    def record_reading(self, endpoint, address, metric, value):
+        """记录一次轮询读数（由响应处理方调用，线程安全），自适应模式下据此调整周期"""
+        key = (endpoint, address, metric)
+        self.readings[key] = (value, time.monotonic())
+        if not self.adaptive.enabled:
+            return
+        with self._lock:
+            if key not in self.scheduler:
+                return
+            adaptive = self._adaptive.get(key)
+            if adaptive is None:
+                adaptive = self._adaptive[key] = self.adaptive.create(metric, self.intervals[metric])
+            interval = adaptive.update(value)
+            self.scheduler.set_interval(key, interval)
+
+    def poll_rate(self):
+        """当前有效轮询速率与固定周期下的速率（请求/秒）
+
+        max_age 为在速率预算下每个任务最长多久刷新一次（秒）。
+        """
+        with self._lock:
+            effective = baseline = 0.0
+            longest = 0.0
+            for key in self.scheduler.keys():
+                interval = self.scheduler.job(key).interval
+                effective += 1.0 / interval
+                baseline += 1.0 / self.intervals[key[2]]
+                longest = max(longest, interval)
+            budget = self.bucket.rate
+            jobs = len(self.scheduler)
+        if budget:
+            effective = min(effective, budget)
+            longest = max(longest, jobs / budget)
+        return {
+            "effective": effective,
+            "baseline": baseline,
+            "saved": 1.0 - effective / baseline if baseline else 0.0,
+            "budget": budget,
+            "max_age": longest,
+        }
+
+    def run(self):
+        """轮询主循环，阻塞直到 stop()"""
+        self.is_running = True
+        self._wake.clear()
+        self.start_time = time.time()
+        next_status = time.monotonic()
+
+        while self.is_running:
+            now = time.monotonic()
+            endpoints = self.connections.connected_endpoints()
+            with self._lock:
+                self._sync_jobs(endpoints, now)
+                for job in self.scheduler.pop_due(now):
+                    # 上一轮还没发出的任务不重复排队
+                    if job.key not in self._backlog_keys:
+                        self._backlog_keys.add(job.key)
+                        self._backlog.append(job.key)
+                next_deadline = self.scheduler.next_deadline()
+                due = self._take_backlog(now)
+                backlog_delay = self.bucket.delay(now) if self._backlog else None
+
+            if endpoints:
+                try:
+                    for key in due:
+                        self._poll(*key)
+
+                    if now >= next_status:
+                        rate = self.poll_rate()
+                        self.listener.on_status({
+                            "runtime": self._runtime(),
+                            "poll_rate": rate["effective"],
+                            "poll_rate_saved": rate["saved"],
+                        })
+                except Exception as e:
+                    self.listener.on_error(f"状态查询错误: {str(e)}")
+            if now >= next_status:
+                next_status += self.interval * (int((now - next_status) / self.interval) + 1)
+
+            # 睡到下一个任务到期，set_interval() 和 stop() 可立即唤醒
+            wake_at = min(next_status, now + ENDPOINT_REFRESH_INTERVAL)
+            if next_deadline is not None:
+                wake_at = min(wake_at, next_deadline)
+            if backlog_delay is not None:
+                wake_at = min(wake_at, now + backlog_delay)
+            self._wake.wait(max(0.0, wake_at - time.monotonic()))
+            self._wake.clear()
+
+    def stop(self):
+        """停止轮询"""
+        self.is_running = False
+        self._wake.set()
+
+    def _take_backlog(self, now):
+        """按令牌桶取出本轮可以发送的任务"""
+        due = []
+        while self._backlog and self.bucket.try_acquire(now):
+            key = self._backlog.popleft()
+            self._backlog_keys.discard(key)
+            if key in self.scheduler:  # 排队期间可能已被移除
+                due.append(key)
+        return due
+
+    def _sync_jobs(self, endpoints, now):
+        """为新连接的转发板和新地址添加轮询任务，移除已断开转发板或已取消地址的任务"""
+        connected = set(endpoints)
+        addresses = set(self.addresses)
+        for key in self.scheduler.keys():
+            if key[0] not in connected or key[1] not in addresses:
+                self.scheduler.remove(key)
+                self._adaptive.pop(key, None)
+        for endpoint in endpoints:
+            for address in self.addresses:
+                for metric in POLL_METRICS:
+                    key = (endpoint, address, metric)
+                    if key not in self.scheduler:
+                        self.scheduler.add(key, self.intervals[metric], now=now)
+
+    def _poll(self, endpoint, address, metric):
+        frame = frame_codec.encode(address, POLL_METRICS[metric])  # 无参数帧由编解码器缓存
+        self.connections.add_task(frame, {"type": metric, "address": address}, endpoint)
+
+    def _runtime(self):
+        elapsed = int(time.time() - self.start_time)
+        hours = elapsed // 3600
+        minutes = (elapsed % 3600) // 60
+        seconds = elapsed % 60
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 抓包回放（无Qt依赖）
+
+    python -m core.replay session.sbcap                 # 按原始时间回放并统计
+    python -m core.replay session.sbcap --speed 10      # 10倍速
+    python -m core.replay session.sbcap --speed 0       # 尽可能快
+    python -m core.replay session.sbcap --serve 9420    # 作为模拟服务端返回抓包中的响应
+
+回放时收到的原始数据块按原样送入 FrameDecoder，发送记录登记到 InFlightWindow，
+与实时通信走相同的拆包和响应匹配逻辑。
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+from utils.frame_decoder import FrameDecoder
+from utils.request_pipeline import InFlightWindow, request_key
+from utils.wire_capture import KIND_RECV, KIND_SEND, read_capture
+
+# 回放时不让在途请求过期，抓包中没有响应的请求保留在窗口里
+_NO_EXPIRY = 1e9
+
+
+class ReplayListener:
+    """回放回调接口，参数与 ConnectionManager.response_received 相同，另加往返时间"""
+
+    def on_response(self, endpoint, frame, context, rtt):
+        pass
+
+
+class CaptureReplay:
+    """按抓包时间轴回放
+
+    speed 为回放倍速，1 为实时，0 表示不等待尽快回放。
+    """
+
+    def __init__(self, filename, speed=1.0, listener=None):
+        self.filename = filename
+        self.speed = speed
+        self.listener = listener or ReplayListener()
+        self._stop = threading.Event()
+        self.stats = {}
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """回放整个文件（或直到 stop），返回统计信息"""
+        started_at, records = read_capture(self.filename)
+        decoders = {}
+        windows = {}
+        rtts = []
+        stats = self.stats = {
+            "file": self.filename,
+            "started_at": started_at,
+            "speed": self.speed,
+            "sent": 0,
+            "received_bytes": 0,
+            "frames": 0,
+            "matched": 0,
+            "unsolicited": 0,
+            "checksum_errors": 0,
+            "capture_duration": 0.0,
+        }
+        first = None
+        wall_start = time.monotonic()
+
+        for record in records:
+            if self._stop.is_set():
+                break
+            if first is None:
+                first = record.timestamp
+            offset = record.timestamp - first
+            stats["capture_duration"] = offset
+            if self.speed:
+                delay = wall_start + offset / self.speed - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+
+            endpoint = record.endpoint
+            window = windows.get(endpoint)
+            if window is None:
+                window = windows[endpoint] = InFlightWindow(1 << 30, _NO_EXPIRY)
+                decoders[endpoint] = FrameDecoder()
+
+            if record.kind == KIND_SEND:
+                stats["sent"] += 1
+                window.add(record.data, record.context, now=record.timestamp)
+            elif record.kind == KIND_RECV:
+                stats["received_bytes"] += len(record.data)
+                for frame in decoders[endpoint].feed(record.data):
+                    stats["frames"] += 1
+                    pending = window.match(frame)
+                    rtt = None
+                    if pending is not None:
+                        stats["matched"] += 1
+                        rtt = record.timestamp - pending.sent_at
+                        rtts.append(rtt)
+                    else:
+                        stats["unsolicited"] += 1
+                    self.listener.on_response(endpoint, frame, pending.context if pending else None, rtt)
+
+        stats["checksum_errors"] = sum(d.checksum_errors for d in decoders.values())
+        stats["unanswered"] = sum(len(w) for w in windows.values())
+        stats["elapsed"] = time.monotonic() - wall_start
+        stats["rtt_ms"] = _rtt_summary(rtts)
+        return stats
+
+
+def _rtt_summary(rtts):
+    if not rtts:
+        return {}
+    rtts = sorted(rtts)
+
+    def pick(q):
+        return round(rtts[min(len(rtts) - 1, int(q * len(rtts)))] * 1000, 3)
+
+    return {"min": pick(0), "p50": pick(0.5), "p95": pick(0.95), "max": pick(1.0)}
+
+
+def load_responses(filename):
+    """从抓包中提取每种请求 (地址, 命令) 的响应序列：{key: deque[(响应帧, 往返时间)]}"""
+    collector = _ResponseCollector()
+    CaptureReplay(filename, speed=0, listener=collector).run()
+    return collector.responses
+
+
+class _ResponseCollector(ReplayListener):
+    def __init__(self):
+        self.responses = {}
+
+    def on_response(self, endpoint, frame, context, rtt):
+        key = request_key(frame)
+        if key is not None and rtt is not None:
+            self.responses.setdefault(key, deque()).append((frame, rtt))
+
+
+def create_replay_server(filename, host='0.0.0.0', port=9420, speed=1.0):
+    """创建按抓包内容应答的模拟服务端
+
+    每种请求按抓包中的顺序依次返回记录的响应，并按记录的往返时间（除以倍速）延迟；
+    用完或抓包中没有的请求由 MockMCUServer 的默认逻辑应答。
+    """
+    from serial_board_server import MockMCUServer
+
+    responses = load_responses(filename)
+
+    class ReplayServer(MockMCUServer):
+        def handle_request(self, data, board=None):
+            recorded = responses.get(request_key(data))
+            if not recorded:
+                return super().handle_request(data, board)
+            frame, rtt = recorded.popleft()
+            return frame, rtt / speed if speed else 0.0
+
+    return ReplayServer(host, port)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core.replay", description="回放通信抓包文件")
+    parser.add_argument("file", help="抓包文件（python -m core --capture 或配置 capture.enabled 生成）")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速，1 为实时，0 为尽可能快")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="作为模拟服务端在 PORT 上返回抓包中的响应")
+    parser.add_argument("--host", default="0.0.0.0", help="--serve 时的监听地址")
+    parser.add_argument("--frames", action="store_true", help="逐帧输出解码结果（JSON行）")
+    return parser
+
+
+class _FramePrinter(ReplayListener):
+    def __init__(self, out):
+        self.out = out
+
+    def on_response(self, endpoint, frame, context, rtt):
+        print(json.dumps({
+            "endpoint": f"{endpoint[0]}:{endpoint[1]}" if endpoint else None,
+            "frame": frame.hex(' ').upper(),
+            "context": context,
+            "rtt_ms": round(rtt * 1000, 3) if rtt is not None else None,
+        }, ensure_ascii=False), file=self.out)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.serve is not None:
+            server = create_replay_server(args.file, args.host, args.serve, args.speed)
+            try:
+                server.start()
+            except KeyboardInterrupt:
+                server.stop()
+            return 0
+        replay = CaptureReplay(args.file, args.speed, _FramePrinter(sys.stdout) if args.frames else None)
+        try:
+            stats = replay.run()
+        except KeyboardInterrupt:
+            replay.stop()
+            stats = replay.stats
+    except (OSError, ValueError) as e:
+        print(f"回放失败: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 阻塞socket传输层（无Qt依赖）
+
+在调用方提供的线程中运行 run() 主循环；所有事件通过 TransportListener 回调通知。
+"""
+
+import socket
+import queue
+import select
+import threading
+import time
+
+from config import get_config
+from utils.frame_decoder import FrameDecoder
+from utils.reconnect_policy import FAIL, HOLD, ReconnectBackoff, disconnect_policy
+from utils.request_pipeline import DUPLICATE, InFlightWindow, mark_sent, request_key
+from utils.rtt_estimator import AdaptiveTimeouts
+from utils.task_scheduler import TaskScheduler
+
+
+class TransportListener:
+    """传输层事件回调，默认实现忽略所有事件
+
+    回调在传输层的工作线程（或事件循环线程）中调用。
+    """
+
+    def on_response(self, frame, context):
+        """收到响应帧；未匹配到请求的帧 context 为 None"""
+
+    def on_timeout(self, context):
+        """单个请求超时"""
+
+    def on_failed(self, context, reason):
+        """请求因断线失败"""
+
+    def on_reconnecting(self, attempt, delay):
+        """第 attempt 次自动重连将在 delay 秒后进行"""
+
+    def on_error(self, message):
+        """连接错误"""
+
+    def on_status(self, connected):
+        """连接状态改变"""
+
+    def on_coalesced(self, dropped_context, kept_context):
+        """排队中的请求被合并：dropped_context 不会单独发送，其结果即 kept_context 的结果"""
+
+
+class BoardTransport:
+    """单块转发板的流水线传输：优先级队列、在途窗口、自适应超时和自动重连"""
+
+    def __init__(self, max_in_flight=None, request_timeout=None, listener=None):
+        config = get_config()
+        self.listener = listener or TransportListener()
+        self.sock = None
+        self.is_running = False
+        self.mutex = threading.Lock()
+        self.task_queue = TaskScheduler(self._on_coalesced)  # 交互命令优先，重复请求合并
+        self.decoder = FrameDecoder()  # 持久接收缓冲区，处理TCP拆包/粘包
+        # 在途请求窗口，max_in_flight=1 时退化为一问一答模式
+        self.window = InFlightWindow(
+            max_in_flight if max_in_flight is not None else config.max_in_flight,
+            request_timeout if request_timeout is not None else config.request_timeout
+        )
+        # 按测得的往返时间自适应计算每个请求的超时，幂等读命令超时自动重发
+        self.timeouts = AdaptiveTimeouts.from_config(config, request_timeout)
+        self.ip = '127.0.0.1'
+        self.port = 9420
+
+        # 自动重连：连接意外中断后在工作线程中按指数退避重连
+        self.auto_reconnect = config.get('network.auto_reconnect', True)
+        self.socket_timeout = config.socket_timeout
+        self.backoff = ReconnectBackoff.from_config(config)
+        self.reconnecting_active = False
+        self._wake = threading.Event()  # 打断重连等待（手动连接/断开/停止）
+        self.capture = None  # WireCapture，记录收发的原始数据
+
+    def connect(self, ip, port):
+        """连接到服务器（手动连接会取消正在进行的自动重连）"""
+        self.reconnecting_active = False
+        self._wake.set()
+        try:
+            self._open(ip, port)
+        except Exception as e:
+            self.listener.on_error(str(e))
+            return False
+        self.backoff.reset()
+        self.listener.on_status(True)
+        return True
+
+    def _open(self, ip, port):
+        """建立socket连接，失败时抛出异常"""
+        self.mutex.acquire()
+        try:
+            if self.sock:
+                self.sock.close()
+                self.sock = None
+
+            self.ip = ip
+            self.port = port
+            self.decoder.reset()
+            self.window.clear()
+            self.timeouts.reset_link()
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(self.socket_timeout)
+            sock.connect((self.ip, self.port))
+            self.sock = sock
+        finally:
+            self.mutex.release()
+
+    def disconnect(self):
+        """断开连接（手动断开不会触发自动重连）"""
+        self.reconnecting_active = False
+        self._wake.set()
+        self.mutex.acquire()  # 互斥锁
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+            self.window.clear()
+            self.listener.on_status(False)
+        self.mutex.release()
+
+    def is_connected(self):
+        """检查是否已连接"""
+        self.mutex.acquire()
+        result = self.sock is not None
+        self.mutex.release()
+        return result
+
+    def add_task(self, frame, context=None):
+        """添加通信任务到队列（按上下文类型确定优先级与合并策略）
+
+        重连期间按任务的断线策略处理：保留到重连后发送，或立即失败。
+        """
+        if self.reconnecting_active and disconnect_policy(context) == FAIL:
+            self.listener.on_failed(context, "连接中断，正在重连")
+            return
+        self.task_queue.put((frame, context))
+
+    def _on_coalesced(self, dropped_context, kept_context):
+        self.listener.on_coalesced(dropped_context, kept_context)
+
+    def set_max_in_flight(self, max_in_flight):
+        """调整在途请求窗口大小"""
+        self.window.max_in_flight = max(1, int(max_in_flight))
+
+    def run(self):
+        """工作线程主循环
+
+        窗口未满时持续从队列取任务发送，不等待前一个请求的响应；
+        收到的响应按 (地址, 命令) 与到达顺序匹配回请求上下文。
+        """
+        self.is_running = True
+        while self.is_running:
+            try:
+                if self.reconnecting_active:
+                    self._reconnect_step()
+                    continue
+
+                # 窗口为空时阻塞等待新任务，否则只取已排队的任务
+                while not self.window.is_full():
+                    try:
+                        if len(self.window):
+                            frame, context = self.task_queue.get_nowait()
+                        else:
+                            frame, context = self.task_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        break
+                    if not self._send(frame, context):
+                        break
+
+                if len(self.window):
+                    self._receive()
+                    self._handle_expired()
+            except Exception as e:
+                # 捕获循环中可能的其他异常
+                self.listener.on_error(f"工作线程错误: {str(e)}")
+
+    def _send(self, frame, context):
+        """发送一个请求并登记到在途窗口"""
+        self.mutex.acquire()
+        sock = self.sock
+        if not sock:
+            self.mutex.release()
+            if self.reconnecting_active and disconnect_policy(context) == HOLD:
+                self.task_queue.requeue((frame, context))
+            else:
+                self.listener.on_error("未连接到服务器")
+                self.listener.on_failed(context, "未连接到服务器")
+            return False
+
+        try:
+            sock.sendall(frame)
+            mark_sent(context)
+            if self.capture is not None:
+                self.capture.record_send((self.ip, self.port), frame, context)
+            self.window.add(frame, context, self._timeout_for(frame, context))
+            self.mutex.release()
+            return True
+        except socket.timeout:
+            self.window.add(frame, context)  # 与在途请求一起按断线策略处理
+            self.mutex.release()
+            self._link_lost(sock, "服务器响应超时")
+        except Exception as e:
+            self.window.add(frame, context)
+            self.mutex.release()
+            self._link_lost(sock, f"通信错误: {str(e)}")
+        return False
+
+    def _receive(self):
+        """等待响应数据（最多到最近一个请求的超时时间），匹配并分发所有完整帧
+
+        select/recv 不持有 mutex，界面线程的 is_connected()、disconnect() 等不会被阻塞；
+        只在解码和操作在途窗口时加锁。
+        """
+        deadline = self.window.next_deadline()
+        wait = 0.05 if deadline is None else min(max(deadline - time.monotonic(), 0), 0.05)
+
+        self.mutex.acquire()
+        sock = self.sock
+        self.mutex.release()
+        if not sock:
+            return
+
+        try:
+            readable, _, _ = select.select([sock], [], [], wait)
+            if not readable:
+                return
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("服务器已关闭连接")
+        except Exception as e:
+            self._link_lost(sock, f"通信错误: {str(e)}")
+            return
+
+        self.mutex.acquire()
+        if self.sock is not sock:
+            # 等待期间已被断开或重新连接，丢弃旧连接的数据
+            self.mutex.release()
+            return
+        if self.capture is not None:
+            self.capture.record_recv((self.ip, self.port), chunk)
+        frames = self.decoder.feed(chunk)
+        now = time.monotonic()
+        matched = []
+        for frame in frames:
+            pending = self.window.match(frame, now)
+            if pending is DUPLICATE:
+                continue
+            if pending is not None:
+                self.timeouts.on_response(pending, now)
+            matched.append((frame, pending))
+        self.mutex.release()
+
+        for frame, pending in matched:
+            # 未匹配的帧按无上下文响应处理
+            self.listener.on_response(frame, pending.context if pending else None)
+
+    def _timeout_for(self, frame, context, attempts=0):
+        """上下文中指定的超时优先，否则按测得的往返时间计算"""
+        timeout = context.get("timeout") if isinstance(context, dict) else None
+        if timeout is not None:
+            return timeout
+        return self.timeouts.timeout_for(request_key(frame), attempts)
+
+    def _handle_expired(self):
+        """处理超时请求：幂等命令重发，其余上报超时；连续超时判定连接失效"""
+        expired = self.window.expire()
+        for i, pending in enumerate(expired):
+            if self.timeouts.should_retry(pending) and self._retransmit(pending):
+                continue
+            self.listener.on_timeout(pending.context)
+            if self.timeouts.on_timeout():
+                # 尚未处理的超时请求放回窗口，随断线策略一起处理
+                for rest in expired[i + 1:]:
+                    self.window.add(rest.frame, rest.context, 0, attempts=rest.attempts)
+                self.mutex.acquire()
+                sock = self.sock
+                self.mutex.release()
+                self._link_lost(sock, "连续多个请求无响应，判定连接失效")
+                return
+
+    def _retransmit(self, pending):
+        """重发超时的幂等请求"""
+        attempts = pending.attempts + 1
+        self.mutex.acquire()
+        sock = self.sock
+        try:
+            if not sock:
+                return False
+            sock.sendall(pending.frame)
+            if self.capture is not None:
+                self.capture.record_send((self.ip, self.port), pending.frame, pending.context)
+            self.window.add(pending.frame, pending.context,
+                            self._timeout_for(pending.frame, pending.context, attempts),
+                            attempts=attempts)
+            return True
+        except Exception:
+            return False
+        finally:
+            self.mutex.release()
+
+    def _link_lost(self, sock, reason):
+        """连接意外中断：关闭socket，按断线策略处理任务并启动自动重连"""
+        self.mutex.acquire()
+        if sock is None or self.sock is not sock:
+            # 已被手动断开或重新连接
+            self.mutex.release()
+            return
+        sock.close()
+        self.sock = None
+        in_flight = self.window.clear()
+        self.decoder.reset()
+        self.mutex.release()
+
+        self.listener.on_error(reason)
+        self.listener.on_status(False)
+        if not self.auto_reconnect:
+            for pending in in_flight:
+                self.listener.on_failed(pending.context, reason)
+            return
+
+        # 在途请求中需要保留的重新排队，其余与排队中的可失败任务一起立即失败
+        for pending in in_flight:
+            if disconnect_policy(pending.context) == HOLD:
+                self.task_queue.requeue((pending.frame, pending.context))
+            else:
+                self.listener.on_failed(pending.context, reason)
+        for _, context in self.task_queue.remove_if(lambda f, c: disconnect_policy(c) == FAIL):
+            self.listener.on_failed(context, reason)
+
+        self.backoff.reset()
+        self._wake.clear()
+        self.reconnecting_active = True
+
+    def _reconnect_step(self):
+        """执行一次退避等待和重连尝试"""
+        if self.backoff.exhausted():
+            self.reconnecting_active = False
+            for _, context in self.task_queue.clear():
+                self.listener.on_failed(context, "自动重连失败")
+            self.listener.on_error(f"自动重连失败: 已尝试 {self.backoff.attempt} 次")
+            return
+
+        delay = self.backoff.next_delay()
+        attempt = self.backoff.attempt
+        self.listener.on_reconnecting(attempt, delay)
+        if self._wake.wait(delay) or not self.reconnecting_active:
+            return  # 被手动连接/断开/停止打断
+
+        try:
+            self._open(self.ip, self.port)
+        except Exception as e:
+            self.listener.on_error(f"第 {attempt} 次重连失败: {str(e)}")
+            return
+
+        self.reconnecting_active = False
+        self.backoff.reset()
+        self.listener.on_status(True)
+
+    def stop(self):
+        """停止主循环并断开连接"""
+        self.is_running = False
+        self.disconnect()
@@ -2,45 +2,44 @@
 # -*- coding: utf-8 -*-
 """
 改进版日志系统 - 使用标准logging模块
+
+调用方线程只做两件事：把记录放入队列（QueueHandler），把格式化后的一行放入界面缓冲区。
+- 文件和控制台输出由 QueueListener 后台线程完成，文件按大小或时间轮转，旧文件gzip压缩
+- 界面处理器单独限速，超出速率的行只写文件不上屏，并提示省略了多少行；界面定时器是唯一的
+  一层批处理，每次把积累的行一次性交给日志控件
+- 文件日志默认关闭（logging.file_enabled），开启后写入 logging.file
+- 导出日志时按顺序流式复制磁盘上的（压缩）文件，不在内存中拼接整个日志
 """
 
+import glob
+import gzip
 import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
 import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from PyQt5.QtCore import QObject, pyqtSignal
-from PyQt5.QtWidgets import QTextEdit
-
 
-class QTextEditHandler(logging.Handler):
-    """自定义日志处理器，输出到QTextEdit"""
+from PyQt5.QtCore import QObject, QTimer
 
-    def __init__(self, text_widget):
-        super().__init__()
-        self.text_widget = text_widget
-
-    def emit(self, record):
-        """发送日志记录到UI"""
-        try:
-            msg = self.format(record)
-            # 确保在主线程中更新UI
-            self.text_widget.append(msg)
+from config import get_config
 
-            # 控制日志行数，避免内存泄漏
-            cursor = self.text_widget.textCursor()
-            cursor.movePosition(cursor.Start)
-            cursor.movePosition(cursor.Down, cursor.KeepAnchor, 1000)
 
-            # 如果超过1000行，删除最早的行
-            if cursor.hasSelection():
-                cursor.removeSelectedText()
+class TimestampFormatter(logging.Formatter):
+    """提供 %(timestamp)s（时:分:秒.毫秒，取记录创建时间）的格式化器"""
 
-        except Exception:
-            # 避免日志处理器本身出错影响程序
-            pass
+    def format(self, record):
+        record.timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        return super().format(record)
 
 
-class ColoredFormatter(logging.Formatter):
-    """带颜色的日志格式化器"""
+class ColoredFormatter(TimestampFormatter):
+    """带颜色的日志格式化器（用于富文本控件）"""
 
     COLORS = {
         'DEBUG': '#888888',  # 灰色
@@ -51,10 +50,6 @@ class ColoredFormatter(logging.Formatter):
     }
 
     def format(self, record):
-        # 添加时间戳
-        record.timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-
-        # 基本格式化
         formatted = super().format(record)
 
         # 添加颜色（仅用于UI显示）
@@ -62,76 +57,183 @@ class ColoredFormatter(logging.Formatter):
         return f'<span style="color: {color}">{formatted}</span>'
 
 
+class UiLogHandler(logging.Handler):
+    """界面日志处理器：emit 只把格式化后的行放入有界缓冲区（线程安全），由界面定时器取走
+
+    max_rate 为每秒最多上屏的行数，超出部分丢弃并计数。
+    """
+
+    def __init__(self, max_rate=2000, max_pending=10000):
+        super().__init__()
+        self.max_rate = max_rate
+        self._pending = deque(maxlen=max_pending)
+        self._pending_lock = threading.Lock()
+        self._last_drain = time.monotonic()
+        self.dropped = 0
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._pending_lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(msg)
+
+    def drain(self):
+        """取出本次允许上屏的行，返回 (行列表, 本次因限速省略的行数)"""
+        now = time.monotonic()
+        budget = max(1, int(self.max_rate * (now - self._last_drain))) if self.max_rate else None
+        self._last_drain = now
+        with self._pending_lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        skipped = 0
+        if budget is not None and len(lines) > budget:
+            # 保留最新的行，旧的省略
+            skipped = len(lines) - budget
+            lines = lines[skipped:]
+            self.dropped += skipped
+        return lines, skipped
+
+
+def _gzip_rotator(source, dest):
+    """轮转时把旧日志压缩为 .gz"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def create_file_handler(log_file, rotation="size", max_bytes=10 * 1024 * 1024, backup_count=10,
+                        when="midnight", compress=True):
+    """创建按大小（rotation="size"）或时间（rotation="time"）轮转的文件处理器"""
+    directory = os.path.dirname(log_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if rotation == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=when, backupCount=backup_count, encoding='utf-8')
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    if compress:
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def rotated_files(log_file):
+    """按从旧到新的顺序列出日志文件（含已轮转和压缩的）"""
+    base = os.path.basename(log_file)
+    backups = []
+    for path in glob.glob(glob.escape(log_file) + ".*"):
+        suffix = os.path.basename(path)[len(base) + 1:]
+        if suffix.endswith(".gz"):
+            suffix = suffix[:-3]
+        # 按大小轮转的后缀是序号（越大越旧），按时间轮转的后缀是日期（越小越旧）
+        if suffix.isdigit():
+            backups.append((f"{10 ** 9 - int(suffix):010d}", path))
+        elif re.match(r"^\d{4}-\d{2}-\d{2}", suffix):
+            backups.append((suffix, path))
+    backups.sort()
+    files = [path for _, path in backups]
+    if os.path.exists(log_file):
+        files.append(log_file)
+    return files
+
+
 class LogManager(QObject):
     """日志管理器"""
 
-    # 信号：用于在非主线程中安全记录日志
-    log_signal = pyqtSignal(str, int)
-
-    def __init__(self, text_widget=None, log_file=None):
+    def __init__(self, text_widget=None, log_file=None, console=True):
         super().__init__()
+        config = get_config()
         self.logger = logging.getLogger('SerialBoard')
         self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.log_file = log_file
 
         # 清除已有的处理器
         self.logger.handlers.clear()
 
-        # 控制台处理器
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_formatter = logging.Formatter(
-            '[%(timestamp)s] %(levelname)s: %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        # 后台处理器：控制台和文件，在 QueueListener 线程中写出
+        background = []
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(TimestampFormatter('[%(timestamp)s] %(levelname)s: %(message)s'))
+            background.append(console_handler)
 
-        # 文件处理器
         if log_file:
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
-            file_formatter = logging.Formatter(
-                '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d]: %(message)s'
+            file_handler = create_file_handler(
+                log_file,
+                rotation=config.get('logging.rotation', 'size'),
+                max_bytes=config.get('logging.max_bytes', 10 * 1024 * 1024),
+                backup_count=config.get('logging.backup_count', 10),
+                when=config.get('logging.when', 'midnight'),
+                compress=config.get('logging.compress', True),
             )
-            file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
-
-        # UI处理器
-        if text_widget:
-            ui_handler = QTextEditHandler(text_widget)
-            ui_formatter = ColoredFormatter('[%(timestamp)s] %(levelname)s: %(message)s')
-            ui_handler.setFormatter(ui_formatter)
-            self.logger.addHandler(ui_handler)
+            file_handler.setFormatter(logging.Formatter(
+                '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d]: %(message)s'
+            ))
+            background.append(file_handler)
 
-            # 连接信号槽，支持跨线程日志
-            self.log_signal.connect(self._emit_to_ui)
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, *background, respect_handler_level=True)
+        self._listener.start()
+        self.logger.addHandler(logging.handlers.QueueHandler(self._queue))
 
-    def _emit_to_ui(self, message, level):
-        """在主线程中发送日志到UI"""
-        log_method = getattr(self.logger, logging.getLevelName(level).lower())
-        log_method(message)
+        # UI处理器：单独限速，由定时器在界面线程中取走
+        self.text_widget = text_widget
+        self.ui_handler = None
+        if text_widget is not None:
+            self.ui_handler = UiLogHandler(config.get('logging.ui_max_rate', 2000))
+            if hasattr(text_widget, "append_lines"):
+                self.ui_handler.setFormatter(TimestampFormatter('[%(timestamp)s] %(message)s'))
+            else:
+                self.ui_handler.setFormatter(ColoredFormatter('[%(timestamp)s] %(levelname)s: %(message)s'))
+            self.logger.addHandler(self.ui_handler)
+
+            self._ui_timer = QTimer(self)
+            self._ui_timer.timeout.connect(self._drain_to_ui)
+            self._ui_timer.start(int(config.get('ui.log_flush_interval', 0.1) * 1000))
+
+    def _drain_to_ui(self):
+        """在主线程中把缓冲的日志行交给日志控件"""
+        lines, skipped = self.ui_handler.drain()
+        if skipped:
+            lines.insert(0, f"... 日志过多，界面省略 {skipped} 行（完整内容见日志文件）")
+        if hasattr(self.text_widget, "append_lines"):
+            self.text_widget.append_lines(lines)
+        else:
+            for line in lines:
+                self.text_widget.append(line)
 
     def debug(self, message):
-        self.logger.debug(message)
+        self.logger.debug(message, stacklevel=2)
 
     def info(self, message):
-        self.logger.info(message)
+        self.logger.info(message, stacklevel=2)
 
     def warning(self, message):
-        self.logger.warning(message)
+        self.logger.warning(message, stacklevel=2)
 
     def error(self, message):
-        self.logger.error(message)
+        self.logger.error(message, stacklevel=2)
 
     def critical(self, message):
-        self.logger.critical(message)
+        self.logger.critical(message, stacklevel=2)
 
-    # 跨线程日志方法
+    # 跨线程日志方法（所有处理器均线程安全，保留以兼容旧接口）
     def thread_safe_info(self, message):
-        self.log_signal.emit(message, logging.INFO)
+        self.logger.info(message, stacklevel=2)
 
     def thread_safe_error(self, message):
-        self.log_signal.emit(message, logging.ERROR)
+        self.logger.error(message, stacklevel=2)
 
     def thread_safe_warning(self, message):
-        self.log_signal.emit(message, logging.WARNING)
+        self.logger.warning(message, stacklevel=2)
 
     def set_level(self, level):
         """设置日志级别"""
@@ -144,6 +246,41 @@ class LogManager(QObject):
         extra = kwargs
         return LoggerAdapter(self.logger, extra)
 
+    def flush(self):
+        """等待队列中的记录全部写出"""
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.flush()
+        self._listener.start()
+
+    def export(self, filename, chunk_size=1024 * 1024):
+        """把磁盘上的全部日志（从旧到新，自动解压）流式复制到 filename，返回写入字节数"""
+        if not self.log_file:
+            raise ValueError("未启用日志文件")
+        self.flush()
+        written = 0
+        with open(filename, 'wb') as out:
+            for path in rotated_files(self.log_file):
+                opener = gzip.open if path.endswith(".gz") else open
+                with opener(path, 'rb') as f:
+                    while True:
+                        chunk = f.read(chunk_size)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        written += len(chunk)
+        return written
+
+    def close(self):
+        """停止后台线程并关闭所有处理器"""
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self.logger.handlers.clear()
+        if self.text_widget is not None:
+            self._ui_timer.stop()
+            self._drain_to_ui()
+
 
 class LoggerAdapter(logging.LoggerAdapter):
     """日志适配器，用于添加上下文信息"""
@@ -155,4 +292,4 @@ class LoggerAdapter(logging.LoggerAdapter):
 # 使用示例
 def create_logger(text_widget=None, log_file=None):
     """创建日志管理器的工厂函数"""
-    return LogManager(text_widget, log_file)
\ No newline at end of file
+    return LogManager(text_widget, log_file)
@@ -1,82 +1,457 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 模拟 MCU 服务端
+
+单线程 selectors 事件循环，可同时保持数千个连接：
+- 每个连接有独立的 FrameDecoder，按字节流切帧，正确处理拆包、粘包和流水线请求
+- 同一连接上的响应严格按请求顺序返回（即使各请求的处理延迟不同）
+- 发送缓冲区未写完时才关注可写事件，慢客户端不会阻塞其他连接
+- 统计请求速率和服务端处理延迟
+- 每个监听端口模拟一块转发板（utils.mcu_simulator），寄存器有状态、遥测随时间漂移
+- 可注入处理时延、抖动、丢弃应答、校验和错误、响应拆分/合并发送
+
+    python serial_board_server.py --port 9420 --stats-interval 5
+    python serial_board_server.py --boards 4 --addresses 0-31 --seed 1
+    python serial_board_server.py --latency 0.005 --jitter 0.002 --drop-rate 0.01 --split-rate 0.1
+    python serial_board_server.py --profile faults.json
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import selectors
 import socket
 import threading
+import time
+from collections import deque
+
+from core.bulk import parse_addresses
+from utils.frame_decoder import FrameDecoder
+from utils import frame_codec
+from utils.mcu_simulator import BoardSimulator, FaultProfile
+
+LATENCY_SAMPLES = 100000  # 计算延迟分位数时保留的最近样本数
+
+
+class _Connection:
+    """一个客户端连接的收发状态"""
+
+    __slots__ = ("sock", "addr", "board", "decoder", "out", "scheduled", "last_ready", "writing",
+                 "paused", "stash")
+
+    def __init__(self, sock, addr, board):
+        self.sock = sock
+        self.addr = addr
+        self.board = board  # 连接所在端口对应的 BoardSimulator
+        self.decoder = FrameDecoder()
+        self.out = bytearray()  # 待发送的数据
+        self.scheduled = 0  # 尚在延迟队列中的响应数
+        self.last_ready = 0.0  # 最后一个排队响应的发送时间，保证按序
+        self.writing = False  # 是否已关注可写事件
+        self.paused = False  # 拆分/合并发送期间暂停写入，后续响应暂存到 stash
+        self.stash = bytearray()
+
 
 # 模拟 MCU 的服务端逻辑，支持基本命令响应
 class MockMCUServer:
-    def __init__(self, host='0.0.0.0', port=9420):
+    """模拟服务端
+
+    boards 块转发板依次监听 port, port+1, ...（port=0 时各自使用随机端口，见 self.ports），
+    每块板挂 addresses 中的设备；faults 为 FaultProfile，默认不注入故障。
+    quiet 为 True 时不输出启动信息（嵌入负载测试等工具时使用）。
+    """
+
+    def __init__(self, host='0.0.0.0', port=9420, verbose=False, boards=1, addresses=range(16),
+                 faults=None, seed=None, quiet=False):
         self.host = host
         self.port = port
+        self.ports = []
+        self.verbose = verbose
+        self.quiet = quiet
+        self.boards = [BoardSimulator(addresses, seed=None if seed is None else seed + i)
+                       for i in range(max(1, boards))]
+        self.faults = faults or FaultProfile(seed=seed)
         self.running = False
         self.server_socket = None
+        self._listeners = []
+        self.ready = threading.Event()  # 开始监听后置位（port=0 时此后 self.port 为实际端口）
+        self._selector = None
+        self._connections = {}
+        self._delayed = []  # (发送时间, 序号, 连接, 响应, 请求到达时间) 小顶堆
+        self._seq = itertools.count()
+        self._wakeup_r = None
+        self._wakeup_w = None
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._stats_lock = threading.Lock()
+        self.counters = {
+            "accepted": 0,
+            "closed": 0,
+            "peak_connections": 0,
+            "requests": 0,
+            "responses": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "dropped": 0,
+            "corrupted": 0,
+            "split": 0,
+            "merged": 0,
+        }
+        self._started_at = None
+        self._rate_mark = (0.0, 0)  # 上次计算速率时的 (时间, 请求数)
 
     def start(self):
-        self.running = True
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(1)
-        print(f"模拟MCU服务端启动，监听 {self.host}:{self.port}")
-        while self.running:
-            client_socket, addr = self.server_socket.accept()
-            print(f"连接来自: {addr}")
-            threading.Thread(target=self.handle_client, args=(client_socket,), daemon=True).start()
+        """监听并运行事件循环，直到 stop()"""
+        self._open()
+        ports = ", ".join(str(port) for port in self.ports)
+        if not self.quiet:
+            print(f"模拟MCU服务端启动，监听 {self.host}:{ports}（{len(self.boards)} 块转发板）")
+        try:
+            self._serve()
+        finally:
+            self._close_all()
+
+    def start_in_thread(self):
+        """在后台线程中运行，返回线程；监听建立后才返回"""
+        thread = threading.Thread(target=self.start, name="MockMCUServer", daemon=True)
+        thread.start()
+        self.ready.wait()
+        return thread
 
     def stop(self):
         self.running = False
-        if self.server_socket:
-            self.server_socket.close()
-
-    def handle_client(self, client_socket):
-        with client_socket:
-            while self.running:
-                try:
-                    data = client_socket.recv(1024)
-                    if not data:
-                        break
-                    print(f"收到数据: {data.hex(' ').upper()}")
-                    response = self.build_response(data)
-                    if response:
-                        client_socket.sendall(response)
-                        print(f"发送响应: {response.hex(' ').upper()}")
-                except Exception as e:
-                    print(f"客户端处理异常: {e}")
-                    break
-
-    def build_response(self, data: bytes) -> bytes:
-        if len(data) < 7 or data[0] != 0xAA or data[1] != 0x55:
-            return b''
-
-        addr = data[2]
-        cmd = data[3]
-
-        if cmd == 0x00:  # 透传
-            return self.make_frame(addr, cmd, data[5:-4])
-        elif cmd == 0x01:  # 串口配置
-            return self.make_frame(addr, cmd, b'\x01')
-        elif cmd == 0x04:  # 读SCR
-            return self.make_frame(addr, cmd, b'\x48')
-        elif cmd == 0x05:  # 写SCR确认
-            return self.make_frame(addr, cmd, b'\x06')
-        elif cmd == 0xF2:  # 运行时间
-            return self.make_frame(addr, cmd, b'\x00\x00\x03\xE8')  # 1000s
-        elif cmd == 0xF6:  # MCU温度
-            return self.make_frame(addr, cmd, b'\x00\x2D')  # 45°C
-        elif cmd == 0xF7:  # MCU电压
-            return self.make_frame(addr, cmd, b'\x09\xC4')  # 2500mV
+        if self._wakeup_w is not None:
+            try:
+                self._wakeup_w.send(b'\0')
+            except OSError:
+                pass
+
+    def _open(self):
+        _raise_fd_limit()
+        self._selector = selectors.DefaultSelector()
+        self.ports = []
+        for i, board in enumerate(self.boards):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port + i if self.port else 0))
+            sock.listen(socket.SOMAXCONN)
+            sock.setblocking(False)
+            self._listeners.append(sock)
+            self.ports.append(sock.getsockname()[1])
+            self._selector.register(sock, selectors.EVENT_READ, board)
+        self.server_socket = self._listeners[0]
+        self.port = self.ports[0]
+
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, self._wakeup_r)
+
+        self.running = True
+        self._started_at = time.monotonic()
+        self._rate_mark = (self._started_at, 0)
+        self.ready.set()
+
+    def _serve(self):
+        while self.running:
+            timeout = None
+            if self._delayed:
+                timeout = max(0.0, self._delayed[0][0] - time.monotonic())
+            for key, mask in self._selector.select(timeout):
+                if isinstance(key.data, BoardSimulator):
+                    self._accept(key.fileobj, key.data)
+                elif key.data is self._wakeup_r:
+                    try:
+                        self._wakeup_r.recv(64)
+                    except OSError:
+                        pass
+                else:
+                    conn = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+                    if mask & selectors.EVENT_WRITE and conn.sock.fileno() >= 0:
+                        self._flush(conn)
+            self._release_delayed()
+
+    def _accept(self, server_socket, board):
+        # 一次事件中可能有多个连接排队，尽量全部接受
+        for _ in range(256):
+            try:
+                client_socket, addr = server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(f"接受连接失败: {e}")
+                return
+            client_socket.setblocking(False)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = _Connection(client_socket, addr, board)
+            self._connections[client_socket] = conn
+            self._selector.register(client_socket, selectors.EVENT_READ, conn)
+            with self._stats_lock:
+                self.counters["accepted"] += 1
+                self.counters["peak_connections"] = max(self.counters["peak_connections"],
+                                                        len(self._connections))
+            if self.verbose:
+                print(f"连接来自: {addr}")
+
+    def _read(self, conn):
+        try:
+            data = conn.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            if self.verbose:
+                print(f"客户端处理异常: {e}")
+            self._close(conn)
+            return
+        if not data:
+            self._close(conn)
+            return
+
+        now = time.monotonic()
+        frames = conn.decoder.feed(data)
+        with self._stats_lock:
+            self.counters["bytes_in"] += len(data)
+            self.counters["requests"] += len(frames)
+        for frame in frames:
+            if self.verbose:
+                print(f"收到数据: {frame.hex(' ').upper()}")
+            response, delay = self.handle_request(frame, conn.board)
+            if not response:
+                continue
+            faults = self.faults
+            if faults.drop():
+                self._count("dropped")
+                continue
+            corrupted = faults.corrupt(response)
+            if corrupted is not response:
+                self._count("corrupted")
+                response = corrupted
+            delay += faults.service_delay(frame[3])
+            if delay <= 0 and not conn.scheduled:
+                self._queue_response(conn, response, now)
+            else:
+                # 有延迟的响应进入定时队列，发送时间不早于同连接上一个响应，保证按序返回
+                ready = max(now + max(delay, 0.0), conn.last_ready)
+                conn.last_ready = ready
+                conn.scheduled += 1
+                heapq.heappush(self._delayed, (ready, next(self._seq), conn, response, now))
+        self._flush(conn)
+
+    def _release_delayed(self):
+        now = time.monotonic()
+        flushed = set()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, conn, response, arrived = heapq.heappop(self._delayed)
+            if conn.sock.fileno() < 0:
+                continue  # 连接已关闭
+            if response is None:
+                # 拆分/合并的暂停结束，写出暂存的数据
+                conn.out += conn.stash
+                conn.stash.clear()
+                conn.paused = False
+            else:
+                conn.scheduled -= 1
+                self._queue_response(conn, response, arrived)
+            flushed.add(conn)
+        for conn in flushed:
+            self._flush(conn)
+
+    def _queue_response(self, conn, response, arrived):
+        latency = time.monotonic() - arrived
+        with self._stats_lock:
+            self.counters["responses"] += 1
+            self._latencies.append(latency)
+        if self.verbose:
+            print(f"发送响应: {response.hex(' ').upper()}")
+
+        if conn.paused:
+            conn.stash += response
+            return
+        faults = self.faults
+        split = faults.split_point(response)
+        if split:
+            # 先发前半段，暂停 split_gap 后再发后半段，制造拆包
+            conn.out += response[:split]
+            self._pause(conn, response[split:], faults.split_gap)
+            self._count("split")
+        elif faults.merge():
+            # 暂存 merge_window，期间的后续响应与其一起发送，制造粘包
+            self._pause(conn, response, faults.merge_window)
+            self._count("merged")
         else:
-            return self.make_frame(addr, cmd, b'\x00')
+            conn.out += response
+
+    def _pause(self, conn, data, duration):
+        conn.paused = True
+        conn.stash += data
+        heapq.heappush(self._delayed, (time.monotonic() + duration, next(self._seq), conn, None, None))
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.counters[name] += 1
+
+    def _flush(self, conn):
+        """尽量写出发送缓冲区，写不完时关注可写事件"""
+        if conn.out:
+            try:
+                sent = conn.sock.send(conn.out)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError as e:
+                if self.verbose:
+                    print(f"客户端处理异常: {e}")
+                self._close(conn)
+                return
+            del conn.out[:sent]
+            with self._stats_lock:
+                self.counters["bytes_out"] += sent
+        want_write = bool(conn.out)
+        if want_write != conn.writing:
+            conn.writing = want_write
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if want_write else 0)
+            self._selector.modify(conn.sock, events, conn)
+
+    def _close(self, conn):
+        if self._connections.pop(conn.sock, None) is None:
+            return
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+        with self._stats_lock:
+            self.counters["closed"] += 1
+
+    def _close_all(self):
+        for conn in list(self._connections.values()):
+            self._close(conn)
+        self._delayed.clear()
+        if self._selector is not None:
+            self._selector.close()
+        for sock in self._listeners + [self._wakeup_r, self._wakeup_w]:
+            if sock is not None:
+                sock.close()
+        self._listeners = []
+        self.server_socket = self._wakeup_r = self._wakeup_w = None
+        self.running = False
+        self.ready.clear()
+
+    def stats(self):
+        """返回统计信息：连接数、请求速率（自上次调用以来）和处理延迟分位数（毫秒）"""
+        now = time.monotonic()
+        with self._stats_lock:
+            result = dict(self.counters)
+            latencies = sorted(self._latencies)
+        result["connections"] = len(self._connections)
+        mark_time, mark_requests = self._rate_mark
+        elapsed = now - mark_time
+        result["request_rate"] = (result["requests"] - mark_requests) / elapsed if elapsed > 0 else 0.0
+        self._rate_mark = (now, result["requests"])
+        result["uptime"] = now - self._started_at if self._started_at is not None else 0.0
+        result["latency_ms"] = latency_percentiles(latencies)
+        return result
+
+    def handle_request(self, data, board=None):
+        """处理一个完整的请求帧，返回 (响应, 处理延迟秒数)；响应为空表示不应答
+
+        时延和故障注入在此之后由 FaultProfile 统一处理。
+        """
+        return self.build_response(data, board), 0.0
+
+    def build_response(self, data: bytes, board=None) -> bytes:
+        """由转发板仿真生成响应（默认第一块板）"""
+        return (board or self.boards[0]).handle(data)
 
     def make_frame(self, addr, cmd, payload):
-        frame = bytearray([0xAA, 0x55, addr, cmd, len(payload)])
-        frame.extend(payload)
-        checksum = (addr + cmd + len(payload) + sum(payload)) & 0xFFFF
-        frame.append((checksum >> 8) & 0xFF)
-        frame.append(checksum & 0xFF)
-        frame.extend([0x0D, 0x0A])
-        return bytes(frame)
+        return frame_codec.encode(addr, cmd, payload)
+
+
+def latency_percentiles(sorted_latencies):
+    """已排序的延迟样本（秒）的分位数，单位毫秒"""
+    n = len(sorted_latencies)
+    if not n:
+        return {}
+
+    def pick(q):
+        return round(sorted_latencies[min(n - 1, int(q * n))] * 1000, 3)
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "p999": pick(0.999),
+            "max": round(sorted_latencies[-1] * 1000, 3)}
+
+
+def _raise_fd_limit():
+    """尽量把文件描述符软限制提高到硬限制，以容纳数千个连接"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = max(soft, 65536) if hard == resource.RLIM_INFINITY else hard
+    if soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="模拟 MCU 服务端")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, default=9420, help="监听端口")
+    parser.add_argument("--stats-interval", type=float, default=0, help="每隔多少秒输出一次统计，0 表示不输出")
+    parser.add_argument("-v", "--verbose", action="store_true", help="逐帧输出收发数据")
+    parser.add_argument("--boards", type=int, default=1, help="模拟的转发板数量，依次使用 port, port+1, ...")
+    parser.add_argument("--addresses", default="0-15", help="每块板上的设备地址，如 0-15 / 1,3,5")
+    parser.add_argument("--seed", type=int, help="随机种子，指定后遥测漂移和故障注入可复现")
+    parser.add_argument("--profile", help="故障注入配置（JSON，字段同 FaultProfile，command_latency 键如 \"0xF6\"）")
+    parser.add_argument("--latency", type=float, help="处理时延（秒）")
+    parser.add_argument("--jitter", type=float, help="额外随机时延上限（秒）")
+    parser.add_argument("--drop-rate", type=float, help="丢弃应答的概率")
+    parser.add_argument("--corrupt-rate", type=float, help="校验和错误的概率")
+    parser.add_argument("--split-rate", type=float, help="响应拆成两段发送的概率")
+    parser.add_argument("--merge-rate", type=float, help="响应与后续响应合并发送的概率")
+    return parser
+
+
+def fault_profile(args):
+    """由 --profile 文件和单独的命令行参数（优先）组成 FaultProfile"""
+    values = {}
+    if args.profile:
+        with open(args.profile, 'r', encoding='utf-8') as f:
+            values = json.load(f)
+    for name in ("latency", "jitter", "drop_rate", "corrupt_rate", "split_rate", "merge_rate"):
+        value = getattr(args, name)
+        if value is not None:
+            values[name] = value
+    return FaultProfile.from_dict(values, seed=args.seed)
+
+
+def report_stats(server, interval):
+    """后台线程：定期输出服务端统计"""
+    def loop():
+        server.ready.wait()
+        while server.running:
+            time.sleep(interval)
+            s = server.stats()
+            latency = s["latency_ms"]
+            print(f"连接 {s['connections']} (峰值 {s['peak_connections']}) | "
+                  f"请求 {s['requests']} | {s['request_rate']:.0f} 次/秒 | "
+                  f"延迟 p50 {latency.get('p50', 0)} ms p99 {latency.get('p99', 0)} ms"
+                  + (f" | 丢弃 {s['dropped']} 错误 {s['corrupted']} 拆分 {s['split']} 合并 {s['merged']}"
+                     if server.faults.is_active() else ""))
+
+    threading.Thread(target=loop, name="MockMCUStats", daemon=True).start()
 
 
 if __name__ == "__main__":
-    server = MockMCUServer()
+    args = build_parser().parse_args()
+    server = MockMCUServer(args.host, args.port, verbose=args.verbose, boards=args.boards,
+                           addresses=parse_addresses(args.addresses, range(256)),
+                           faults=fault_profile(args), seed=args.seed)
+    if args.stats_interval > 0:
+        report_stats(server, args.stats_interval)
     try:
         server.start()
     except KeyboardInterrupt:
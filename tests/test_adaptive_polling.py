@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 自适应轮询测试
+"""
+
+import pytest
+
+from config import Config
+from utils.adaptive_polling import AdaptiveInterval, AdaptivePolicy
+
+
+def test_backoff_inside_deadband_capped():
+    adaptive = AdaptiveInterval(1.0, 5.0, backoff=2.0, deadband=0.5)
+    intervals = [adaptive.update(v) for v in (20.0, 20.2, 19.8, 20.4, 20.1, 20.0)]
+    assert intervals == [1.0, 2.0, 4.0, 5.0, 5.0, 5.0]
+
+
+def test_change_outside_deadband_resets():
+    adaptive = AdaptiveInterval(1.0, 30.0, backoff=2.0, deadband=0.5)
+    for v in (20.0, 20.1, 20.2):
+        adaptive.update(v)
+    assert adaptive.interval == 4.0
+    assert adaptive.update(21.0) == 1.0
+    assert adaptive.reference == 21.0
+    assert adaptive.update(21.3) == 2.0
+
+
+def test_slow_drift_accumulates_against_reference():
+    adaptive = AdaptiveInterval(1.0, 30.0, backoff=2.0, deadband=1.0)
+    adaptive.update(10.0)
+    # 每次只变化 0.4，但相对上一次“变化”时的读数累计超出死区
+    assert adaptive.update(10.4) == 2.0
+    assert adaptive.update(10.8) == 4.0
+    assert adaptive.update(11.2) == 1.0
+
+
+def test_threshold_crossing_resets_within_deadband():
+    adaptive = AdaptiveInterval(1.0, 30.0, backoff=2.0, deadband=5.0, thresholds=(60,))
+    adaptive.update(58.0)
+    assert adaptive.update(59.0) == 2.0
+    assert adaptive.update(60.5) == 1.0
+    assert adaptive.update(59.5) == 1.0  # 向下越过同样触发
+    assert adaptive.update(59.0) == 2.0
+
+
+def test_zero_deadband_backs_off_only_on_identical_readings():
+    adaptive = AdaptiveInterval(0.5, 4.0, backoff=2.0)
+    assert [adaptive.update(v) for v in (1, 1, 1, 2, 2)] == [0.5, 1.0, 2.0, 0.5, 1.0]
+
+
+def test_reset():
+    adaptive = AdaptiveInterval(1.0, 8.0, backoff=2.0, deadband=1.0)
+    for v in (5.0, 5.0, 5.0):
+        adaptive.update(v)
+    adaptive.reset()
+    assert adaptive.interval == 1.0
+    assert adaptive.reference is None and adaptive.last_value is None
+    adaptive.reset(min_interval=10.0)
+    assert (adaptive.interval, adaptive.max_interval) == (10.0, 10.0)
+    assert adaptive.update(5.0) == 10.0
+    assert adaptive.update(5.0) == 10.0
+
+
+def test_bad_parameters_are_clamped():
+    adaptive = AdaptiveInterval(2.0, 1.0, backoff=0.5, deadband=-1.0)
+    assert (adaptive.max_interval, adaptive.backoff, adaptive.deadband) == (2.0, 1.0, 1.0)
+
+
+def test_policy_per_metric():
+    policy = AdaptivePolicy(enabled=True, backoff=3.0, max_interval=9.0,
+                            deadband={"temperature": 0.5}, thresholds={"temperature": [80]})
+    temperature = policy.create("temperature", 1.0)
+    assert (temperature.deadband, temperature.thresholds, temperature.backoff) == (0.5, (80,), 3.0)
+    voltage = policy.create("voltage", 2.0)
+    assert (voltage.deadband, voltage.thresholds, voltage.max_interval) == (0.0, (), 9.0)
+
+
+def test_policy_from_config(tmp_path):
+    config = Config(str(tmp_path / "config.json"))
+    policy = AdaptivePolicy.from_config(config)
+    assert policy.enabled == config.get('polling.adaptive.enabled')
+    assert policy.max_interval == pytest.approx(config.get('polling.adaptive.max_interval'))
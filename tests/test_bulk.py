@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 批量操作测试
+"""
+
+import pytest
+
+from config import Commands
+from core.bulk import BulkOperation, parse_addresses
+from utils import frame_codec
+
+BOARD_A = ("10.0.0.1", 9420)
+BOARD_B = ("10.0.0.2", 9420)
+
+
+def test_parse_addresses():
+    assert parse_addresses("all") == list(range(16))
+    assert parse_addresses("") == list(range(16))
+    assert parse_addresses("1,3,5") == [1, 3, 5]
+    assert parse_addresses("0x0A-0x0C, 2") == [10, 11, 12, 2]
+    assert parse_addresses("3,1-3") == [3, 1, 2]  # 去重并保持首次出现的顺序
+    with pytest.raises(ValueError):
+        parse_addresses("250-256")
+    with pytest.raises(ValueError):
+        parse_addresses("abc")
+
+
+def test_unknown_operation():
+    with pytest.raises(ValueError):
+        BulkOperation("reboot")
+
+
+def test_build_requests_encodes_value_per_target():
+    bulk = BulkOperation("set-current", 120)
+    requests = bulk.build_requests([(BOARD_A, 1), (BOARD_B, 2)])
+    assert bulk.expected == 2
+    (endpoint, frame, context), _ = requests
+    assert endpoint == BOARD_A
+    assert frame == frame_codec.encode(1, Commands.SET_CURRENT, bytes([120]))
+    assert context["bulk"] is bulk
+    assert context["type"] == "current_setting"
+    assert context["coalesce"] is False
+    # 无参数的读命令数据区为空
+    _, frame, _ = BulkOperation("read-scr").build_requests([(BOARD_A, 3)])[0]
+    assert frame == frame_codec.encode(3, Commands.READ_SCR)
+
+
+def test_results_and_completion():
+    completed = []
+    bulk = BulkOperation("read-scr", on_complete=completed.append)
+    requests = bulk.build_requests([(BOARD_A, 1), (BOARD_A, 2), (BOARD_B, 1)])
+    contexts = [context for _, _, context in requests]
+
+    bulk.record_response(contexts[0], frame_codec.encode(1, Commands.READ_SCR, b"\x48"), latency=0.002)
+    bulk.record_failure(contexts[1], "请求超时")
+    assert not bulk.done() and not completed
+    # 同一设备重复记录只保留第一次结果
+    bulk.record_failure(contexts[0], "请求超时")
+    bulk.record_response(contexts[2], frame_codec.encode(1, Commands.READ_SCR, b"\x10"), latency=0.004)
+    assert bulk.done() and completed == [bulk]
+
+    report = bulk.report()
+    assert (report["total"], report["succeeded"], report["failed"], report["pending"]) == (3, 2, 1, 0)
+    assert report["latency_ms"] == {"min": 2.0, "avg": 3.0, "max": 4.0}
+    by_device = {(r["endpoint"], r["address"]): r for r in report["results"]}
+    assert by_device[("10.0.0.1:9420", 1)]["value"] == 0x48
+    assert by_device[("10.0.0.1:9420", 2)]["error"] == "请求超时"
+    assert by_device[("10.0.0.2:9420", 1)]["value"] == 0x10
+
+
+def test_latency_measured_from_wire_send():
+    bulk = BulkOperation("read-scr")
+    [(_, _, context)] = bulk.build_requests([(BOARD_A, 1)])
+    context["queued_at"] -= 10  # 排队了很久
+    context["wire_sent_at"] = context["queued_at"] + 9.99
+    bulk.record_response(context, frame_codec.encode(1, Commands.READ_SCR, b"\x01"))
+    assert bulk.results[(BOARD_A, 1)].latency < 1
+
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 命令表测试
+"""
+
+import pytest
+
+from config import Commands
+from utils import command_table, frame_codec
+
+
+def test_every_opcode_registered_once():
+    opcodes = [spec.opcode for spec in command_table.COMMAND_TABLE]
+    assert len(opcodes) == len(set(opcodes))
+    for spec in command_table.COMMAND_TABLE:
+        assert command_table.lookup(spec.opcode) is spec
+        assert command_table.BY_TYPE[spec.request_type] is spec
+    assert command_table.lookup(0x99) is None
+    assert command_table.request_type(0x99) == "custom"
+
+
+def test_idempotent_commands():
+    assert command_table.IDEMPOTENT_COMMANDS == {
+        Commands.READ_SCR, Commands.GET_RUNTIME, Commands.GET_TEMPERATURE, Commands.GET_VOLTAGE}
+
+
+@pytest.mark.parametrize("command,values,payload", [
+    (Commands.SET_CURRENT, (120,), b"\x78"),
+    (Commands.WRITE_SCR, (0x48,), b"\x48"),
+    (Commands.READ_SCR, (), b""),
+    (Commands.GET_TEMPERATURE, (), b""),
+])
+def test_encode(command, values, payload):
+    assert command_table.encode(command, 0x03, *values) == frame_codec.encode(0x03, command, payload)
+
+
+def test_pack_errors():
+    with pytest.raises(ValueError):
+        command_table.lookup(Commands.SET_CURRENT).pack(256)
+    with pytest.raises(ValueError):
+        command_table.lookup(Commands.SET_CURRENT).pack()
+
+
+@pytest.mark.parametrize("command,payload,value", [
+    (Commands.GET_TEMPERATURE, b"\x00\x2D", 45),
+    (Commands.GET_VOLTAGE, b"\x00\xF0", 24.0),
+    (Commands.GET_RUNTIME, b"\x00\x01\x51\x80", 86400),
+    (Commands.READ_SCR, b"\x48", 0x48),
+    (Commands.SET_CURRENT, b"\x00", 0),
+])
+def test_decode_declared_layout(command, payload, value):
+    spec, decoded = command_table.decode(frame_codec.encode(0x03, command, payload))
+    assert spec is command_table.lookup(command)
+    assert decoded == value
+
+
+@pytest.mark.parametrize("command,payload,value", [
+    (Commands.GET_TEMPERATURE, b"\x2D", 45),
+    (Commands.GET_TEMPERATURE, b"\x00\x00\x2D", 45),
+    (Commands.GET_VOLTAGE, b"\x09", 0.9),
+    (Commands.SET_CURRENT, b"\x00\x78", 120),
+    (Commands.WRITE_SCR, b"", None),
+    (Commands.READ_SCR, b"", None),
+])
+def test_decode_tolerates_any_integer_length(command, payload, value):
+    assert command_table.decode(frame_codec.encode(0x03, command, payload))[1] == value
+
+
+def test_decode_unregistered_returns_payload():
+    assert command_table.decode(frame_codec.encode(0x03, 0x99, b"\x01\x02")) == (None, b"\x01\x02")
+    assert command_table.decode(frame_codec.encode(0x03, Commands.PASSTHROUGH, b"ab"))[1] == b"ab"
+
+
+def test_decode_bad_frames():
+    with pytest.raises(ValueError):
+        command_table.decode(b"\xAA\x55\x03")
+    with pytest.raises(ValueError):
+        command_table.decode(b"\x00" + frame_codec.encode(0x03, Commands.GET_TEMPERATURE, b"\x00\x2D")[1:])
+
+
+def test_encode_decode_round_trip():
+    for spec in command_table.COMMAND_TABLE:
+        if spec.response_struct is None:
+            continue
+        raw = spec.response_struct.pack(*([7] * len(spec.response_struct.unpack(bytes(spec.response_struct.size)))))
+        _, value = command_table.decode(frame_codec.encode(0x01, spec.opcode, raw))
+        assert value == 7 / spec.scale if spec.scale != 1 else 7
+
+
+def test_format():
+    temperature = command_table.lookup(Commands.GET_TEMPERATURE)
+    assert temperature.format(45) == "45 °C"
+    assert command_table.lookup(Commands.GET_VOLTAGE).format(24.0) == "24.0 V"
+    assert command_table.lookup(Commands.PASSTHROUGH).format(b"\x01\xAB") == "01 AB"
+    assert command_table.lookup(Commands.PASSTHROUGH).format(b"") == "-"
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 多板连接管理器测试
+"""
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from workers.connection_manager import format_endpoint, parse_endpoints  # noqa: E402
+
+
+def test_parse_endpoints():
+    assert parse_endpoints("10.0.0.1, 10.0.0.2:9000; 10.0.0.1", 9420) == [("10.0.0.1", 9420), ("10.0.0.2", 9000)]
+    assert parse_endpoints("  ", 9420) == []
+
+
+def test_format_endpoint():
+    assert format_endpoint(("10.0.0.1", 9420)) == "10.0.0.1:9420"
+    assert format_endpoint(None) == "--"
+
+
+def test_add_task_without_board_fails_request():
+    from PyQt5.QtCore import QCoreApplication
+    from workers.connection_manager import ConnectionManager
+
+    app = QCoreApplication.instance() or QCoreApplication([])  # noqa: F841
+    manager = ConnectionManager("thread")
+    failed = []
+    manager.request_failed.connect(lambda endpoint, context, reason: failed.append((endpoint, context)))
+    manager.add_task(b"\xAA\x55", {"type": "write_scr"})
+    assert failed == [(None, {"type": "write_scr"})]
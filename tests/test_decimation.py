@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - min/max 抽取测试
+"""
+
+import random
+
+import pytest
+
+from utils.decimation import minmax_decimate
+from utils.telemetry_store import RingBuffer
+
+
+def brute_force(samples, start, end, columns):
+    """逐样本分列的参考实现"""
+    span = end - start
+    result = {}
+    for t, v in samples:
+        if not start <= t <= end:
+            continue
+        col = min(columns - 1, max(0, int((t - start) / span * columns)))
+        low, high = result.get(col, (v, v))
+        result[col] = (min(low, v), max(high, v))
+    return [(col,) + result[col] for col in sorted(result)]
+
+
+def test_single_sample_spike_is_kept():
+    buffer = RingBuffer(capacity=100000)
+    for i in range(100000):
+        buffer.append(20.0, timestamp=i * 0.01)
+    buffer.append(95.0, timestamp=1000.0)
+    buffer.append(-5.0, timestamp=1000.01)
+    for i in range(1, 1000):
+        buffer.append(20.0, timestamp=1000.01 + i * 0.01)
+    points = minmax_decimate(buffer, 0.0, 1010.0, 100)
+    assert len(points) == 100
+    assert max(p[2] for p in points) == 95.0
+    assert min(p[1] for p in points) == -5.0
+    spike = [p for p in points if p[2] == 95.0]
+    assert spike == [(99, -5.0, 95.0)]
+    assert all(p[1:] == (20.0, 20.0) for p in points if p[0] != 99)
+
+
+@pytest.mark.parametrize("capacity,columns", [(50, 7), (1000, 64), (1000, 800), (5000, 300)])
+def test_matches_brute_force_across_wrap(capacity, columns):
+    random.seed(capacity + columns)
+    buffer = RingBuffer(capacity=capacity, initial_size=4)
+    samples = []
+    t = 0.0
+    for _ in range(capacity * 2 + 17):
+        t += random.expovariate(10.0)
+        value = random.gauss(0, 10)
+        buffer.append(value, timestamp=t)
+        samples = (samples + [(t, value)])[-capacity:]
+    start, end = samples[len(samples) // 4][0] - 0.013, samples[-1][0] + 0.5
+    assert minmax_decimate(buffer, start, end, columns) == brute_force(samples, start, end, columns)
+
+
+def test_sparse_data_skips_empty_columns():
+    buffer = RingBuffer(capacity=16)
+    for t in (1.0, 5.0, 9.5):
+        buffer.append(t * 2, timestamp=t)
+    assert minmax_decimate(buffer, 0.0, 10.0, 10) == [(1, 2.0, 2.0), (5, 10.0, 10.0), (9, 19.0, 19.0)]
+
+
+def test_empty_and_degenerate_ranges():
+    buffer = RingBuffer(capacity=16)
+    assert minmax_decimate(buffer, 0.0, 10.0, 10) == []
+    buffer.append(1.0, timestamp=5.0)
+    assert minmax_decimate(buffer, 10.0, 10.0, 10) == []
+    assert minmax_decimate(buffer, 6.0, 10.0, 10) == []
+    assert minmax_decimate(buffer, 0.0, 10.0, 0) == [(0, 1.0, 1.0)]
+
+
+def test_interleaved_appends_and_redraws():
+    buffer = RingBuffer(capacity=200, initial_size=8)
+    samples = []
+    for i in range(1000):
+        buffer.append(float(i % 37), timestamp=float(i))
+        samples = (samples + [(float(i), float(i % 37))])[-200:]
+        if i % 23 == 0:
+            start, end = samples[0][0], samples[-1][0] + 1
+            assert minmax_decimate(buffer, start, end, 40) == brute_force(samples, start, end, 40)
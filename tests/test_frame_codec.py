@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 帧编解码测试
+"""
+
+import pytest
+
+from utils import frame_codec
+from utils.frame_decoder import FrameDecoder
+
+
+def reference_frame(address, command, data):
+    """按协议逐字节构建的参考帧"""
+    checksum = (address + command + len(data) + sum(data)) & 0xFFFF
+    return bytes([0xAA, 0x55, address, command, len(data)]) + bytes(data) + bytes([checksum >> 8, checksum & 0xFF, 0x0D, 0x0A])
+
+
+@pytest.mark.parametrize("data", [b"", b"\x78", b"\x00\x2D", bytes(range(16)), bytes([0xFF]) * 255])
+def test_encode_matches_reference(data):
+    frame = frame_codec.encode(0x03, 0x05, data)
+    assert frame == reference_frame(0x03, 0x05, data)
+    assert frame_codec.checksum(frame) == int.from_bytes(frame[-4:-2], "big")
+
+
+def test_checksum_wraps_at_16_bits():
+    data = bytes([0xFF]) * 255
+    frame = frame_codec.encode(0xFF, 0xFF, data)
+    assert frame_codec.checksum(frame) == (0xFF + 0xFF + 255 + 0xFF * 255) & 0xFFFF
+
+
+def test_cached_frames_are_reused():
+    assert frame_codec.encode(1, 0xF6) is frame_codec.encode(1, 0xF6)
+    assert frame_codec.encode(1, 0x03, b"\x10") is frame_codec.encode(1, 0x03, bytearray(b"\x10"))
+    assert frame_codec.encode(1, 0x03, b"\x10") != frame_codec.encode(1, 0x03, b"\x11")
+
+
+def test_encode_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        frame_codec.encode(256, 0x03)
+    with pytest.raises(ValueError):
+        frame_codec.encode(1, 0x03, b"\x01" * 256)
+    with pytest.raises(ValueError):
+        frame_codec.encode(1, 300, b"\x01")
+    with pytest.raises(ValueError):
+        frame_codec.encode(1.5, 0x03, b"\x01")
+
+
+def test_header():
+    assert frame_codec.header(frame_codec.encode(0x0A, 0xF7, b"\x01\x02")) == (0x0A, 0xF7, 2)
+    with pytest.raises(ValueError):
+        frame_codec.header(b"\xAA\x55\x01")
+    with pytest.raises(ValueError):
+        frame_codec.header(b"\x55\xAA\x01\x02\x00\x00\x03")
+
+
+@pytest.mark.parametrize("data,value", [(b"\x2D", 45), (b"\x01\x2C", 300), (b"\x00\x01\x00", 256),
+                                        (b"\x00\x00\x01\x00", 256), (b"\x01" * 8, 0x0101010101010101)])
+def test_decode_uint(data, value):
+    assert frame_codec.decode_uint(frame_codec.encode(1, 0xF6, data)) == value
+
+
+def test_decode_uint_empty():
+    with pytest.raises(ValueError):
+        frame_codec.decode_uint(frame_codec.encode(1, 0xF6))
+
+
+def test_round_trip_through_decoder():
+    frames = [frame_codec.encode(a, c, bytes([a]) * (a % 4)) for a in range(8) for c in (0x03, 0xF6)]
+    decoder = FrameDecoder()
+    assert decoder.feed(b"".join(frames)) == frames
+
+
+def test_bad_checksum_is_rejected_by_decoder():
+    frame = bytearray(frame_codec.encode(1, 0xF6, b"\x00\x2D"))
+    frame[5] ^= 0x01  # 数据被篡改，校验和不再匹配
+    decoder = FrameDecoder()
+    assert decoder.feed(bytes(frame)) == []
+    assert decoder.checksum_errors == 1
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 流式帧解码器测试
+"""
+
+from utils import frame_codec
+from utils.frame_decoder import FrameDecoder
+
+FRAME_A = frame_codec.encode(0x01, 0xF6, b"\x00\x2D")
+FRAME_B = frame_codec.encode(0x02, 0xF7, b"\x00\xF0")
+FRAME_EMPTY = frame_codec.encode(0x03, 0x04)
+
+
+def test_single_frame():
+    decoder = FrameDecoder()
+    assert decoder.feed(FRAME_A) == [FRAME_A]
+    assert decoder.pending_bytes() == 0
+    assert decoder.frames_decoded == 1
+
+
+def test_split_frame_byte_by_byte():
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(len(FRAME_A)):
+        frames += decoder.feed(FRAME_A[i:i + 1])
+        if i < len(FRAME_A) - 1:
+            assert frames == []
+    assert frames == [FRAME_A]
+
+
+def test_merged_frames():
+    decoder = FrameDecoder()
+    assert decoder.feed(FRAME_A + FRAME_EMPTY + FRAME_B) == [FRAME_A, FRAME_EMPTY, FRAME_B]
+
+
+def test_merged_with_trailing_partial_frame():
+    decoder = FrameDecoder()
+    data = FRAME_A + FRAME_B
+    assert decoder.feed(data[:len(FRAME_A) + 3]) == [FRAME_A]
+    assert decoder.pending_bytes() == 3
+    assert decoder.feed(data[len(FRAME_A) + 3:]) == [FRAME_B]
+
+
+def test_garbage_before_and_between_frames():
+    decoder = FrameDecoder()
+    assert decoder.feed(b"\x00\x13\xAA" + FRAME_A + b"\x55\xFF" + FRAME_B) == [FRAME_A, FRAME_B]
+    assert decoder.bytes_discarded == 5
+
+
+def test_trailing_header_byte_is_kept():
+    decoder = FrameDecoder()
+    assert decoder.feed(b"\x00\x01" + FRAME_A[:1]) == []
+    assert decoder.feed(FRAME_A[1:]) == [FRAME_A]
+
+
+def test_checksum_error_resyncs():
+    corrupt = bytearray(FRAME_A)
+    corrupt[-3] ^= 0xFF
+    decoder = FrameDecoder()
+    assert decoder.feed(bytes(corrupt) + FRAME_B) == [FRAME_B]
+    assert decoder.checksum_errors == 1
+
+
+def test_bad_footer_resyncs():
+    corrupt = bytearray(FRAME_A)
+    corrupt[-1] = 0x00
+    decoder = FrameDecoder()
+    assert decoder.feed(bytes(corrupt) + FRAME_B) == [FRAME_B]
+    assert decoder.checksum_errors == 0
+
+
+def test_false_header_inside_payload():
+    # 数据区中的 AA 55 不影响按长度切帧
+    frame = frame_codec.encode(0x01, 0x00, b"\xAA\x55\x01")
+    decoder = FrameDecoder()
+    assert decoder.feed(frame + FRAME_A) == [frame, FRAME_A]
+
+
+def test_buffer_is_bounded():
+    decoder = FrameDecoder(max_buffer_size=64)
+    # 帧头后声明了很长的数据区，但对端一直不发完
+    decoder.feed(b"\xAA\x55\x01\x00\xFF" + bytes(200))
+    assert decoder.pending_bytes() <= 64
+
+
+def test_reset():
+    decoder = FrameDecoder()
+    decoder.feed(FRAME_A[:4])
+    decoder.reset()
+    assert decoder.pending_bytes() == 0
+    assert decoder.feed(FRAME_B) == [FRAME_B]
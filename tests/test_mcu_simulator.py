@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - MCU 仿真与故障注入测试
+"""
+
+import random
+import socket
+
+import pytest
+
+from config import Commands
+from serial_board_server import MockMCUServer
+from utils import frame_codec
+from utils.frame_decoder import FrameDecoder
+from utils.mcu_simulator import BoardSimulator, DriftingValue, FaultProfile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def payload(frame):
+    return frame[5:5 + frame[4]]
+
+
+def test_register_state_persists():
+    board = BoardSimulator(addresses=[1, 2], seed=1, clock=FakeClock())
+    assert payload(board.handle(frame_codec.encode(1, Commands.READ_SCR))) == b"\x48"
+    assert payload(board.handle(frame_codec.encode(1, Commands.WRITE_SCR, b"\x10"))) == b"\x06"
+    assert payload(board.handle(frame_codec.encode(1, Commands.READ_SCR))) == b"\x10"
+    assert payload(board.handle(frame_codec.encode(2, Commands.READ_SCR))) == b"\x48"
+    board.handle(frame_codec.encode(2, Commands.SET_CURRENT, b"\x64"))
+    assert board.devices[2].current == 100
+    assert board.devices[1].current == 0
+
+
+def test_broadcast_and_missing_address():
+    board = BoardSimulator(addresses=[1, 2], seed=1, clock=FakeClock())
+    reply = board.handle(frame_codec.encode(0xFF, Commands.WRITE_SCR, b"\x22"))
+    assert frame_codec.header(reply)[:2] == (0xFF, Commands.WRITE_SCR)
+    assert [d.scr for d in board.devices.values()] == [0x22, 0x22]
+    assert board.handle(frame_codec.encode(7, Commands.READ_SCR)) == b""
+    assert board.handle(b"\x55\xAA\x01") == b""
+
+
+def test_runtime_follows_clock():
+    clock = FakeClock()
+    board = BoardSimulator(addresses=[1], seed=1, clock=clock)
+    clock.now += 3600.7
+    assert frame_codec.decode_uint(board.handle(frame_codec.encode(1, Commands.GET_RUNTIME))) == 3600
+
+
+def test_same_seed_same_readings():
+    def readings(seed):
+        clock = FakeClock()
+        board = BoardSimulator(addresses=[1], seed=seed, clock=clock)
+        result = []
+        for _ in range(20):
+            clock.now += 1.0
+            result.append(board.handle(frame_codec.encode(1, Commands.GET_TEMPERATURE)))
+            result.append(board.handle(frame_codec.encode(1, Commands.GET_VOLTAGE)))
+        return result
+
+    assert readings(5) == readings(5)
+    assert readings(5) != readings(6)
+
+
+def test_current_shifts_telemetry_means():
+    board = BoardSimulator(addresses=[1], seed=1, clock=FakeClock())
+    device = board.devices[1]
+    board.handle(frame_codec.encode(1, Commands.SET_CURRENT, b"\xC8"))
+    assert device.temperature.mean == pytest.approx(device.ambient + 20.0)
+    assert device.voltage.mean == pytest.approx(device.nominal_voltage - 200.0)
+
+
+def test_drifting_value_reverts_to_mean():
+    value = DriftingValue(50.0, 1.0, 10.0, random.Random(3), now=0.0)
+    value.value = 80.0
+    assert value.read(0.0) == 80.0  # 时间没有推进时不变
+    samples = [value.read(t) for t in range(100, 10100, 100)]
+    assert abs(sum(samples) / len(samples) - 50.0) < 0.5
+    assert 0.5 < (sum((s - 50.0) ** 2 for s in samples) / len(samples)) ** 0.5 < 1.5
+
+
+def test_fault_profile_dict_round_trip():
+    values = {"latency": 0.01, "command_latency": {"0xF6": 0.2}, "jitter": 0.005, "drop_rate": 0.1,
+              "corrupt_rate": 0.2, "split_rate": 0.3, "split_gap": 0.001, "merge_rate": 0.4, "merge_window": 0.02}
+    profile = FaultProfile.from_dict(values, seed=1)
+    assert profile.command_latency == {0xF6: 0.2}
+    assert profile.to_dict() == values
+    assert profile.is_active()
+    assert not FaultProfile().is_active()
+
+
+def test_service_delay():
+    profile = FaultProfile(latency=0.01, command_latency={0xF6: 0.5}, jitter=0.002, seed=1)
+    delays = [profile.service_delay(0x03) for _ in range(200)]
+    assert all(0.01 <= d < 0.012 for d in delays)
+    assert 0.5 <= profile.service_delay(0xF6) < 0.502
+
+
+def test_fault_rates_and_determinism():
+    def run(seed):
+        profile = FaultProfile(drop_rate=0.2, merge_rate=0.5, seed=seed)
+        return [profile.drop() for _ in range(5000)], [profile.merge() for _ in range(5000)]
+
+    drops, merges = run(9)
+    assert abs(sum(drops) / 5000 - 0.2) < 0.03
+    assert abs(sum(merges) / 5000 - 0.5) < 0.03
+    assert run(9) == (drops, merges)
+    assert not any(FaultProfile(seed=9).drop() for _ in range(100))
+
+
+def test_corrupt_breaks_checksum_only():
+    profile = FaultProfile(corrupt_rate=1.0, seed=2)
+    frame = frame_codec.encode(1, Commands.GET_TEMPERATURE, b"\x00\x2D")
+    corrupted = profile.corrupt(frame)
+    assert corrupted != frame
+    assert corrupted[:-3] == frame[:-3] and corrupted[-2:] == frame[-2:]
+    decoder = FrameDecoder()
+    assert decoder.feed(corrupted) == []
+    assert decoder.checksum_errors == 1
+    assert FaultProfile(seed=2).corrupt(frame) is frame
+
+
+def test_split_point_within_frame():
+    profile = FaultProfile(split_rate=1.0, seed=4)
+    frame = frame_codec.encode(1, Commands.GET_TEMPERATURE, b"\x00\x2D")
+    points = {profile.split_point(frame) for _ in range(500)}
+    assert points == set(range(1, len(frame)))
+    assert FaultProfile(seed=4).split_point(frame) == 0
+
+
+def test_server_split_and_merge_still_decode():
+    faults = FaultProfile(split_rate=0.5, split_gap=0.001, merge_rate=0.5, merge_window=0.005, seed=7)
+    server = MockMCUServer("127.0.0.1", 0, addresses=range(4), faults=faults, seed=7, quiet=True)
+    server.start_in_thread()
+    try:
+        requests = [frame_codec.encode(a, Commands.READ_SCR) for a in range(4)] * 25
+        decoder = FrameDecoder()
+        frames = []
+        with socket.create_connection(("127.0.0.1", server.ports[0]), timeout=5) as sock:
+            # 逐个请求等待应答，拆分/合并暂停期间之外的每个响应都有机会注入故障
+            for request in requests:
+                sock.sendall(request)
+                expected = len(frames) + 1
+                while len(frames) < expected:
+                    frames.extend(decoder.feed(sock.recv(4096)))
+        assert [frame[2] for frame in frames] == [frame[2] for frame in requests]
+        assert all(payload(frame) == b"\x48" for frame in frames)
+        assert server.counters["split"] > 0 and server.counters["merged"] > 0
+    finally:
+        server.stop()
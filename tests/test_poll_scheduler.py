@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 轮询调度器测试
+"""
+
+import pytest
+
+from utils.poll_scheduler import PollScheduler
+
+
+def test_phases_are_spread_within_interval():
+    scheduler = PollScheduler(clock=lambda: 0.0)
+    jobs = [scheduler.add(i, 1.0) for i in range(8)]
+    offsets = sorted(job.due for job in jobs)
+    assert offsets[0] == 0.0
+    assert all(0.0 <= due < 1.0 for due in offsets)
+    # 黄金分割相位：任意两个任务至少间隔 1/(2n) 周期
+    assert min(b - a for a, b in zip(offsets, offsets[1:])) > 1.0 / 16
+
+
+def test_explicit_phase_and_duplicate_add():
+    scheduler = PollScheduler(clock=lambda: 10.0)
+    job = scheduler.add("a", 2.0, phase=0.5)
+    assert job.due == 10.5
+    assert scheduler.add("a", 5.0) is job
+    assert job.interval == 2.0
+    assert len(scheduler) == 1 and "a" in scheduler
+
+
+def test_no_drift_when_processed_late():
+    scheduler = PollScheduler()
+    scheduler.add("a", 1.0, phase=0.0, now=0.0)
+    runs = []
+    # 每次都晚 0.3 秒处理，计划时间仍然是整秒
+    for tick in range(5):
+        now = tick + 0.3
+        for job in scheduler.pop_due(now):
+            runs.append(job.last_run)
+    assert runs == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert scheduler.next_deadline() == 5.0
+
+
+def test_skips_missed_rounds_after_stall():
+    scheduler = PollScheduler()
+    scheduler.add("a", 1.0, phase=0.0, now=0.0)
+    scheduler.pop_due(0.0)
+    due = scheduler.pop_due(10.5)
+    assert len(due) == 1
+    assert due[0].runs == 2
+    assert scheduler.next_deadline() == 11.0
+
+
+def test_pop_due_orders_by_deadline():
+    scheduler = PollScheduler()
+    scheduler.add("slow", 3.0, phase=0.2, now=0.0)
+    scheduler.add("fast", 1.0, phase=0.1, now=0.0)
+    assert [job.key for job in scheduler.pop_due(0.15)] == ["fast"]
+    assert [job.key for job in scheduler.pop_due(0.2)] == ["slow"]
+    assert scheduler.pop_due(1.0) == []
+    assert [job.key for job in scheduler.pop_due(1.1)] == ["fast"]
+
+
+def test_set_interval_reschedules():
+    scheduler = PollScheduler()
+    scheduler.add("a", 10.0, phase=0.0, now=0.0)
+    scheduler.pop_due(0.0)
+    assert scheduler.next_deadline() == 10.0
+    scheduler.set_interval("a", 2.0, now=1.0)
+    assert scheduler.next_deadline() == 2.0
+    # 旧的堆条目已失效，不会重复触发
+    assert [job.key for job in scheduler.pop_due(10.0)] == ["a"]
+    assert scheduler.next_deadline() == 12.0
+    scheduler.set_interval("a", 1.0, now=20.0)
+    assert scheduler.next_deadline() == 20.0
+
+
+def test_set_interval_before_first_run():
+    scheduler = PollScheduler()
+    scheduler.add("a", 10.0, phase=8.0, now=0.0)
+    scheduler.set_interval("a", 1.0, now=0.0)
+    assert scheduler.next_deadline() == 1.0
+
+
+def test_remove_and_clear():
+    scheduler = PollScheduler()
+    scheduler.add("a", 1.0, phase=0.0, now=0.0)
+    scheduler.add("b", 1.0, phase=0.5, now=0.0)
+    assert scheduler.remove("a").key == "a"
+    assert scheduler.remove("a") is None
+    assert scheduler.next_deadline() == 0.5
+    assert [job.key for job in scheduler.pop_due(5.0)] == ["b"]
+    scheduler.clear()
+    assert scheduler.next_deadline() is None
+    assert scheduler.pop_due(100.0) == []
+
+
+@pytest.mark.parametrize("interval", [0.1, 0.25, 1.0])
+def test_long_run_count_matches_interval(interval):
+    scheduler = PollScheduler()
+    scheduler.add("a", interval, phase=0.0, now=0.0)
+    runs = 0
+    now = 0.0
+    while now <= 100.0:
+        runs += len(scheduler.pop_due(now))
+        now += 0.07
+    assert abs(runs - (100.0 / interval + 1)) <= 1
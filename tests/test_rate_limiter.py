@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 令牌桶测试
+"""
+
+import pytest
+
+from utils.rate_limiter import TokenBucket
+
+
+def test_starts_full_and_drains_burst():
+    bucket = TokenBucket(10, burst=3, clock=lambda: 0.0)
+    assert [bucket.try_acquire(0.0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_refill_at_rate():
+    bucket = TokenBucket(10, burst=2, clock=lambda: 0.0)
+    bucket.try_acquire(0.0)
+    bucket.try_acquire(0.0)
+    assert not bucket.try_acquire(0.05)
+    assert bucket.delay(0.05) == pytest.approx(0.05)
+    assert bucket.try_acquire(0.1)
+    assert not bucket.try_acquire(0.1)
+
+
+def test_refill_capped_at_burst():
+    bucket = TokenBucket(10, burst=2, clock=lambda: 0.0)
+    bucket.try_acquire(0.0)
+    bucket.try_acquire(0.0)
+    assert [bucket.try_acquire(100.0) for _ in range(3)] == [True, True, False]
+
+
+def test_long_run_average_rate():
+    bucket = TokenBucket(50, burst=5, clock=lambda: 0.0)
+    granted = 0
+    now = 0.0
+    while now < 10.0:
+        while bucket.try_acquire(now):
+            granted += 1
+        now += 0.003
+    assert abs(granted - (50 * 10 + 5)) <= 2
+
+
+def test_default_burst_and_unlimited():
+    assert TokenBucket(100, clock=lambda: 0.0).burst == 10.0
+    assert TokenBucket(5, clock=lambda: 0.0).burst == 1.0
+    unlimited = TokenBucket(0, clock=lambda: 0.0)
+    assert all(unlimited.try_acquire(0.0) for _ in range(1000))
+    assert unlimited.delay(0.0) == 0.0
+
+
+def test_set_rate_clamps_tokens():
+    bucket = TokenBucket(10, burst=5, clock=lambda: 0.0)
+    bucket.set_rate(10, burst=2)
+    assert [bucket.try_acquire(0.0) for _ in range(3)] == [True, True, False]
+    bucket.set_rate(0)
+    assert bucket.try_acquire(0.0)
+
+
+def test_uses_clock_when_now_omitted():
+    now = [0.0]
+    bucket = TokenBucket(1, burst=1, clock=lambda: now[0])
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.delay() == pytest.approx(1.0)
+    now[0] = 1.0
+    assert bucket.try_acquire()
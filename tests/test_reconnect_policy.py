@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 自动重连策略测试
+"""
+
+import random
+
+import pytest
+
+from config import Config
+from utils.reconnect_policy import FAIL, HOLD, ReconnectBackoff, disconnect_policy
+
+
+def test_disconnect_policy():
+    assert disconnect_policy({"type": "temperature"}) == FAIL
+    assert disconnect_policy({"type": "voltage"}) == FAIL
+    assert disconnect_policy({"type": "current_setting"}) == HOLD
+    assert disconnect_policy(None) == HOLD
+    assert disconnect_policy({"type": "temperature", "on_disconnect": HOLD}) == HOLD
+    assert disconnect_policy({"type": "write_scr", "on_disconnect": FAIL}) == FAIL
+    assert disconnect_policy({"type": "write_scr", "on_disconnect": "bogus"}) == HOLD
+
+
+def test_exponential_growth_capped_without_jitter():
+    backoff = ReconnectBackoff(base_delay=1.0, max_delay=10.0, max_attempts=0, jitter=0)
+    assert [backoff.next_delay() for _ in range(6)] == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+    assert not backoff.exhausted()  # 0 表示不限次数
+
+
+def test_jitter_stays_within_bounds():
+    backoff = ReconnectBackoff(base_delay=1.0, max_delay=30.0, max_attempts=0, jitter=0.2, rng=random.Random(1))
+    for attempt in range(5):
+        nominal = min(30.0, 2 ** attempt)
+        assert nominal * 0.8 <= backoff.next_delay() <= nominal * 1.2
+
+
+def test_exhausted_and_reset():
+    backoff = ReconnectBackoff(base_delay=0.5, max_attempts=2, jitter=0)
+    backoff.next_delay()
+    assert not backoff.exhausted()
+    backoff.next_delay()
+    assert backoff.exhausted()
+    backoff.reset()
+    assert not backoff.exhausted()
+    assert backoff.next_delay() == pytest.approx(0.5)
+
+
+def test_from_config_defaults(tmp_path):
+    backoff = ReconnectBackoff.from_config(Config(str(tmp_path / "config.json")))
+    assert (backoff.base_delay, backoff.max_delay, backoff.max_attempts, backoff.jitter) == (1, 30, 3, 0.2)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 抓包与回放测试
+"""
+
+import pytest
+
+from core.replay import CaptureReplay, ReplayListener, create_replay_server, load_responses
+from utils import frame_codec
+from utils.wire_capture import KIND_RECV, KIND_SEND, WireCapture, read_capture
+
+BOARD = ("127.0.0.1", 9420)
+OTHER = ("127.0.0.1", 9421)
+
+
+class Recorder(ReplayListener):
+    def __init__(self):
+        self.responses = []
+
+    def on_response(self, endpoint, frame, context, rtt):
+        self.responses.append((endpoint, frame, context, rtt))
+
+
+def write_session(filename):
+    """两个端点的会话：响应被拆包、粘包，另有一帧未请求的响应和一个没有响应的请求"""
+    temperature = frame_codec.encode(0x01, 0xF6)
+    voltage = frame_codec.encode(0x02, 0xF7)
+    temperature_reply = frame_codec.encode(0x01, 0xF6, b"\x00\x63")
+    voltage_reply = frame_codec.encode(0x02, 0xF7, b"\x00\xF0")
+    capture = WireCapture(str(filename))
+    capture.record_send(BOARD, temperature, {"type": "temperature", "address": 1, "future": object()})
+    capture.record_send(BOARD, voltage, {"type": "voltage", "address": 2})
+    capture.record_recv(BOARD, temperature_reply[:4])
+    capture.record_recv(BOARD, temperature_reply[4:] + voltage_reply)
+    capture.record_send(OTHER, temperature, None)
+    capture.record_recv(OTHER, frame_codec.encode(0x05, 0x03, b"\x01"))
+    capture.record_send(OTHER, voltage, {"type": "voltage"})
+    capture.close()
+    return temperature_reply, voltage_reply
+
+
+def test_capture_file_round_trip(tmp_path):
+    filename = tmp_path / "session.sbcap"
+    write_session(filename)
+    started_at, records = read_capture(str(filename))
+    records = list(records)
+    assert started_at > 0
+    assert [r.kind for r in records] == [KIND_SEND, KIND_SEND, KIND_RECV, KIND_RECV, KIND_SEND, KIND_RECV, KIND_SEND]
+    assert [r.endpoint for r in records] == [BOARD] * 4 + [OTHER] * 3
+    # 运行时对象不写入上下文
+    assert records[0].context == {"type": "temperature", "address": 1}
+    assert records[4].context is None
+    assert records[2].data + records[3].data == frame_codec.encode(0x01, 0xF6, b"\x00\x63") + \
+        frame_codec.encode(0x02, 0xF7, b"\x00\xF0")
+    assert all(a.timestamp <= b.timestamp for a, b in zip(records, records[1:]))
+
+
+def test_replay_matches_responses(tmp_path):
+    filename = tmp_path / "session.sbcap"
+    temperature_reply, voltage_reply = write_session(filename)
+    recorder = Recorder()
+    stats = CaptureReplay(str(filename), speed=0, listener=recorder).run()
+    assert stats["sent"] == 4
+    assert stats["frames"] == 3
+    assert stats["matched"] == 2
+    assert stats["unsolicited"] == 1
+    assert stats["unanswered"] == 2
+    assert stats["checksum_errors"] == 0
+    assert [(r[0], r[1], r[2]) for r in recorder.responses[:2]] == [
+        (BOARD, temperature_reply, {"type": "temperature", "address": 1}),
+        (BOARD, voltage_reply, {"type": "voltage", "address": 2}),
+    ]
+    assert all(r[3] >= 0 for r in recorder.responses[:2])
+    assert recorder.responses[2][2:] == (None, None)
+    assert set(stats["rtt_ms"]) == {"min", "p50", "p95", "max"}
+
+
+def test_truncated_capture_is_tolerated(tmp_path):
+    filename = tmp_path / "session.sbcap"
+    write_session(filename)
+    data = filename.read_bytes()
+    filename.write_bytes(data[:-3])
+    _, records = read_capture(str(filename))
+    assert len(list(records)) == 6
+
+
+def test_not_a_capture(tmp_path):
+    filename = tmp_path / "bogus.sbcap"
+    filename.write_bytes(b"hello world")
+    with pytest.raises(ValueError):
+        read_capture(str(filename))
+
+
+def test_replay_server_returns_recorded_responses(tmp_path):
+    filename = tmp_path / "session.sbcap"
+    temperature_reply, voltage_reply = write_session(filename)
+    responses = load_responses(str(filename))
+    assert list(responses) == [(0x01, 0xF6), (0x02, 0xF7)]
+    server = create_replay_server(str(filename), "127.0.0.1", 0, speed=0)
+    frame, delay = server.handle_request(frame_codec.encode(0x01, 0xF6))
+    assert (frame, delay) == (temperature_reply, 0.0)
+    # 记录的响应用完后回到模拟器的默认应答
+    frame, _ = server.handle_request(frame_codec.encode(0x01, 0xF6))
+    assert frame != temperature_reply
+    assert frame_codec.header(frame)[:2] == (0x01, 0xF6)
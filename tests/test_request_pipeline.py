@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 流水线请求窗口测试
+"""
+
+from config import Commands
+from utils import frame_codec
+from utils.request_pipeline import BROADCAST_ADDRESS, DUPLICATE, InFlightWindow, mark_sent, request_key
+
+TEMP = Commands.GET_TEMPERATURE
+VOLT = Commands.GET_VOLTAGE
+
+
+def request(address, command=TEMP):
+    return frame_codec.encode(address, command)
+
+
+def reply(address, command=TEMP, value=45):
+    return frame_codec.encode(address, command, value.to_bytes(2, "big"))
+
+
+def test_request_key():
+    assert request_key(request(3)) == (3, TEMP)
+    assert request_key(b"\x01\x02\x03") is None
+
+
+def test_fifo_matching_per_key():
+    window = InFlightWindow(8, 1.0)
+    window.add(request(1), {"n": 1}, now=0)
+    window.add(request(2), {"n": 2}, now=0)
+    window.add(request(1), {"n": 3}, now=0)
+    assert len(window) == 3
+    assert window.match(reply(1), now=0.1).context == {"n": 1}
+    assert window.match(reply(2), now=0.1).context == {"n": 2}
+    assert window.match(reply(1), now=0.1).context == {"n": 3}
+    assert window.match(reply(1), now=0.1) is None  # 主动上报
+    assert len(window) == 0
+
+
+def test_broadcast_reply_carries_device_address():
+    window = InFlightWindow(8, 1.0)
+    window.add(request(BROADCAST_ADDRESS), {"n": "broadcast"}, now=0)
+    window.add(request(5), {"n": 5}, now=0)
+    # 有对应地址的在途请求时优先匹配它
+    assert window.match(reply(5), now=0.1).context == {"n": 5}
+    assert window.match(reply(7), now=0.1).context == {"n": "broadcast"}
+    assert window.match(reply(7, VOLT), now=0.1) is None
+
+
+def test_custom_frames_match_in_send_order():
+    window = InFlightWindow(8, 1.0)
+    window.add(b"\x01\x02", {"n": 1}, now=0)
+    window.add(b"\x03", {"n": 2}, now=0)
+    assert window.match(reply(9), now=0.1).context == {"n": 1}
+    assert window.match(b"\xff", now=0.1).context == {"n": 2}
+
+
+def test_is_full():
+    window = InFlightWindow(2, 1.0)
+    window.add(request(1), now=0)
+    assert not window.is_full()
+    window.add(request(2), now=0)
+    assert window.is_full()
+    window.match(reply(1), now=0)
+    assert not window.is_full()
+
+
+def test_expire_and_next_deadline():
+    window = InFlightWindow(8, 1.0)
+    window.add(request(1), {"n": 1}, now=0)
+    window.add(request(2), {"n": 2}, timeout=0.5, now=0)
+    assert window.next_deadline() == 0.5
+    assert window.expire(now=0.4) == []
+    assert [p.context for p in window.expire(now=0.5)] == [{"n": 2}]
+    # 已匹配的请求不会再超时
+    window.match(reply(1), now=0.6)
+    assert window.next_deadline() is None
+    assert window.expire(now=5) == []
+
+
+def test_clear_returns_unfinished_in_send_order():
+    window = InFlightWindow(8, 1.0)
+    window.add(request(1), {"n": 1}, timeout=2, now=0)
+    window.add(request(2), {"n": 2}, timeout=1, now=0)
+    window.add(request(3), {"n": 3}, now=0)
+    window.match(reply(3), now=0)
+    assert [p.context for p in window.clear()] == [{"n": 1}, {"n": 2}]
+    assert len(window) == 0
+    assert window.match(reply(1), now=0) is None
+
+
+def test_late_reply_after_retransmit_is_dropped():
+    window = InFlightWindow(8, 1.0)
+    window.add(request(1), {"n": 1}, now=0)
+    [pending] = window.expire(now=1.0)
+    window.add(pending.frame, pending.context, 1.0, now=1.0, attempts=1)
+    # 原始请求的迟到响应匹配重发的请求
+    assert window.match(reply(1), now=1.2).context == {"n": 1}
+    window.add(request(1), {"n": 2}, now=1.3)
+    # 重发的响应随后到达，不能错配给新请求
+    assert window.match(reply(1), now=1.4) is DUPLICATE
+    assert window.match(reply(1), now=1.5).context == {"n": 2}
+    assert window.duplicates_dropped == 1
+
+
+def test_missing_duplicate_expires():
+    window = InFlightWindow(8, 1.0)
+    window.add(request(1), {"n": 1}, now=0)
+    [pending] = window.expire(now=1.0)
+    window.add(pending.frame, pending.context, 1.0, now=1.0, attempts=1)
+    assert window.match(reply(1), now=1.2).context == {"n": 1}
+    # 原始请求确实丢失，一个超时周期后不再丢弃同类响应
+    window.add(request(1), {"n": 2}, now=3.0)
+    assert window.match(reply(1), now=3.1).context == {"n": 2}
+    assert window.duplicates_dropped == 0
+
+
+def test_mark_sent_keeps_first_send_time():
+    context = {}
+    mark_sent(context, now=1.0)
+    mark_sent(context, now=2.0)
+    assert context == {"wire_sent_at": 1.0}
+    mark_sent(None)
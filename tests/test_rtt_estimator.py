@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 自适应超时测试
+"""
+
+import pytest
+
+from config import Commands
+from utils.request_pipeline import PendingRequest
+from utils.rtt_estimator import AdaptiveTimeouts, RttEstimator
+
+
+def pending(command=Commands.GET_TEMPERATURE, sent_at=0.0, attempts=0, address=1):
+    return PendingRequest(0, (address, command), b"", None, sent_at, sent_at + 1, attempts)
+
+
+def test_initial_rto():
+    assert RttEstimator(initial_rto=3.0).rto == 3.0
+
+
+def test_first_sample():
+    est = RttEstimator(min_rto=0.0)
+    est.update(0.1)
+    assert est.srtt == pytest.approx(0.1)
+    assert est.rttvar == pytest.approx(0.05)
+    assert est.rto == pytest.approx(0.1 + 4 * 0.05)
+
+
+def test_subsequent_sample_rfc6298():
+    est = RttEstimator(min_rto=0.0)
+    est.update(0.1)
+    est.update(0.2)
+    # RTTVAR = 3/4 * 0.05 + 1/4 * |0.1 - 0.2|，SRTT = 7/8 * 0.1 + 1/8 * 0.2
+    assert est.rttvar == pytest.approx(0.0625)
+    assert est.srtt == pytest.approx(0.1125)
+    assert est.rto == pytest.approx(0.1125 + 4 * 0.0625)
+    assert est.samples == 2
+
+
+def test_rto_bounds_and_granularity():
+    est = RttEstimator(min_rto=0.02, max_rto=1.0, granularity=0.001)
+    for _ in range(100):
+        est.update(0.001)
+    assert est.rto == 0.02
+    est = RttEstimator(min_rto=0.0, granularity=0.01)
+    for _ in range(100):
+        est.update(0.05)
+    assert est.rto == pytest.approx(est.srtt + 0.01)
+    est = RttEstimator(max_rto=1.0)
+    est.update(5.0)
+    assert est.rto == 1.0
+
+
+def test_timeout_falls_back_to_board_estimate():
+    timeouts = AdaptiveTimeouts(initial_rto=3.0, min_rto=0.0)
+    key = (1, Commands.GET_VOLTAGE)
+    assert timeouts.timeout_for(key) == 3.0
+    timeouts.on_response(pending(Commands.GET_TEMPERATURE, sent_at=0.0), 0.1)
+    # 电压还没有样本，使用整板估计
+    assert timeouts.timeout_for(key) == pytest.approx(0.3)
+    assert timeouts.timeout_for((1, Commands.GET_TEMPERATURE)) == pytest.approx(0.3)
+
+
+def test_exponential_backoff_capped():
+    timeouts = AdaptiveTimeouts(initial_rto=3.0, min_rto=0.0, max_rto=3.0)
+    timeouts.on_response(pending(sent_at=0.0), 0.1)
+    key = (1, Commands.GET_TEMPERATURE)
+    assert timeouts.timeout_for(key, 1) == pytest.approx(0.6)
+    assert timeouts.timeout_for(key, 2) == pytest.approx(1.2)
+    assert timeouts.timeout_for(key, 5) == 3.0
+
+
+def test_karn_ignores_retransmitted_samples():
+    timeouts = AdaptiveTimeouts()
+    timeouts.on_response(pending(sent_at=0.0, attempts=1), 2.0)
+    assert timeouts.srtt is None
+    assert timeouts.commands == {}
+
+
+def test_should_retry_only_idempotent_within_limit():
+    timeouts = AdaptiveTimeouts(max_retries=2)
+    assert timeouts.should_retry(pending(Commands.GET_TEMPERATURE))
+    assert timeouts.should_retry(pending(Commands.READ_SCR, attempts=1))
+    assert not timeouts.should_retry(pending(Commands.GET_TEMPERATURE, attempts=2))
+    assert not timeouts.should_retry(pending(Commands.SET_CURRENT))
+    assert not timeouts.should_retry(PendingRequest(0, None, b"", None, 0, 1))
+
+
+def test_dead_link_after_consecutive_timeouts():
+    timeouts = AdaptiveTimeouts(dead_after=3)
+    assert not timeouts.on_timeout()
+    assert not timeouts.on_timeout()
+    timeouts.on_response(pending(), 0.1)  # 收到响应重新计数
+    assert not timeouts.on_timeout()
+    assert not timeouts.on_timeout()
+    assert timeouts.on_timeout()
+    assert not AdaptiveTimeouts(dead_after=0).on_timeout()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 优先级任务调度器测试
+"""
+
+import queue
+
+import pytest
+
+from config import Commands
+from utils import frame_codec
+from utils.task_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, TaskScheduler, classify
+
+
+def temperature(address=1):
+    return frame_codec.encode(address, Commands.GET_TEMPERATURE), {"type": "temperature", "address": address}
+
+
+def set_current(address, value):
+    frame = frame_codec.encode(address, Commands.SET_CURRENT, bytes([value]))
+    return frame, {"type": "current_setting", "address": address, "value": value}
+
+
+def drain(scheduler):
+    items = []
+    while not scheduler.empty():
+        items.append(scheduler.get_nowait())
+    return items
+
+
+def test_classify():
+    frame, context = temperature()
+    assert classify(frame, context) == (PRIORITY_BACKGROUND, ("temperature", 1, Commands.GET_TEMPERATURE), "drop")
+    frame, context = set_current(2, 10)
+    assert classify(frame, context) == (PRIORITY_INTERACTIVE, ("current_setting", 2, Commands.SET_CURRENT), "replace")
+    assert classify(frame, dict(context, coalesce=False)) == (PRIORITY_INTERACTIVE, None, None)
+    assert classify(frame, dict(context, priority=5))[0] == 5
+    assert classify(b"\x01\x02", None) == (PRIORITY_INTERACTIVE, None, None)
+
+
+def test_interactive_before_background_fifo_within_priority():
+    scheduler = TaskScheduler()
+    scheduler.put(temperature(1))
+    scheduler.put(temperature(2))
+    scheduler.put(set_current(3, 10))
+    scheduler.put(set_current(4, 20))
+    order = [(c["type"], c["address"]) for _, c in drain(scheduler)]
+    assert order == [("current_setting", 3), ("current_setting", 4), ("temperature", 1), ("temperature", 2)]
+
+
+def test_replace_keeps_position_and_latest_value():
+    coalesced = []
+    scheduler = TaskScheduler(on_coalesced=lambda dropped, kept: coalesced.append((dropped["value"], kept["value"])))
+    assert scheduler.put(set_current(1, 10))
+    assert scheduler.put(set_current(2, 50))
+    assert not scheduler.put(set_current(1, 20))
+    assert scheduler.qsize() == 2
+    items = drain(scheduler)
+    assert [(c["address"], c["value"]) for _, c in items] == [(1, 20), (2, 50)]
+    assert items[0][0] == set_current(1, 20)[0]
+    assert coalesced == [(10, 20)]
+    assert scheduler.replaced == 1
+
+
+def test_drop_keeps_queued_request():
+    coalesced = []
+    scheduler = TaskScheduler(on_coalesced=lambda dropped, kept: coalesced.append((dropped, kept)))
+    first = temperature(1)
+    second = temperature(1)
+    assert scheduler.put(first)
+    assert not scheduler.put(second)
+    assert drain(scheduler) == [first]
+    assert coalesced == [(second[1], first[1])]
+    assert scheduler.dropped == 1
+    # 出队后同类请求可以重新排队
+    assert scheduler.put(second)
+
+
+def test_coalesce_false_is_never_merged():
+    scheduler = TaskScheduler()
+    frame, context = set_current(1, 10)
+    scheduler.put((frame, dict(context, coalesce=False)))
+    scheduler.put((frame, dict(context, coalesce=False)))
+    assert scheduler.qsize() == 2
+
+
+def test_requeue_after_disconnect_keeps_newer_queued_request():
+    coalesced = []
+    scheduler = TaskScheduler(on_coalesced=lambda dropped, kept: coalesced.append((dropped["value"], kept["value"])))
+    in_flight = set_current(1, 10)
+    scheduler.put(in_flight)
+    scheduler.get_nowait()  # 已发送，在途
+    scheduler.put(set_current(1, 200))  # 断线前又提交了新值
+    assert not scheduler.requeue(in_flight)
+    assert coalesced == [(10, 200)]
+    assert [c["value"] for _, c in drain(scheduler)] == [200]
+
+
+def test_requeue_without_conflict_is_queued():
+    scheduler = TaskScheduler()
+    item = set_current(1, 10)
+    assert scheduler.requeue(item)
+    assert scheduler.get_nowait() == item
+
+
+def test_remove_if_and_clear_preserve_order():
+    scheduler = TaskScheduler()
+    scheduler.put(temperature(1))
+    scheduler.put(set_current(1, 10))
+    scheduler.put(temperature(2))
+    removed = scheduler.remove_if(lambda frame, context: context["type"] == "temperature")
+    assert [c["address"] for _, c in removed] == [1, 2]
+    assert scheduler.qsize() == 1
+    # 合并键随之释放
+    assert scheduler.put(temperature(1))
+    assert [c["type"] for _, c in scheduler.clear()] == ["current_setting", "temperature"]
+    assert scheduler.empty()
+
+
+def test_get_timeout():
+    scheduler = TaskScheduler()
+    with pytest.raises(queue.Empty):
+        scheduler.get(timeout=0.01)
+    with pytest.raises(queue.Empty):
+        scheduler.get_nowait()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 遥测数据存档测试
+"""
+
+import os
+
+import pytest
+
+from utils.telemetry_archive import RAW_RECORD, TelemetryArchive, _series_path
+
+BOARD = ("10.0.0.1", 9420)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    yield archive
+    archive.close()
+
+
+def fill(archive, samples, address=1, metric="temperature"):
+    for timestamp, value in samples:
+        archive.append(BOARD, address, metric, value, timestamp=timestamp)
+    archive.close()
+
+
+def test_raw_range_read(archive):
+    fill(archive, [(1000.0 + i, float(i)) for i in range(100)])
+    kind, rows = archive.read(BOARD, 1, "temperature", start=1010, end=1019.5)
+    assert kind == "raw"
+    assert rows == [(1000.0 + i, float(i)) for i in range(10, 20)]
+    assert archive.read(BOARD, 1, "temperature", start=5000)[1] == []
+    assert archive.read(BOARD, 2, "temperature") == ("raw", [])  # 没有文件
+    assert archive.written == 100
+
+
+def test_tier_rollup(archive):
+    # 每秒 4 个样本，共 3 分钟
+    fill(archive, [(600.0 + i * 0.25, float(i % 8)) for i in range(4 * 180)])
+    seconds = archive.read_tier(BOARD, 1, "temperature", "1s")
+    assert len(seconds) == 180
+    start, count, low, high, mean = seconds[0]
+    assert (start, count, low, high, mean) == (600.0, 4, 0.0, 3.0, 1.5)
+    minutes = archive.read_tier(BOARD, 1, "temperature", "1m")
+    assert [m[0] for m in minutes] == [600.0, 660.0, 720.0]
+    assert all(m[1] == 240 and m[2] == 0.0 and m[3] == 7.0 and m[4] == pytest.approx(3.5) for m in minutes)
+    hours = archive.read_tier(BOARD, 1, "temperature", "1h")
+    assert hours == [(0.0, 720, 0.0, 7.0, pytest.approx(3.5))]
+
+
+def test_read_picks_coarse_tier_for_long_ranges(archive):
+    fill(archive, [(i * 10.0, 1.0) for i in range(3000)])  # 约 8 小时
+    kind, rows = archive.read(BOARD, 1, "temperature", max_points=1000)
+    assert kind == "1m"
+    assert len(rows) <= 1000
+    kind, _ = archive.read(BOARD, 1, "temperature", max_points=100)
+    assert kind == "1h"
+
+
+def test_bucket_split_across_runs_is_merged(tmp_path):
+    first = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    fill(first, [(60.0, 1.0), (61.0, 3.0)])
+    second = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    fill(second, [(62.0, 5.0)])
+    assert second.read_tier(BOARD, 1, "temperature", "1m") == [(60.0, 3, 1.0, 5.0, pytest.approx(3.0))]
+
+
+def test_clock_step_backwards_is_clamped(tmp_path):
+    archive = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    fill(archive, [(100.0, 1.0), (101.0, 2.0), (50.0, 3.0), (102.0, 4.0)])
+    assert archive.clamped == 1
+    _, rows = archive.read(BOARD, 1, "temperature", start=101, end=101.5)
+    assert rows == [(101.0, 2.0), (101.0, 3.0)]
+    # 重启后时钟仍在回拨前
+    again = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    fill(again, [(60.0, 5.0)])
+    assert again.clamped == 1
+    assert again.read(BOARD, 1, "temperature", start=102)[1] == [(102.0, 4.0), (102.0, 5.0)]
+
+
+def test_partial_trailing_record_is_truncated(tmp_path):
+    archive = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    fill(archive, [(1.0, 1.0)])
+    raw = _series_path(str(tmp_path), BOARD, 1, "temperature") + ".raw"
+    with open(raw, "ab") as f:
+        f.write(b"\x00\x01\x02")  # 写到一半时退出
+    again = TelemetryArchive(str(tmp_path), flush_interval=0.01)
+    fill(again, [(2.0, 2.0)])
+    assert os.path.getsize(raw) == 2 * RAW_RECORD.size
+    assert again.read(BOARD, 1, "temperature")[1] == [(1.0, 1.0), (2.0, 2.0)]
+
+
+def test_append_after_close_is_ignored(archive):
+    archive.close()
+    archive.append(BOARD, 1, "temperature", 1.0)
+    assert archive.written == 0
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 遥测环形缓冲区测试
+"""
+
+import random
+
+import pytest
+
+from utils.telemetry_store import RingBuffer, TelemetryStore
+
+
+def fill(buffer, count, first=0):
+    for i in range(first, first + count):
+        buffer.append(float(i), timestamp=float(i))
+
+
+def flatten(segments):
+    return [(t, v) for times, values in segments for t, v in zip(times, values)]
+
+
+def test_grows_on_demand():
+    buffer = RingBuffer(capacity=100, initial_size=4)
+    fill(buffer, 10)
+    assert len(buffer) == 10
+    assert len(buffer._times) == 16
+    assert buffer.values() == [float(i) for i in range(10)]
+
+
+def test_wraparound_keeps_newest():
+    buffer = RingBuffer(capacity=8, initial_size=8)
+    fill(buffer, 13)
+    assert len(buffer) == 8
+    assert buffer.total == 13
+    assert buffer.first_time() == 5.0
+    assert buffer.latest() == (12.0, 12.0)
+    assert buffer.values() == [float(i) for i in range(5, 13)]
+    segments = buffer.segments()
+    assert len(segments) == 2  # 环绕时为两段
+    assert flatten(segments) == [(float(i), float(i)) for i in range(5, 13)]
+
+
+def test_window_and_tail_across_wrap():
+    buffer = RingBuffer(capacity=8, initial_size=8)
+    fill(buffer, 13)
+    assert buffer.values(6.5, 10.0) == [7.0, 8.0, 9.0, 10.0]
+    assert buffer.values(None, 5.0) == [5.0]
+    assert buffer.values(20.0) == []
+    assert flatten(buffer.tail(3)) == [(10.0, 10.0), (11.0, 11.0), (12.0, 12.0)]
+    assert buffer.bounds(7.0, 7.0) == (2, 3)
+
+
+@pytest.mark.parametrize("count", [5, 8, 9, 15, 23])
+def test_bisect_matches_time_order(count):
+    buffer = RingBuffer(capacity=8, initial_size=2)
+    fill(buffer, count)
+    times = [buffer.time_at(i) for i in range(len(buffer))]
+    assert times == sorted(times)
+    for probe in [t + d for t in times for d in (-0.5, 0.0, 0.5)]:
+        assert buffer.bisect_left(probe) == sum(t < probe for t in times)
+        assert buffer.bisect_right(probe) == sum(t <= probe for t in times)
+
+
+def test_minmax_matches_brute_force_across_wrap():
+    random.seed(7)
+    buffer = RingBuffer(capacity=300, initial_size=16)
+    kept = []
+    for i in range(1000):
+        value = random.uniform(-50, 50)
+        buffer.append(value, timestamp=float(i))
+        kept = (kept + [value])[-300:]
+        if i % 37 == 0:
+            for _ in range(5):
+                first = random.randrange(len(kept))
+                last = random.randrange(first + 1, len(kept) + 1)
+                assert buffer.minmax(first, last) == (min(kept[first:last]), max(kept[first:last]))
+    assert buffer.minmax() == (min(kept), max(kept))
+    assert buffer.minmax(10, 10) is None
+
+
+def test_minmax_after_extreme_overwritten():
+    buffer = RingBuffer(capacity=64, initial_size=64)
+    buffer.append(1000.0, timestamp=0.0)
+    fill(buffer, 63, first=1)
+    assert buffer.minmax()[1] == 1000.0
+    buffer.append(0.5, timestamp=64.0)  # 覆盖掉最大值
+    assert buffer.minmax() == (0.5, 63.0)
+
+
+def test_clear():
+    buffer = RingBuffer(capacity=8, initial_size=8)
+    fill(buffer, 13)
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.latest() is None and buffer.first_time() is None
+    assert buffer.segments() == [] and buffer.minmax() is None
+    buffer.append(3.0, timestamp=100.0)
+    assert buffer.values() == [3.0]
+    assert buffer.minmax() == (3.0, 3.0)
+
+
+def test_store_series():
+    store = TelemetryStore(capacity=4)
+    for i in range(6):
+        store.append("a:1", 3, "temperature", float(i), timestamp=float(i))
+    store.append("b:1", 3, "temperature", 9.0, timestamp=0.0)
+    assert store.series("a:1", 3, "temperature").values() == [2.0, 3.0, 4.0, 5.0]
+    assert store.latest("a:1", 3, "temperature") == (5.0, 5.0)
+    assert store.latest("a:1", 3, "voltage") is None
+    store.remove("a:1")
+    assert store.keys() == [("b:1", 3, "temperature")]
+    store.remove()
+    assert store.keys() == []
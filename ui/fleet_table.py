@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 设备总览表
+
+FleetTableModel 为每个 (转发板, 设备地址) 保存一行：最新温度、电压、SCR、设定电流、
+最后响应时间和链路往返时间。record() 只修改模型内的数据并记下变化的单元格，
+定时器按 ui.fleet_fps 把同一列中连续变化的行合并为一个 dataChanged 发出，
+值没有变化的单元格不发信号，也从不重置模型；新出现的设备行同样在定时器中一次性插入。
+
+"最后响应" 列显示的是距今秒数，每秒对整列发一次 dataChanged；排序时使用原始时间戳
+（SORT_ROLE），所以该列的刷新不会改变行的顺序。
+
+FleetPanel 把模型放进 QSortFilterProxyModel 和 QTableView：点击表头排序，输入框按
+任意列的显示文本过滤，数千行时也只重绘可见的单元格。
+"""
+
+import math
+import time
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QHeaderView, QLineEdit, QTableView, QVBoxLayout, QWidget
+
+from config import get_config
+from utils.request_pipeline import BROADCAST_ADDRESS
+
+# 列
+COL_BOARD = 0
+COL_ADDRESS = 1
+COL_TEMPERATURE = 2
+COL_VOLTAGE = 3
+COL_SCR = 4
+COL_CURRENT = 5
+COL_LAST_SEEN = 6
+COL_RTT = 7
+
+HEADERS = ("转发板", "地址", "温度 (°C)", "电压 (V)", "SCR", "设定电流", "最后响应", "RTT (ms)")
+
+# record() 的字段名 -> 列
+FIELDS = {
+    "temperature": COL_TEMPERATURE,
+    "voltage": COL_VOLTAGE,
+    "scr": COL_SCR,
+    "current": COL_CURRENT,
+}
+
+SORT_ROLE = Qt.UserRole  # 排序用的原始值
+KEY_ROLE = Qt.UserRole + 1  # (端点, 地址)
+
+AGE_REFRESH_INTERVAL = 1000  # "最后响应" 列的刷新周期（毫秒）
+
+
+def _endpoint_text(endpoint):
+    if isinstance(endpoint, tuple):
+        return f"{endpoint[0]}:{endpoint[1]}"
+    return str(endpoint) if endpoint is not None else "-"
+
+
+def _runs(rows):
+    """把行号集合拆成连续区间 [(起始行, 结束行)]"""
+    runs = []
+    for row in sorted(rows):
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+
+class FleetTableModel(QAbstractTableModel):
+    """所有转发板、所有设备地址的最新状态
+
+    rtt_source(端点) 返回该转发板链路的平滑往返时间（秒）或 None，随 "最后响应" 列每秒读取一次。
+    record() 只能在界面线程调用。
+    """
+
+    def __init__(self, rtt_source=None, fps=None, parent=None):
+        super().__init__(parent)
+        self.rtt_source = rtt_source
+        self._rows = []  # 每行一个列表，按 HEADERS 顺序保存原始值
+        self._published = 0  # 已通知视图的行数，之后的行在下次 flush 时插入
+        self._index = {}  # (端点, 地址) -> 行号
+        self._endpoint_rows = {}  # 端点 -> [行号]
+        self._dirty = {}  # 列 -> {行号}
+
+        # 统计信息
+        self.cells_changed = 0
+        self.signals_emitted = 0
+
+        fps = fps or get_config().get('ui.fleet_fps', 10)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(max(1, int(1000 / fps)))
+        self._flush_timer.timeout.connect(self.flush)
+        self._age_timer = QTimer(self)
+        self._age_timer.timeout.connect(self.refresh_age)
+        self._age_timer.start(AGE_REFRESH_INTERVAL)
+
+    # QAbstractTableModel 接口
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._published
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        value = row[column]
+        if role == Qt.DisplayRole:
+            return self._display(column, value)
+        if role == SORT_ROLE:
+            if column == COL_BOARD:
+                return _endpoint_text(value)
+            # 没有数据的单元格排在最前（升序）
+            return value if value is not None else -math.inf
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter) if column == COL_BOARD else int(Qt.AlignCenter)
+        if role == KEY_ROLE:
+            return (row[COL_BOARD], row[COL_ADDRESS])
+        return None
+
+    @staticmethod
+    def _display(column, value):
+        if column == COL_BOARD:
+            return _endpoint_text(value)
+        if column == COL_ADDRESS:
+            return "广播" if value == BROADCAST_ADDRESS else f"{value:02X}"
+        if value is None:
+            return "--"
+        if column == COL_VOLTAGE:
+            return f"{value:.1f}"
+        if column == COL_SCR:
+            return f"0x{value:02X}"
+        if column == COL_LAST_SEEN:
+            age = time.monotonic() - value
+            return f"{age:.0f} 秒前" if age >= 1 else "刚刚"
+        if column == COL_RTT:
+            return f"{value * 1000:.1f}"
+        return str(value)
+
+    # 数据更新
+    def record(self, endpoint, address, **fields):
+        """记录一个设备的响应：更新最后响应时间和给出的字段（temperature/voltage/scr/current）"""
+        key = (endpoint, address)
+        row = self._index.get(key)
+        if row is None:
+            row = self._insert(endpoint, address)
+        values = self._rows[row]
+        values[COL_LAST_SEEN] = time.monotonic()  # 显示由 refresh_age 每秒刷新
+        for name, value in fields.items():
+            self._set(row, values, FIELDS[name], value)
+
+    def _insert(self, endpoint, address):
+        row = len(self._rows)
+        values = [None] * len(HEADERS)
+        values[COL_BOARD] = endpoint
+        values[COL_ADDRESS] = address
+        self._rows.append(values)
+        self._index[(endpoint, address)] = row
+        rows = self._endpoint_rows.setdefault(endpoint, [])
+        rows.append(row)
+        if len(rows) > 1:
+            values[COL_RTT] = self._rows[rows[0]][COL_RTT]
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+        return row
+
+    def _set(self, row, values, column, value):
+        if values[column] == value:
+            return
+        values[column] = value
+        self.cells_changed += 1
+        dirty = self._dirty.get(column)
+        if dirty is None:
+            dirty = self._dirty[column] = set()
+        dirty.add(row)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """插入新行，并为变化的单元格发出 dataChanged，同一列中连续的行合并为一个信号"""
+        dirty, self._dirty = self._dirty, {}
+        self._flush_timer.stop()
+        published = self._published
+        if len(self._rows) > published:
+            self.beginInsertRows(QModelIndex(), published, len(self._rows) - 1)
+            self._published = len(self._rows)
+            self.endInsertRows()
+        for column, rows in dirty.items():
+            # 本次新插入的行不需要 dataChanged
+            for start, end in _runs(row for row in rows if row < published):
+                self.dataChanged.emit(self.index(start, column), self.index(end, column), [Qt.DisplayRole])
+                self.signals_emitted += 1
+
+    def refresh_age(self):
+        """刷新 "最后响应" 列的显示，并读取各转发板的链路往返时间"""
+        if not self._published:
+            return
+        if self.rtt_source is not None:
+            for endpoint, rows in self._endpoint_rows.items():
+                rtt = self.rtt_source(endpoint)
+                for row in rows:
+                    self._set(row, self._rows[row], COL_RTT, rtt)
+        last = self._published - 1
+        self.dataChanged.emit(self.index(0, COL_LAST_SEEN), self.index(last, COL_LAST_SEEN), [Qt.DisplayRole])
+        self.signals_emitted += 1
+
+
+class FleetPanel(QWidget):
+    """设备总览：过滤输入框 + 可排序的表格"""
+    device_activated = pyqtSignal(object, int)  # 信号：双击的行对应的端点、设备地址
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setFilterKeyColumn(-1)  # 匹配任意列
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setDynamicSortFilter(True)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("过滤: 转发板 / 地址 / 数值")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(COL_ADDRESS, Qt.AscendingOrder)
+        self.view.setSelectionBehavior(QTableView.SelectRows)
+        self.view.setEditTriggers(QTableView.NoEditTriggers)
+        self.view.setAlternatingRowColors(True)
+        self.view.setWordWrap(False)
+        # 固定行高、按比例分配列宽，避免按内容测量数千行
+        vertical = self.view.verticalHeader()
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(22)
+        vertical.hide()
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.view.doubleClicked.connect(self._on_double_clicked)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.filter_input)
+        layout.addWidget(self.view)
+
+    def _on_double_clicked(self, index):
+        endpoint, address = self.proxy.data(index, KEY_ROLE)
+        self.device_activated.emit(endpoint, address)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 批量刷新的日志视图
+
+本控件不自己缓冲和定时：LogManager 的界面定时器（唯一的一层批处理，间隔 ui.log_flush_interval）
+把这段时间积累的多行通过 append_lines() 一次性追加到文档。文档块数由 setMaximumBlockCount
+限制；窗口不可见时不更新文档，重新显示时一次性重建。
+"""
+
+from collections import deque
+
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from config import get_config
+
+
+class LogView(QPlainTextEdit):
+    """有行数上限、按批追加的只读日志视图（只能在界面线程调用）"""
+
+    def __init__(self, max_lines=None, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines or get_config().get('ui.log_max_lines', 10000)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(self.max_lines)
+        self.setUndoRedoEnabled(False)
+        self._lines = deque(maxlen=self.max_lines)  # 最近的日志行（导出和重建用）
+        self._rebuild = False
+
+    def append_lines(self, lines):
+        """一次性追加多行"""
+        if not lines:
+            return
+        self._lines.extend(lines)
+        if self._rebuild or not self.isVisible():
+            # 不可见时不做排版，显示后用保留的行重建
+            self._rebuild = True
+            return
+
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        if len(lines) >= self.max_lines:
+            self.setPlainText("\n".join(self._lines))
+        else:
+            cursor = QTextCursor(self.document())
+            cursor.movePosition(QTextCursor.End)
+            if not self.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText("\n".join(lines))
+
+        # 用户向上翻看时不强制滚动到底部
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def append_line(self, text):
+        self.append_lines((text,))
+
+    def lines(self):
+        """当前保留的所有日志行"""
+        return list(self._lines)
+
+    def clear(self):
+        self._lines.clear()
+        self._rebuild = False
+        super().clear()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._rebuild:
+            self._rebuild = False
+            self.setPlainText("\n".join(self._lines))
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
@@ -3,18 +3,29 @@ import time
 from datetime import datetime
 from PyQt5.QtGui import QIcon, QFont, QColor, QPixmap
 from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QLabel, QLineEdit, QTextEdit,
+    QMainWindow, QWidget, QLabel, QLineEdit,
     QVBoxLayout, QHBoxLayout, QComboBox, QSlider, QStatusBar, QFileDialog,
     QGroupBox, QGridLayout, QSplitter, QGraphicsDropShadowEffect,
-    QProgressBar, QMessageBox, QApplication, QCheckBox
+    QProgressBar, QMessageBox, QCheckBox
 )
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QThread
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QThread
 
+from config import Commands, get_config
+from core.bulk import BulkOperation, parse_addresses
+from log import LogManager
 from ui.custom_widgets import TechButton
-from workers.communication_worker import CommunicationWorker
+from ui.fleet_table import FleetPanel, FleetTableModel
+from ui.log_view import LogView
+from ui.telemetry_chart import TelemetryChart
+from ui.ui_updater import UiUpdater
+from workers.connection_manager import ConnectionManager, parse_endpoints, format_endpoint
+from workers.replay_worker import ReplayWorker
 from workers.status_polling_worker import StatusPollingWorker
-from utils.serial_board_client import SerialBoardClient
+from utils import command_table
 from utils.response_handler import ResponseHandler
+from utils.telemetry_archive import TelemetryArchive
+from utils.telemetry_store import TelemetryStore
+from utils.wire_capture import WireCapture
 
 
 class MainWindow(QMainWindow):
@@ -26,11 +37,15 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1100, 700)
 
         # 初始化状态变量
-        self.client = SerialBoardClient()
-        self.temperature_history = [20] * 20  # 假数据用于初始化
-        self.voltage_history = [12] * 20  # 假数据用于初始化
+        # 每个 (转发板, 设备地址, 指标) 的历史数据，同时写入磁盘存档
+        archive = TelemetryArchive() if get_config().get('telemetry.archive_enabled', False) else None
+        self.telemetry = TelemetryStore(archive=archive)
         self.current_slider_value = 0
         self.response_handler = ResponseHandler(self)
+        # 遥测标签和动态样式的更新按最高帧率合并
+        self.ui_updater = UiUpdater(parent=self)
+        # 所有转发板、所有设备的最新状态（设备总览表）
+        self.fleet_model = FleetTableModel(rtt_source=self.link_rtt, parent=self)
 
         # 设置图标
         icon_path = "logo.png"
@@ -41,6 +56,9 @@ class MainWindow(QMainWindow):
 
         # 创建UI元素
         self.create_ui_elements()
+        config = get_config()
+        log_file = config.get('logging.file') if config.get('logging.file_enabled', False) else None
+        self.logger = LogManager(self.log_output, log_file, config.get('logging.console', False))
         self.init_ui()
         self.bind_events()
         self.apply_styles()
@@ -53,22 +71,24 @@ class MainWindow(QMainWindow):
 
     def setup_workers(self):
         """设置工作线程"""
-        # 通信工作线程
-        self.comm_worker = CommunicationWorker()
-        self.comm_thread = QThread()
-        self.comm_worker.moveToThread(self.comm_thread)
+        # 多板连接管理器，每个转发板有独立的通信对象和任务队列
+        self.connections = ConnectionManager()
+        self.replay_worker = None
+        self.replay_thread = None
+        # 按配置记录所有收发数据，供 python -m core.replay 回放
+        if get_config().get('capture.enabled', False):
+            self.connections.set_capture(WireCapture())
 
         # 连接信号和槽
-        self.comm_worker.response_received.connect(self.handle_response)
-        self.comm_worker.connection_error.connect(self.handle_connection_error)
-        self.comm_worker.connection_status_changed.connect(self.handle_connection_status)
-
-        # 启动通信线程
-        self.comm_thread.started.connect(self.comm_worker.run)
-        self.comm_thread.start()
+        self.connections.response_received.connect(self.handle_response)
+        self.connections.request_timeout.connect(self.handle_request_timeout)
+        self.connections.request_failed.connect(self.handle_request_failed)
+        self.connections.reconnecting.connect(self.handle_reconnecting)
+        self.connections.connection_error.connect(self.handle_connection_error)
+        self.connections.connection_status_changed.connect(self.handle_connection_status)
 
         # 状态查询工作线程
-        self.status_worker = StatusPollingWorker(self.comm_worker)
+        self.status_worker = StatusPollingWorker(self.connections)
         self.status_thread = QThread()
         self.status_worker.moveToThread(self.status_thread)
 
@@ -88,8 +108,8 @@ class MainWindow(QMainWindow):
         self.connect_btn = TechButton("连接系统")
         self.disconnect_btn = TechButton("断开连接")
         self.connection_indicator = QLabel()
+        self.connection_indicator.setObjectName("connectionIndicator")
         self.connection_indicator.setFixedSize(16, 16)
-        self.connection_indicator.setStyleSheet("background-color: #FF3333; border-radius: 8px;")
 
         # 设备选择区域
         self.device_selector = QComboBox()
@@ -99,6 +119,16 @@ class MainWindow(QMainWindow):
         self.scr_read_btn = TechButton("读取 SCR 数据")
         self.scr_write_btn = TechButton("写入 SCR 配置")
 
+        # 批量操作区域
+        self.bulk_op_selector = QComboBox()
+        self.bulk_op_selector.addItem("设置电流", "set-current")
+        self.bulk_op_selector.addItem("读取 SCR", "read-scr")
+        self.bulk_op_selector.addItem("写入 SCR", "write-scr")
+        self.bulk_address_input = QLineEdit("0-15")
+        self.bulk_address_input.setPlaceholderText("地址: 0-15 / 1,3,5 / all")
+        self.bulk_all_boards_checkbox = QCheckBox("所有转发板")
+        self.bulk_btn = TechButton("批量执行")
+
         # 电流控制滑块
         self.slider = QSlider(Qt.Horizontal)
         self.slider.setMinimum(0)
@@ -125,12 +155,23 @@ class MainWindow(QMainWindow):
         self.volt_label = QLabel("电压: -- V")
         self.time_label = QLabel("运行时间: 00:00:00")
         self.mcu_status_label = QLabel("系统状态: 离线")
+        self.poll_rate_label = QLabel("轮询速率: -- 次/秒")
+        self.poll_address_input = QLineEdit(str(get_config().get('polling.addresses', '0xFF')))
+        self.poll_address_input.setPlaceholderText("轮询地址: 0xFF / 0-15 / all")
+        self.poll_address_btn = TechButton("应用")
+
+        # 实时曲线区域，显示活动转发板当前显示地址的数据
+        self.temp_chart = TelemetryChart("温度", "°C", "#00FFAA", lambda: self.current_series("temperature"))
+        self.volt_chart = TelemetryChart("电压", "V", "#00BFFF", lambda: self.current_series("voltage"))
+
+        # 设备总览区域
+        self.fleet_panel = FleetPanel(self.fleet_model)
 
         # 日志区域
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.log_output = LogView()
         self.save_log_btn = TechButton("导出日志记录")
         self.clear_log_btn = TechButton("清除日志")
+        self.replay_btn = TechButton("回放抓包")
 
         # 状态栏
         self.status_bar = self.statusBar()
@@ -202,6 +243,11 @@ class MainWindow(QMainWindow):
         device_layout.addWidget(self.device_selector, 0, 1)
         device_layout.addWidget(self.scr_read_btn, 1, 0)
         device_layout.addWidget(self.scr_write_btn, 1, 1)
+        device_layout.addWidget(QLabel("批量地址:"), 2, 0)
+        device_layout.addWidget(self.bulk_address_input, 2, 1)
+        device_layout.addWidget(self.bulk_op_selector, 3, 0)
+        device_layout.addWidget(self.bulk_all_boards_checkbox, 3, 1)
+        device_layout.addWidget(self.bulk_btn, 4, 0, 1, 2)
         device_group.setLayout(device_layout)
         left_layout.addWidget(device_group)
 
@@ -249,14 +295,34 @@ class MainWindow(QMainWindow):
         status_layout.addWidget(self.temp_label, 0, 0)
         status_layout.addWidget(self.volt_label, 0, 1)
         status_layout.addWidget(self.time_label, 1, 0, 1, 2)
+        status_layout.addWidget(self.poll_rate_label, 2, 0, 1, 2)
+        poll_address_layout = QHBoxLayout()
+        poll_address_layout.addWidget(QLabel("轮询地址:"))
+        poll_address_layout.addWidget(self.poll_address_input)
+        poll_address_layout.addWidget(self.poll_address_btn)
+        status_layout.addLayout(poll_address_layout, 3, 0, 1, 2)
         status_group.setLayout(status_layout)
         left_layout.addWidget(status_group)
 
         left_layout.addStretch()
 
-        # 右侧日志面板
+        # 右侧曲线和日志面板
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
+        right_splitter = QSplitter(Qt.Vertical)
+
+        chart_group = QGroupBox("实时曲线")
+        chart_layout = QVBoxLayout()
+        chart_layout.addWidget(self.temp_chart)
+        chart_layout.addWidget(self.volt_chart)
+        chart_group.setLayout(chart_layout)
+        right_splitter.addWidget(chart_group)
+
+        fleet_group = QGroupBox("设备总览")
+        fleet_layout = QVBoxLayout()
+        fleet_layout.addWidget(self.fleet_panel)
+        fleet_group.setLayout(fleet_layout)
+        right_splitter.addWidget(fleet_group)
 
         log_group = QGroupBox("系统日志")
         log_layout = QVBoxLayout()
@@ -265,10 +331,13 @@ class MainWindow(QMainWindow):
         log_buttons = QHBoxLayout()
         log_buttons.addWidget(self.save_log_btn)
         log_buttons.addWidget(self.clear_log_btn)
+        log_buttons.addWidget(self.replay_btn)
         log_layout.addLayout(log_buttons)
 
         log_group.setLayout(log_layout)
-        right_layout.addWidget(log_group)
+        right_splitter.addWidget(log_group)
+        right_splitter.setSizes([280, 260, 260])
+        right_layout.addWidget(right_splitter)
 
         # 添加左右面板到分割器
         splitter.addWidget(left_panel)
@@ -293,9 +362,15 @@ class MainWindow(QMainWindow):
         self.slider_confirm_btn.clicked.connect(self.send_current_value)
         self.scr_read_btn.clicked.connect(self.read_scr)
         self.scr_write_btn.clicked.connect(self.write_scr)
+        self.bulk_btn.clicked.connect(self.run_bulk)
+        self.poll_address_btn.clicked.connect(self.apply_poll_addresses)
+        self.poll_address_input.returnPressed.connect(self.apply_poll_addresses)
+        self.device_selector.currentIndexChanged.connect(self.refresh_device_readings)
+        self.fleet_panel.device_activated.connect(self.select_device)
         self.custom_send_btn.clicked.connect(self.send_custom_data)
         self.save_log_btn.clicked.connect(self.save_log)
         self.clear_log_btn.clicked.connect(self.clear_log)
+        self.replay_btn.clicked.connect(self.replay_capture)
 
         # 回车键快捷发送
         self.custom_data_input.returnPressed.connect(self.send_custom_data)
@@ -388,13 +463,28 @@ class MainWindow(QMainWindow):
             QSlider::handle:horizontal:hover {
                 background: #00FFC3;
             }
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #0F2D45;
                 color: #00FFAA;
                 border: 1px solid #00BFFF;
                 border-radius: 5px;
                 font-family: 'Consolas', 'Courier New', monospace;
             }
+            QTableView {
+                background-color: #0F2D45;
+                alternate-background-color: #0C2538;
+                gridline-color: #1E4A6B;
+                border: 1px solid #00BFFF;
+                border-radius: 5px;
+                selection-background-color: #00BFFF;
+            }
+            QHeaderView::section {
+                background-color: #001F3F;
+                color: #00FFAA;
+                border: none;
+                border-right: 1px solid #1E4A6B;
+                padding: 4px;
+            }
             QProgressBar {
                 border: 1px solid #00BFFF;
                 border-radius: 4px;
@@ -405,6 +495,16 @@ class MainWindow(QMainWindow):
                 background-color: #00BFFF;
                 border-radius: 3px;
             }
+            QProgressBar[flash="true"]::chunk {
+                background-color: #00FFAA;
+            }
+            QLabel#connectionIndicator {
+                background-color: #FF3333;
+                border-radius: 8px;
+            }
+            QLabel#connectionIndicator[connected="true"] {
+                background-color: #00FF00;
+            }
             QLabel {
                 color: #E0E0E0;
             }
@@ -417,21 +517,29 @@ class MainWindow(QMainWindow):
     def connect_to_server(self):
         """连接到服务器"""
         try:
-            ip = self.ip_input.text()
-            port = int(self.port_input.text())
+            # 支持 "ip[:port], ip[:port]" 形式一次连接多个转发板，第一个为操作目标
+            endpoints = parse_endpoints(self.ip_input.text(), int(self.port_input.text()))
+            if not endpoints:
+                raise ValueError("未指定服务器IP")
 
             # 禁用连接按钮，避免重复点击
             self.connect_btn.setEnabled(False)
             self.status_message.setText("正在连接...")
 
-            # 在通信线程中执行连接操作
-            if self.comm_worker.connect(ip, port):
+            # 并行连接所有转发板
+            self.connections.set_active(endpoints[0])
+            results = self.connections.connect_all(endpoints)
+            connected = [ep for ep, ok in results.items() if ok]
+            if connected:
                 # 启动状态查询线程
                 if not self.status_thread.isRunning():
                     self.status_thread.start()
 
-                self.log("系统连接成功")
+                self.log(f"系统连接成功: {len(connected)}/{len(endpoints)} 个转发板")
                 self.status_message.setText("系统已连接")
+            else:
+                self.connect_btn.setEnabled(True)
+                self.status_message.setText("连接失败")
         except ValueError:
             self.connect_btn.setEnabled(True)
             QMessageBox.warning(self, "输入错误", "请输入有效的端口号")
@@ -447,25 +555,26 @@ class MainWindow(QMainWindow):
             self.status_worker.stop()
             self.status_thread.quit()
             self.status_thread.wait()
-            # 重新创建状态查询工作线程，以备下次连接
-            self.status_worker = StatusPollingWorker(self.comm_worker)
+            # 重新创建状态查询工作线程，以备下次连接（保留当前轮询地址）
+            self.status_worker = StatusPollingWorker(self.connections, self.status_worker.poller.addresses)
             self.status_worker.moveToThread(self.status_thread)
             self.status_worker.status_updated.connect(self.update_status_display)
             self.status_worker.status_error.connect(self.handle_status_error)
             self.status_thread.started.connect(self.status_worker.run)
 
         # 断开通信连接
-        self.comm_worker.disconnect()
+        self.connections.disconnect_all()
 
         # 重置UI状态
         self.stop_connection_animation()
         self.log("系统连接已断开")
         self.status_message.setText("系统已断开连接")
 
-        # 重置状态显示
-        self.temp_label.setText("温度: -- °C")
-        self.volt_label.setText("电压: -- V")
-        self.time_label.setText("运行时间: 00:00:00")
+        # 重置状态显示（经过合并层，覆盖尚未显示的旧读数）
+        self.ui_updater.set_text(self.temp_label, "温度: -- °C")
+        self.ui_updater.set_text(self.volt_label, "电压: -- V")
+        self.ui_updater.set_text(self.time_label, "运行时间: 00:00:00")
+        self.ui_updater.set_text(self.poll_rate_label, "轮询速率: -- 次/秒")
 
     def start_connection_animation(self):
         """启动连接指示器动画"""
@@ -473,12 +582,12 @@ class MainWindow(QMainWindow):
         self.connection_animation.setStartValue(rect)
         self.connection_animation.setEndValue(rect)
         self.connection_animation.start()
-        self.connection_indicator.setStyleSheet("background-color: #00FF00; border-radius: 8px;")
+        self.ui_updater.set_property(self.connection_indicator, "connected", True)
 
     def stop_connection_animation(self):
         """停止连接指示器动画"""
         self.connection_animation.stop()
-        self.connection_indicator.setStyleSheet("background-color: #FF3333; border-radius: 8px;")
+        self.ui_updater.set_property(self.connection_indicator, "connected", False)
 
     def update_slider_label(self, value):
         """更新滑块标签显示"""
@@ -488,14 +597,13 @@ class MainWindow(QMainWindow):
 
     def send_current_value(self):
         """发送电流设置值"""
-        if not self.comm_worker.is_connected():
+        if not self.connections.is_connected():
             self.log("错误: 系统未连接，无法发送")
             return
 
         try:
             addr = self.device_selector.currentIndex()
-            data = bytes([self.current_slider_value])
-            frame = self.client.build_frame(addr, 0x03, data)
+            frame = command_table.encode(Commands.SET_CURRENT, addr, self.current_slider_value)
 
             self.log(f"设置电流值: {self.current_slider_value} ({frame.hex(' ').upper()})")
 
@@ -505,12 +613,10 @@ class MainWindow(QMainWindow):
                 "value": self.current_slider_value,
                 "address": addr
             }
-            self.comm_worker.add_task(frame, context)
+            self.connections.add_task(frame, context)
 
-            # 简单的动画效果
-            self.current_progress.setStyleSheet("QProgressBar::chunk { background-color: #00FFAA; }")
-            QTimer.singleShot(500, lambda: self.current_progress.setStyleSheet(
-                "QProgressBar::chunk { background-color: #00BFFF; }"))
+            # 简单的动画效果：进度条高亮 0.5 秒
+            self.ui_updater.flash(self.current_progress, "flash", 0.5)
 
             self.status_message.setText(f"正在设置设备 {addr:02X} 电流值...")
         except Exception as e:
@@ -519,7 +625,7 @@ class MainWindow(QMainWindow):
 
     def send_custom_data(self):
         """发送自定义数据"""
-        if not self.comm_worker.is_connected():
+        if not self.connections.is_connected():
             self.log("错误: 系统未连接，无法发送自定义数据")
             QMessageBox.warning(self, "连接错误", "系统未连接，请先连接到服务器")
             return
@@ -545,7 +651,7 @@ class MainWindow(QMainWindow):
                 "input": input_text,
                 "format": "hex" if self.hex_mode_checkbox.isChecked() else "dec"
             }
-            self.comm_worker.add_task(frame, context)
+            self.connections.add_task(frame, context)
 
             self.status_message.setText("正在发送自定义数据...")
 
@@ -610,13 +716,13 @@ class MainWindow(QMainWindow):
 
     def read_scr(self):
         """读取SCR寄存器"""
-        if not self.comm_worker.is_connected():
+        if not self.connections.is_connected():
             self.log("错误: 系统未连接，无法读取SCR")
             return
 
         try:
             addr = self.device_selector.currentIndex()
-            frame = self.client.build_frame(addr, 0x04, b"")
+            frame = command_table.encode(Commands.READ_SCR, addr)
 
             self.log(f"读取SCR: {frame.hex(' ').upper()}")
 
@@ -625,7 +731,7 @@ class MainWindow(QMainWindow):
                 "type": "read_scr",
                 "address": addr
             }
-            self.comm_worker.add_task(frame, context)
+            self.connections.add_task(frame, context)
 
             self.status_message.setText(f"正在读取设备 {addr:02X} SCR数据...")
         except Exception as e:
@@ -634,13 +740,13 @@ class MainWindow(QMainWindow):
 
     def write_scr(self):
         """写入SCR寄存器"""
-        if not self.comm_worker.is_connected():
+        if not self.connections.is_connected():
             self.log("错误: 系统未连接，无法写入SCR")
             return
 
         try:
             addr = self.device_selector.currentIndex()
-            frame = self.client.build_frame(addr, 0x05, bytes([0x48]))  # 固定写入0x48
+            frame = command_table.encode(Commands.WRITE_SCR, addr, 0x48)  # 固定写入0x48
 
             self.log(f"写入SCR: {frame.hex(' ').upper()}")
 
@@ -650,28 +756,166 @@ class MainWindow(QMainWindow):
                 "address": addr,
                 "value": 0x48
             }
-            self.comm_worker.add_task(frame, context)
+            self.connections.add_task(frame, context)
 
             self.status_message.setText(f"正在向设备 {addr:02X} 写入SCR配置...")
         except Exception as e:
             self.log(f"SCR写入失败: {e}")
             self.status_message.setText("SCR写入失败")
 
-    def handle_response(self, response, context):
+    def run_bulk(self):
+        """把选中的操作一次下发到多个设备地址（可跨所有已连接的转发板）"""
+        if not self.connections.is_connected():
+            self.log("错误: 系统未连接，无法执行批量操作")
+            return
+
+        try:
+            addresses = parse_addresses(self.bulk_address_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "输入错误", f"批量地址格式错误: {e}")
+            return
+
+        operation = self.bulk_op_selector.currentData()
+        value = None
+        if operation == "set-current":
+            value = self.current_slider_value
+        elif operation == "write-scr":
+            value = 0x48  # 与单设备写入相同的固定值
+
+        if self.bulk_all_boards_checkbox.isChecked():
+            endpoints = self.connections.connected_endpoints()
+        else:
+            endpoints = [self.connections.active_endpoint]
+        targets = [(endpoint, address) for endpoint in endpoints for address in addresses]
+        if not targets:
+            self.log("错误: 批量操作没有目标设备")
+            return
+
+        bulk = BulkOperation(operation, value, on_complete=self.handle_bulk_complete)
+        for endpoint, frame, context in bulk.build_requests(targets):
+            self.connections.add_task(frame, context, endpoint)
+
+        self.log(f"批量{bulk.title}: {len(endpoints)} 个转发板 × {len(addresses)} 个设备")
+        self.status_message.setText(f"正在批量{bulk.title} ({len(targets)} 个设备)...")
+
+    def apply_poll_addresses(self):
+        """修改轮询的设备地址（所有转发板生效）"""
+        try:
+            addresses = parse_addresses(self.poll_address_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "输入错误", f"轮询地址格式错误: {e}")
+            return
+        self.status_worker.set_addresses(addresses)
+        self.log(f"轮询地址: {' '.join(f'{a:02X}' for a in addresses)}")
+        self.refresh_device_readings()
+
+    def display_address(self):
+        """状态标签显示的设备地址：选中设备在轮询列表中时显示该设备，否则显示广播查询结果"""
+        selected = self.device_selector.currentIndex()
+        return selected if selected in self.status_worker.poller.addresses else 0xFF
+
+    def current_series(self, metric):
+        """曲线数据源：活动转发板、当前显示地址的历史数据"""
+        return self.telemetry.series(self.connections.active_endpoint, self.display_address(), metric)
+
+    def link_rtt(self, endpoint):
+        """转发板链路的平滑往返时间（秒），设备总览表使用"""
+        board = self.connections.boards.get(endpoint)
+        return board.worker.timeouts.srtt if board is not None else None
+
+    def select_device(self, endpoint, address):
+        """在设备总览表中双击某行：切换到该转发板和设备"""
+        if endpoint in self.connections.boards and endpoint != self.connections.active_endpoint:
+            self.connections.set_active(endpoint)
+            self.log(f"活动转发板: {format_endpoint(endpoint)}")
+        if 0 <= address < self.device_selector.count():
+            self.device_selector.setCurrentIndex(address)
+        self.refresh_device_readings()
+
+    def refresh_device_readings(self):
+        """切换设备后立即显示该设备已有的最新读数"""
+        endpoint = self.connections.active_endpoint
+        address = self.display_address()
+        temperature = self.status_worker.poller.latest(endpoint, address, "temperature")
+        voltage = self.status_worker.poller.latest(endpoint, address, "voltage")
+        self.ui_updater.set_text(self.temp_label, f"温度: {temperature[0]} °C" if temperature else "温度: -- °C")
+        self.ui_updater.set_text(self.volt_label, f"电压: {voltage[0]:.1f} V" if voltage else "电压: -- V")
+
+    def handle_bulk_complete(self, bulk):
+        """批量操作全部有结果后输出汇总报告"""
+        report = bulk.report()
+        for result in report["results"]:
+            if result["ok"]:
+                detail = f"{result['value']} ({result['latency_ms']:.1f} ms)"
+            else:
+                detail = f"失败 - {result['error']}"
+            self.log(f"  [{result['endpoint']}] 设备 {result['address']:02X}: {detail}")
+
+        # 更新设备总览表
+        for result in bulk.results.values():
+            if not result.ok:
+                continue
+            if bulk.command == Commands.READ_SCR:
+                self.fleet_model.record(result.endpoint, result.address, scr=result.value)
+            elif bulk.command == Commands.WRITE_SCR:
+                self.fleet_model.record(result.endpoint, result.address, scr=bulk.value)
+            else:
+                self.fleet_model.record(result.endpoint, result.address, current=bulk.value)
+
+        summary = f"批量{bulk.title}完成: {report['succeeded']}/{report['total']} 成功，耗时 {report['elapsed_ms']:.1f} ms"
+        latency = report["latency_ms"]
+        if latency:
+            summary += f"，平均延迟 {latency['avg']:.1f} ms，最大 {latency['max']:.1f} ms"
+        self.log(summary)
+        self.status_message.setText(f"批量{bulk.title}完成: {report['succeeded']}/{report['total']} 成功")
+
+    def handle_response(self, endpoint, response, context):
         """处理通信响应，委托给ResponseHandler处理"""
-        self.response_handler.handle_response(response, context)
+        if isinstance(context, dict) and "bulk" in context:
+            context["bulk"].record_response(context, response)
+            return
+        self.response_handler.handle_response(response, context, endpoint)
 
-    def handle_connection_error(self, error_msg):
-        """处理连接错误"""
-        self.log(f"连接错误: {error_msg}")
+    def handle_request_timeout(self, endpoint, context):
+        """处理单个请求超时（连接保持，不影响其他在途请求）"""
+        if isinstance(context, dict) and "bulk" in context:
+            context["bulk"].record_failure(context, "请求超时")
+            return
+        req_type = context.get("type", "未知") if isinstance(context, dict) else "未知"
+        addr = context.get("address") if isinstance(context, dict) else None
+        target = f"设备 {addr:02X} " if addr is not None else ""
+        self.log(f"[{format_endpoint(endpoint)}] 请求超时: {target}{req_type}")
+
+    def handle_request_failed(self, endpoint, context, reason):
+        """处理因断线而失败的请求"""
+        if isinstance(context, dict) and "bulk" in context:
+            context["bulk"].record_failure(context, reason)
+            return
+        req_type = context.get("type", "未知") if isinstance(context, dict) else "未知"
+        # 后台轮询在重连期间会持续失败，不逐条记录
+        if req_type not in ("temperature", "voltage"):
+            self.log(f"[{format_endpoint(endpoint)}] 请求失败: {req_type} ({reason})")
+
+    def handle_connection_error(self, endpoint, error_msg):
+        """处理连接错误（连接状态由 connection_status_changed 信号单独通知）"""
+        board = format_endpoint(endpoint)
+        self.log(f"[{board}] 连接错误: {error_msg}")
         self.status_message.setText(f"连接错误: {error_msg[:30]}...")
 
-        # 如果错误表明连接已断开，更新UI状态
-        if "未连接" in error_msg or "超时" in error_msg or "连接" in error_msg:
-            self.handle_connection_status(False)
+    def handle_reconnecting(self, endpoint, attempt, delay):
+        """处理自动重连进度"""
+        self.log(f"[{format_endpoint(endpoint)}] {delay:.1f} 秒后进行第 {attempt} 次重连")
+        if endpoint == self.connections.active_endpoint:
+            self.mcu_status_label.setText("系统状态: 重连中")
+            self.status_message.setText(f"连接中断，正在第 {attempt} 次重连...")
+
+    def handle_connection_status(self, endpoint, connected):
+        """处理某个转发板的连接状态变化"""
+        if endpoint == self.connections.active_endpoint:
+            self.update_connection_ui(connected)
 
-    def handle_connection_status(self, connected):
-        """处理连接状态变化"""
+    def update_connection_ui(self, connected):
+        """更新连接指示和按钮状态"""
         if connected:
             # 连接成功
             self.mcu_status_label.setText("系统状态: 在线")
@@ -696,20 +940,19 @@ class MainWindow(QMainWindow):
         """更新状态显示"""
         # 更新运行时间
         if "runtime" in status_dict:
-            self.time_label.setText(f"运行时间: {status_dict['runtime']}")
+            self.ui_updater.set_text(self.time_label, f"运行时间: {status_dict['runtime']}")
+
+        # 更新有效轮询速率（自适应轮询时显示节省的比例）
+        if "poll_rate" in status_dict:
+            text = f"轮询速率: {status_dict['poll_rate']:.1f} 次/秒"
+            if status_dict.get("poll_rate_saved", 0) > 0.005:
+                text += f"（节省 {status_dict['poll_rate_saved']:.0%}）"
+            self.ui_updater.set_text(self.poll_rate_label, text)
 
     def log(self, message):
         """添加日志消息"""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        formatted_message = f"[{timestamp}] {message}"
-
-        # 使用Qt的主线程安全的方式更新UI
-        QApplication.instance().processEvents()
-        self.log_output.append(formatted_message)
-
-        # 自动滚动到底部
-        scrollbar = self.log_output.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        # 写文件在后台线程完成，界面行由日志视图的定时器批量写入文档
+        self.logger.info(message)
 
     def save_log(self):
         """保存日志到文件"""
@@ -719,8 +962,12 @@ class MainWindow(QMainWindow):
             "Text Files (*.txt)"
         )
         if filename:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(self.log_output.toPlainText())
+            if self.logger.log_file:
+                # 从磁盘上的日志文件流式导出，包含已轮转的历史日志
+                self.logger.export(filename)
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write("\n".join(self.log_output.lines()))
             self.status_message.setText(f"日志已保存至: {filename}")
             self.log(f"日志已导出到文件: {filename}")
 
@@ -729,6 +976,57 @@ class MainWindow(QMainWindow):
         self.log_output.clear()
         self.status_message.setText("日志已清除")
 
+    def replay_capture(self):
+        """选择抓包文件，按原始时间轴把其中的响应送入响应处理流程"""
+        if self.replay_thread is not None:
+            self.stop_replay()
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "回放抓包", get_config().get('capture.dir', 'captures'), "Capture Files (*.sbcap)"
+        )
+        if not filename:
+            return
+        speed = get_config().get('capture.replay_speed', 1.0)
+        self.replay_worker = ReplayWorker(filename, speed)
+        self.replay_thread = QThread()
+        self.replay_worker.moveToThread(self.replay_thread)
+        self.replay_thread.started.connect(self.replay_worker.run)
+        self.replay_worker.response_received.connect(self.handle_replay_response)
+        self.replay_worker.finished.connect(self.handle_replay_finished)
+        self.replay_worker.error.connect(self.handle_replay_error)
+        self.replay_thread.start()
+        self.replay_btn.setText("停止回放")
+        self.log(f"开始回放抓包: {filename}（{speed:g} 倍速）")
+
+    def stop_replay(self):
+        """停止正在进行的回放"""
+        if self.replay_thread is None:
+            return
+        self.replay_worker.stop()
+        self.replay_thread.quit()
+        self.replay_thread.wait()
+        self.replay_thread = None
+        self.replay_worker = None
+        self.replay_btn.setText("回放抓包")
+
+    def handle_replay_response(self, endpoint, response, context):
+        """处理回放出的响应：只更新显示，不进入自适应轮询和遥测归档"""
+        context = dict(context) if isinstance(context, dict) else {}
+        context["replay"] = True
+        self.response_handler.handle_response(response, context, endpoint)
+
+    def handle_replay_finished(self, stats):
+        rtt = stats.get("rtt_ms") or {}
+        summary = f"抓包回放结束: {stats['frames']} 帧，匹配 {stats['matched']}，校验错误 {stats['checksum_errors']}"
+        if rtt:
+            summary += f"，往返时间 p50 {rtt['p50']:.1f} ms / p95 {rtt['p95']:.1f} ms"
+        self.log(summary)
+        self.stop_replay()
+
+    def handle_replay_error(self, message):
+        self.log(f"抓包回放失败: {message}")
+        self.stop_replay()
+
     def closeEvent(self, event):
         """窗口关闭事件处理"""
         # 停止所有线程，并确保清理资源
@@ -736,8 +1034,15 @@ class MainWindow(QMainWindow):
         self.status_thread.quit()
         self.status_thread.wait()
 
-        self.comm_worker.stop()
-        self.comm_thread.quit()
-        self.comm_thread.wait()
+        self.connections.stop()
+        if self.connections.capture is not None:
+            self.connections.capture.close()
+        self.stop_replay()
+
+        self.logger.close()
+
+        # 写出尚未落盘的遥测数据
+        if self.telemetry.archive is not None:
+            self.telemetry.archive.close()
 
         event.accept()
\ No newline at end of file
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 实时遥测曲线
+
+从 TelemetryStore 的环形缓冲区取数，按像素宽度做 min/max 抽取后绘制；
+定时器以固定帧率检查数据或视图是否变化，只在需要时重绘，而不是每个响应都重绘。
+
+鼠标滚轮缩放、左键拖动平移，双击回到实时跟随。
+"""
+
+import time
+
+from PyQt5.QtCore import Qt, QTimer, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+from config import get_config
+from utils.decimation import minmax_decimate
+
+DEFAULT_SPAN = 300.0  # 默认显示最近5分钟
+MIN_SPAN = 5.0
+MAX_SPAN = 7 * 24 * 3600.0
+
+
+def _format_span(seconds):
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} 小时"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} 分钟"
+    return f"{seconds:.0f} 秒"
+
+
+class TelemetryChart(QWidget):
+    """单个指标的实时曲线
+
+    source 为无参函数，返回当前要显示的 RingBuffer（没有数据时返回None），
+    每帧调用一次，切换转发板或设备后自动显示新的序列。
+    """
+
+    def __init__(self, title, unit, color, source, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.unit = unit
+        self.color = QColor(color)
+        self.source = source
+        self.span = DEFAULT_SPAN
+        self.view_end = None  # None 表示实时跟随最新数据
+        self._drag_x = None
+        self._drag_end = None
+        self._painted = None  # 上次绘制时的 (序列, 样本总数, 视图)
+        self._painted_at = 0.0
+        self.setMinimumHeight(140)
+        self.setMouseTracking(False)
+
+        # 以固定帧率检查是否需要重绘
+        fps = get_config().get('ui.chart_fps', 10)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start(max(1, int(1000 / fps)))
+
+    def reset_view(self):
+        self.span = DEFAULT_SPAN
+        self.view_end = None
+        self.update()
+
+    def _tick(self):
+        if not self.isVisible():
+            return
+        series = self.source()
+        state = (id(series), series.total if series is not None else 0, self.span, self.view_end)
+        # 实时跟随时时间轴在移动，即使没有新数据也每秒刷新一次
+        stale = self.view_end is None and time.monotonic() - self._painted_at >= 1.0
+        if state != self._painted or stale:
+            self.update()
+
+    def _view_range(self, series):
+        end = self.view_end
+        if end is None:
+            latest = series.latest() if series is not None else None
+            end = max(time.monotonic(), latest[0]) if latest else time.monotonic()
+        return end - self.span, end
+
+    def paintEvent(self, event):
+        series = self.source()
+        self._painted = (id(series), series.total if series is not None else 0, self.span, self.view_end)
+        self._painted_at = time.monotonic()
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.fillRect(self.rect(), QColor("#001529"))
+        plot = QRectF(self.rect()).adjusted(48, 20, -8, -18)
+        painter.setPen(QPen(QColor("#1F4F7F"), 1))
+        painter.drawRect(plot)
+
+        start, end = self._view_range(series)
+        columns = max(1, int(plot.width()))
+        points = minmax_decimate(series, start, end, columns) if series is not None else []
+
+        painter.setPen(QColor("#E0E0E0"))
+        mode = "实时" if self.view_end is None else "历史"
+        painter.drawText(QRectF(plot.left(), 2, plot.width(), 16), Qt.AlignLeft | Qt.AlignVCenter,
+                         f"{self.title} ({self.unit})")
+        painter.drawText(QRectF(plot.left(), 2, plot.width(), 16), Qt.AlignRight | Qt.AlignVCenter,
+                         f"{mode} · {_format_span(self.span)}")
+
+        if not points:
+            painter.setPen(QColor("#888888"))
+            painter.drawText(plot, Qt.AlignCenter, "暂无数据")
+            return
+
+        low = min(p[1] for p in points)
+        high = max(p[2] for p in points)
+        if high - low < 1e-9:
+            low, high = low - 1, high + 1
+        pad = (high - low) * 0.1
+        low, high = low - pad, high + pad
+
+        def y_of(value):
+            return plot.bottom() - (value - low) / (high - low) * plot.height()
+
+        painter.drawText(QRectF(0, plot.top() - 6, 44, 12), Qt.AlignRight | Qt.AlignVCenter, f"{high:.1f}")
+        painter.drawText(QRectF(0, plot.bottom() - 6, 44, 12), Qt.AlignRight | Qt.AlignVCenter, f"{low:.1f}")
+
+        # 每列画一条 min-max 竖线，再把相邻列的中点连成折线
+        painter.setPen(QPen(self.color, 1))
+        line = QPolygonF()
+        for col, col_low, col_high in points:
+            x = plot.left() + col + 0.5
+            top, bottom = y_of(col_high), y_of(col_low)
+            if bottom - top >= 1:
+                painter.drawLine(QPointF(x, top), QPointF(x, bottom))
+            line.append(QPointF(x, (top + bottom) / 2))
+        painter.drawPolyline(line)
+
+    # 缩放和平移
+    def wheelEvent(self, event):
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        plot_width = max(1.0, self.width() - 56.0)
+        ratio = min(1.0, max(0.0, (event.pos().x() - 48) / plot_width))
+        start, end = self._view_range(self.source())
+        anchor = start + ratio * self.span
+        new_span = min(MAX_SPAN, max(MIN_SPAN, self.span * factor))
+        new_end = anchor + (1 - ratio) * new_span
+        self.span = new_span
+        # 缩放点在最右侧附近时保持实时跟随
+        if self.view_end is not None or ratio < 0.95:
+            self.view_end = new_end
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.pos().x()
+            self._drag_end = self._view_range(self.source())[1]
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None:
+            return
+        plot_width = max(1.0, self.width() - 56.0)
+        shift = (event.pos().x() - self._drag_x) / plot_width * self.span
+        new_end = self._drag_end - shift
+        self.view_end = None if new_end >= time.monotonic() else new_end
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 限帧率的界面更新合并
+
+高频的遥测响应不直接 setText：set_text() 只记下每个控件的最新文本，定时器按最高帧率
+（默认 30 Hz）把积累的更新一次性写入控件，中间状态直接丢弃，文本未变化时不触发重绘。
+
+样式变化用动态属性表达（如 connected、flash），对应的样式写在主窗口样式表里只解析一次；
+切换属性时只对该控件重新 polish，不再每次 setStyleSheet 重新解析样式表。
+flash() 把属性置位一段时间后自动复位，由同一个定时器处理，不再为每次动画创建 singleShot。
+
+没有待处理的更新时定时器停止，空闲时界面线程不被唤醒。
+"""
+
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+from config import get_config
+
+
+def apply_property(widget, name, value):
+    """设置动态属性并重新 polish，使依赖该属性的样式表规则生效"""
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+    return True
+
+
+class UiUpdater(QObject):
+    """按控件合并界面更新，以固定最高帧率刷新"""
+
+    def __init__(self, fps=None, parent=None):
+        super().__init__(parent)
+        fps = fps or get_config().get('ui.max_fps', 30)
+        self._texts = {}  # 控件 -> 最新文本
+        self._properties = {}  # (控件, 属性名) -> 最新值
+        self._resets = {}  # (控件, 属性名) -> (复位时间, 复位值)
+
+        # 统计信息
+        self.applied = 0  # 实际写入控件的更新数
+        self.coalesced = 0  # 被后来的值覆盖、没有显示的中间状态数
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(1000 / fps)))
+        self._timer.timeout.connect(self.flush)
+
+    def set_text(self, widget, text):
+        """记下控件的最新文本，在下一帧写入"""
+        if widget in self._texts:
+            self.coalesced += 1
+        self._texts[widget] = text
+        self._schedule()
+
+    def set_property(self, widget, name, value):
+        """记下控件动态属性的最新值，在下一帧应用；会取消该属性尚未到期的复位"""
+        key = (widget, name)
+        if key in self._properties:
+            self.coalesced += 1
+        self._properties[key] = value
+        self._resets.pop(key, None)
+        self._schedule()
+
+    def flash(self, widget, name, duration, value=True, reset=False):
+        """把属性置为 value，duration 秒后复位为 reset"""
+        self.set_property(widget, name, value)
+        self._resets[(widget, name)] = (time.monotonic() + duration, reset)
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """把积累的更新写入控件"""
+        texts, self._texts = self._texts, {}
+        for widget, text in texts.items():
+            if widget.text() != text:
+                widget.setText(text)
+                self.applied += 1
+
+        properties, self._properties = self._properties, {}
+        for (widget, name), value in properties.items():
+            if apply_property(widget, name, value):
+                self.applied += 1
+
+        if self._resets:
+            now = time.monotonic()
+            due = [key for key, (deadline, _) in self._resets.items() if deadline <= now]
+            for key in due:
+                _, value = self._resets.pop(key)
+                if apply_property(key[0], key[1], value):
+                    self.applied += 1
+
+        if not self._texts and not self._properties and not self._resets:
+            self._timer.stop()
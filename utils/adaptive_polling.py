@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 自适应（死区）轮询
+
+读数稳定在死区内时轮询周期按倍数逐步拉长，读数变化超出死区或越过告警阈值时
+立即恢复到最快周期，周期始终限制在 [min_interval, max_interval] 内。
+"""
+
+
+class AdaptiveInterval:
+    """单个轮询任务的自适应周期"""
+
+    __slots__ = ("min_interval", "max_interval", "backoff", "deadband", "thresholds",
+                 "interval", "reference", "last_value")
+
+    def __init__(self, min_interval, max_interval, backoff=1.5, deadband=0.0, thresholds=()):
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.backoff = max(1.0, float(backoff))
+        self.deadband = abs(deadband)
+        self.thresholds = tuple(thresholds)
+        self.interval = self.min_interval
+        self.reference = None  # 上一次“变化”时的读数，缓慢漂移累计超出死区也会触发
+        self.last_value = None
+
+    def update(self, value):
+        """记录一次读数，返回新的轮询周期"""
+        previous = self.last_value
+        self.last_value = value
+        if self.reference is None:
+            self.reference = value
+            self.interval = self.min_interval
+        elif abs(value - self.reference) > self.deadband or self._crossed(previous, value):
+            self.reference = value
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+    def reset(self, min_interval=None):
+        """恢复最快周期（如修改了基础周期）"""
+        if min_interval is not None:
+            self.min_interval = float(min_interval)
+            self.max_interval = max(self.max_interval, self.min_interval)
+        self.interval = self.min_interval
+        self.reference = None
+        self.last_value = None
+
+    def _crossed(self, previous, value):
+        if previous is None:
+            return False
+        low, high = min(previous, value), max(previous, value)
+        return any(low < t <= high for t in self.thresholds)
+
+
+class AdaptivePolicy:
+    """按指标配置的自适应参数，为每个轮询任务创建 AdaptiveInterval"""
+
+    def __init__(self, enabled=False, backoff=1.5, max_interval=30.0, deadband=None, thresholds=None):
+        self.enabled = enabled
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.deadband = dict(deadband or {})
+        self.thresholds = dict(thresholds or {})
+
+    def create(self, metric, min_interval):
+        return AdaptiveInterval(min_interval, self.max_interval, self.backoff,
+                                self.deadband.get(metric, 0.0), self.thresholds.get(metric, ()))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            enabled=config.get('polling.adaptive.enabled', False),
+            backoff=config.get('polling.adaptive.backoff', 1.5),
+            max_interval=config.get('polling.adaptive.max_interval', 30.0),
+            deadband=config.get('polling.adaptive.deadband', {}),
+            thresholds=config.get('polling.adaptive.thresholds', {}),
+        )
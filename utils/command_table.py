@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 命令表
+
+每条命令只在 COMMAND_TABLE 中声明一次：操作码、请求上下文类型、请求/响应数据区的
+struct 布局、换算系数和单位、是否幂等。导入时编译为 struct.Struct，并建立按操作码
+索引的查找表，编码、解码、超时重发和响应分发都从这里取：
+
+    frame = command_table.encode(Commands.WRITE_SCR, 0x03, 0x48)
+    spec, value = command_table.decode(response)   # 一次 unpack_from，已换算
+
+新增命令只需在表中加一行，不需要在解析和分发处增加分支。
+"""
+
+import struct
+
+from config import Commands
+from utils import frame_codec
+
+
+class CommandSpec:
+    """一条命令的声明及其编译后的编解码器
+
+    request/response 为数据区的 struct 格式（大端，不含 ">"）；None 表示数据区长度不定，
+    按原始 bytes 处理。解码值为 原始值 / scale，单字段布局返回标量。
+
+    单个无符号整数的布局（B/H/I/Q）按声明长度解析只是快速路径：实际数据区长度不同时
+    按大端整数解析全部数据（与原先的 int.from_bytes 一致），数据区为空时返回 None。
+    """
+
+    __slots__ = ("command", "opcode", "request_type", "label", "request", "response",
+                 "scale", "unit", "idempotent", "request_struct", "response_struct", "integer", "single")
+
+    def __init__(self, command, request_type, label, request=None, response=None,
+                 scale=1, unit="", idempotent=False):
+        self.command = command
+        self.opcode = int(command)
+        self.request_type = request_type  # 请求上下文 "type"，决定优先级、合并和断线策略
+        self.label = label
+        self.request = request
+        self.response = response
+        self.scale = scale
+        self.unit = unit
+        self.idempotent = idempotent  # 超时可安全重发
+        self.request_struct = struct.Struct(">" + request) if request is not None else None
+        self.response_struct = struct.Struct(">" + response) if response is not None else None
+        self.integer = response in ("B", "H", "I", "Q")  # 单个无符号整数，接受任意长度
+        self.single = (self.response_struct is not None
+                       and len(self.response_struct.unpack(bytes(self.response_struct.size))) == 1)
+
+    def __repr__(self):
+        return f"CommandSpec({self.command.name}, 0x{self.opcode:02X})"
+
+    def pack(self, *values):
+        """按请求布局打包数据区；无固定布局时接受一个 bytes 参数"""
+        if self.request_struct is None:
+            return bytes(values[0]) if values else b""
+        try:
+            return self.request_struct.pack(*values)
+        except struct.error as e:
+            raise ValueError(f"{self.label}参数错误: {e}") from None
+
+    def encode(self, address, *values):
+        return frame_codec.encode(address, self.opcode, self.pack(*values))
+
+    def decode(self, frame):
+        """解码响应帧的数据区，多字段布局长度不符时抛出 ValueError"""
+        length = frame[4]
+        unpacker = self.response_struct
+        if unpacker is None:
+            return bytes(frame[frame_codec.PAYLOAD_OFFSET:frame_codec.PAYLOAD_OFFSET + length])
+        if length != unpacker.size:
+            if not self.integer:
+                raise ValueError(f"{self.label}响应数据长度为 {length}，应为 {unpacker.size}")
+            if not length:
+                return None
+            value = frame_codec.decode_uint(frame)
+            return value / self.scale if self.scale != 1 else value
+        if self.single:
+            value = unpacker.unpack_from(frame, frame_codec.PAYLOAD_OFFSET)[0]
+            return value / self.scale if self.scale != 1 else value
+        values = unpacker.unpack_from(frame, frame_codec.PAYLOAD_OFFSET)
+        if self.scale != 1:
+            values = tuple(value / self.scale for value in values)
+        return values
+
+    def format(self, value):
+        """带单位的显示文本"""
+        if isinstance(value, bytes):
+            return value.hex(' ').upper() or "-"
+        if isinstance(value, float):
+            return f"{value:.1f} {self.unit}".rstrip()
+        return f"{value} {self.unit}".rstrip()
+
+
+COMMAND_TABLE = (
+    CommandSpec(Commands.PASSTHROUGH, "passthrough", "透传"),
+    CommandSpec(Commands.SERIAL_CONFIG, "serial_config", "串口配置", response="B"),
+    CommandSpec(Commands.SET_CURRENT, "current_setting", "电流设置", request="B", response="B"),
+    CommandSpec(Commands.READ_SCR, "read_scr", "SCR值", request="", response="B", idempotent=True),
+    CommandSpec(Commands.WRITE_SCR, "write_scr", "SCR写入", request="B", response="B"),
+    CommandSpec(Commands.GET_RUNTIME, "runtime", "运行时间", request="", response="I", unit="s",
+                idempotent=True),
+    CommandSpec(Commands.GET_TEMPERATURE, "temperature", "温度", request="", response="H", unit="°C",
+                idempotent=True),
+    CommandSpec(Commands.GET_VOLTAGE, "voltage", "电压", request="", response="H", scale=10, unit="V",
+                idempotent=True),
+)
+
+# 操作码 -> CommandSpec（未登记为 None），按下标 O(1) 查找
+BY_OPCODE = [None] * 256
+for _spec in COMMAND_TABLE:
+    BY_OPCODE[_spec.opcode] = _spec
+del _spec
+
+BY_TYPE = {spec.request_type: spec for spec in COMMAND_TABLE}
+IDEMPOTENT_COMMANDS = frozenset(spec.opcode for spec in COMMAND_TABLE if spec.idempotent)
+
+
+def lookup(command):
+    """操作码或 Commands 成员 -> CommandSpec，未登记时返回 None"""
+    return BY_OPCODE[command]
+
+
+def request_type(command):
+    """请求上下文类型，未登记的命令为 "custom" """
+    spec = BY_OPCODE[command]
+    return spec.request_type if spec is not None else "custom"
+
+
+def encode(command, address, *values):
+    """按命令表构建请求帧"""
+    return BY_OPCODE[command].encode(address, *values)
+
+
+def decode(frame):
+    """解析响应帧，返回 (CommandSpec, 值)；未登记的命令返回 (None, 数据区 bytes)
+
+    帧头错误、长度不足或数据长度与多字段布局不符时抛出 ValueError。
+    """
+    length = frame_codec.header(frame)[2]
+    spec = BY_OPCODE[frame[3]]
+    if spec is None:
+        return None, bytes(frame[frame_codec.PAYLOAD_OFFSET:frame_codec.PAYLOAD_OFFSET + length])
+    return spec, spec.decode(frame)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 曲线降采样（min/max 抽取）
+
+把时间范围均分为与像素宽度相同的列，每列只保留最小值和最大值，不会丢失尖峰。
+列边界用二分查找定位，列内最值取自 RingBuffer 的 min/max 金字塔，
+一次重绘只触及 O(列数 · log N) 个元素，与可见样本数无关。
+"""
+
+
+def minmax_decimate(series, start, end, columns):
+    """对 RingBuffer 在时间范围 [start, end] 内的样本做 min/max 抽取
+
+    返回 [(列号, 最小值, 最大值), ...]，没有样本的列不输出。
+    直接由下一个样本的时间戳跳到它所在的列，空白的列不产生任何开销。
+    """
+    columns = max(1, int(columns))
+    span = end - start
+    if span <= 0:
+        return []
+    lo, last = series.bounds(start, end)
+    result = []
+    while lo < last:
+        col = min(columns - 1, max(0, int((series.time_at(lo) - start) / span * columns)))
+        hi = last if col == columns - 1 else series.bisect_left(start + (col + 1) * span / columns, lo + 1, last)
+        low, high = series.minmax(lo, hi)
+        # 浮点舍入可能让边界上的样本按列号仍落在上一列，此时合并
+        if result and result[-1][0] == col:
+            _, prev_low, prev_high = result[-1]
+            result[-1] = (col, min(low, prev_low), max(high, prev_high))
+        else:
+            result.append((col, low, high))
+        lo = hi
+    return result
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 帧编解码
+
+帧格式：AA 55 | 地址 | 命令 | 长度 | 数据 | 校验和(2, 大端) | 0D 0A
+校验和为 (地址 + 命令 + 长度 + 数据各字节) & 0xFFFF。
+
+客户端、轮询器和模拟服务端共用本模块：
+- 按数据长度缓存预编译的 struct.Struct，一次 pack 生成整帧（帧头帧尾是模板常量）
+- 无参数命令（0xF6/0xF7/0x04/0xF2 等）的帧不可变，按 (地址, 命令) 缓存后直接复用
+- 单字节参数的帧（SET_CURRENT / WRITE_SCR）按 (地址, 命令, 参数) 缓存，命中时不再计算校验和；
+  更长的数据区仍需对每个字节求和
+- 响应的整数值用 struct.unpack_from 在原帧上读取（命令表解码即走这里），不复制数据
+
+性能对比见 python -m core.microbench。
+"""
+
+import struct
+
+FRAME_HEADER = b"\xAA\x55"
+FRAME_FOOTER = b"\x0D\x0A"
+FRAME_OVERHEAD = 9  # 帧头(2) + 地址(1) + 命令(1) + 长度(1) + 校验和(2) + 帧尾(2)
+PAYLOAD_OFFSET = 5
+MAX_PAYLOAD = 255
+
+_HEADER = struct.Struct(">BBB")  # 地址, 命令, 长度（偏移2）
+_UINT = {1: struct.Struct(">B"), 2: struct.Struct(">H"), 4: struct.Struct(">I")}
+
+_encoders = {}  # 数据长度 -> struct.Struct
+_empty_frames = {}  # (地址 << 8) | 命令 -> 无数据的完整帧
+_byte_frames = {}  # (地址 << 16) | (命令 << 8) | 参数 -> 单字节数据的完整帧
+_BYTE_FRAMES_LIMIT = 4096  # 超过后清空重建，防止地址、参数组合过多时无限增长
+
+
+def _encoder(length):
+    encoder = _encoders.get(length)
+    if encoder is None:
+        encoder = _encoders[length] = struct.Struct(f">2sBBB{length}sH2s")
+    return encoder
+
+
+def encode(address, command, data=b""):
+    """构建一帧（bytes），无数据的帧从缓存返回同一个对象"""
+    if not data:
+        key = (address << 8) | command
+        frame = _empty_frames.get(key)
+        if frame is None:
+            try:
+                frame = _encoder(0).pack(FRAME_HEADER, address, command, 0, b"",
+                                         (address + command) & 0xFFFF, FRAME_FOOTER)
+            except struct.error as e:
+                raise ValueError(f"地址或命令超出范围: {e}") from None
+            _empty_frames[key] = frame
+        return frame
+    length = len(data)
+    if length == 1:
+        return _encode_byte(address, command, data[0])
+    if length > MAX_PAYLOAD:
+        raise ValueError(f"数据长度 {length} 超过 {MAX_PAYLOAD} 字节")
+    try:
+        return _encoder(length).pack(FRAME_HEADER, address, command, length, bytes(data),
+                                     (address + command + length + sum(data)) & 0xFFFF, FRAME_FOOTER)
+    except struct.error as e:
+        raise ValueError(f"地址或命令超出范围: {e}") from None
+
+
+def _encode_byte(address, command, value):
+    try:
+        key = (address << 16) | (command << 8) | value
+    except TypeError:
+        raise ValueError("地址或命令必须是整数") from None
+    frame = _byte_frames.get(key)
+    if frame is None:
+        try:
+            frame = _encoder(1).pack(FRAME_HEADER, address, command, 1, bytes((value,)),
+                                     (address + command + 1 + value) & 0xFFFF, FRAME_FOOTER)
+        except struct.error as e:
+            raise ValueError(f"地址或命令超出范围: {e}") from None
+        if len(_byte_frames) >= _BYTE_FRAMES_LIMIT:
+            _byte_frames.clear()
+        _byte_frames[key] = frame
+    return frame
+
+
+def checksum(frame):
+    """按帧内容计算的校验和"""
+    end = PAYLOAD_OFFSET + frame[4]
+    return sum(memoryview(frame)[2:end]) & 0xFFFF
+
+
+def header(frame):
+    """(地址, 命令, 数据长度)，长度不足时抛出 ValueError"""
+    if len(frame) < 7:  # 帧头(2) + 地址(1) + 命令(1) + 长度(1) + 校验和(2) = 7字节
+        raise ValueError("响应数据长度不足")
+    if frame[0] != 0xAA or frame[1] != 0x55:
+        raise ValueError("响应帧头错误")
+    return _HEADER.unpack_from(frame, 2)
+
+
+def decode_uint(frame):
+    """把数据区按大端无符号整数解析（1/2/4 字节直接 unpack_from，其他长度用 int.from_bytes）"""
+    length = frame[4] if len(frame) >= 7 else 0
+    if not length:
+        raise ValueError("响应数据为空")
+    unpacker = _UINT.get(length)
+    if unpacker is not None:
+        return unpacker.unpack_from(frame, PAYLOAD_OFFSET)[0]
+    return int.from_bytes(memoryview(frame)[PAYLOAD_OFFSET:PAYLOAD_OFFSET + length], 'big')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 流式帧解码器
+
+TCP是字节流，一次recv可能只包含半帧，也可能包含多帧。
+解码器维护一个持久接收缓冲区，按 AA 55 帧头 / 0D 0A 帧尾切分完整帧，
+校验16位校验和，并在遇到垃圾数据后重新同步。
+"""
+
+from utils.frame_codec import FRAME_HEADER, FRAME_OVERHEAD
+
+
+class FrameDecoder:
+    """可恢复的增量帧解码器
+
+    feed() 每次只处理新到达的数据：已扫描过的字节通过读指针跳过，
+    不会在每次调用时从头重新扫描整个缓冲区。
+    """
+
+    def __init__(self, max_buffer_size=65536):
+        self.max_buffer_size = max_buffer_size
+        self._buffer = bytearray()
+        self._pos = 0  # 读指针，之前的字节均已消费
+
+        # 统计信息
+        self.frames_decoded = 0
+        self.bytes_discarded = 0
+        self.checksum_errors = 0
+
+    def reset(self):
+        """清空缓冲区（重新连接时调用）"""
+        self._buffer.clear()
+        self._pos = 0
+
+    def pending_bytes(self):
+        """缓冲区中尚未消费的字节数"""
+        return len(self._buffer) - self._pos
+
+    def feed(self, data):
+        """送入新接收的数据，返回其中所有完整帧（bytes）的列表"""
+        if data:
+            self._buffer.extend(data)
+
+        frames = []
+        buf = self._buffer
+        pos = self._pos
+        end = len(buf)
+
+        while True:
+            # 同步到下一个帧头
+            if end - pos < 2 or buf[pos] != 0xAA or buf[pos + 1] != 0x55:
+                header = buf.find(FRAME_HEADER, pos, end)
+                if header < 0:
+                    # 保留末尾可能是半个帧头的 0xAA
+                    keep = 1 if end > pos and buf[end - 1] == 0xAA else 0
+                    self.bytes_discarded += end - pos - keep
+                    pos = end - keep
+                    break
+                self.bytes_discarded += header - pos
+                pos = header
+
+            # 等待长度字段
+            if end - pos < 5:
+                break
+
+            data_len = buf[pos + 4]
+            frame_len = FRAME_OVERHEAD + data_len
+            if end - pos < frame_len:
+                break  # 半帧，等待后续数据
+
+            checksum_pos = pos + 5 + data_len
+            if buf[checksum_pos + 2] != 0x0D or buf[checksum_pos + 3] != 0x0A:
+                # 帧尾错误，说明这个帧头是误匹配，跳过一个字节重新同步
+                self.bytes_discarded += 1
+                pos += 1
+                continue
+
+            expected = (buf[checksum_pos] << 8) | buf[checksum_pos + 1]
+            if (sum(buf[pos + 2:checksum_pos]) & 0xFFFF) != expected:
+                self.checksum_errors += 1
+                self.bytes_discarded += 1
+                pos += 1
+                continue
+
+            frames.append(bytes(buf[pos:pos + frame_len]))
+            self.frames_decoded += 1
+            pos += frame_len
+
+        # 压缩缓冲区：已消费部分超过一半时才搬移，摊还O(1)
+        if pos >= len(buf):
+            buf.clear()
+            pos = 0
+        elif pos > len(buf) // 2:
+            del buf[:pos]
+            pos = 0
+
+        # 防止对端持续发送无效数据导致缓冲区无限增长
+        if len(buf) - pos > self.max_buffer_size:
+            overflow = len(buf) - pos - self.max_buffer_size
+            self.bytes_discarded += overflow
+            del buf[:pos + overflow]
+            pos = 0
+
+        self._pos = pos
+        return frames
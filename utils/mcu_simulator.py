@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - MCU 设备仿真（模拟服务端使用）
+
+BoardSimulator 模拟一块转发板及其下挂的若干设备地址：
+- 寄存器状态持久保存：写入的 SCR、设定电流在之后的读取中体现
+- 温度和电压按 Ornstein-Uhlenbeck 过程随时间漂移，均值随设定电流变化（发热、压降）
+- 未配置的地址不应答，广播地址 0xFF 的写入作用于所有设备
+
+FaultProfile 描述服务端的时延和故障注入：按命令的处理时延、抖动、丢弃应答、
+校验和错误、把一个响应拆成两段发送、把多个响应合并到一次发送。
+
+所有随机数都来自带种子的 random.Random，相同种子和相同请求序列得到相同结果。
+"""
+
+import math
+import random
+import time
+
+from config import Commands
+from utils import frame_codec
+from utils.request_pipeline import BROADCAST_ADDRESS
+
+DEFAULT_SCR = 0x48
+
+
+class DriftingValue:
+    """均值回归的随机漂移量（Ornstein-Uhlenbeck 过程），按读取时经过的时间推进"""
+
+    def __init__(self, mean, stddev, time_constant, rng, now):
+        self.mean = mean
+        self.stddev = stddev  # 稳态标准差
+        self.time_constant = time_constant  # 回归到均值的时间常数（秒）
+        self.rng = rng
+        self.value = mean
+        self.updated_at = now
+
+    def read(self, now):
+        dt = now - self.updated_at
+        if dt > 0:
+            decay = math.exp(-dt / self.time_constant)
+            noise = self.stddev * math.sqrt(1 - decay * decay) * self.rng.gauss(0, 1)
+            self.value = self.mean + (self.value - self.mean) * decay + noise
+            self.updated_at = now
+        return self.value
+
+
+class DeviceState:
+    """一个设备地址的寄存器和遥测状态"""
+
+    def __init__(self, address, rng, now, ambient=45.0, nominal_voltage=2500.0):
+        self.address = address
+        self.ambient = ambient
+        self.nominal_voltage = nominal_voltage
+        self.scr = DEFAULT_SCR
+        self.current = 0
+        self.serial_config = b""
+        self.temperature = DriftingValue(ambient, 1.5, 20.0, rng, now)  # °C
+        self.voltage = DriftingValue(nominal_voltage, 15.0, 5.0, rng, now)  # mV
+
+    def set_current(self, value):
+        self.current = value
+        # 电流越大温度越高、电压越低
+        self.temperature.mean = self.ambient + 0.1 * value
+        self.voltage.mean = self.nominal_voltage - 1.0 * value
+
+
+class BoardSimulator:
+    """一块转发板：设备地址 -> DeviceState"""
+
+    def __init__(self, addresses=range(16), seed=None, clock=time.monotonic):
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.started_at = clock()
+        now = self.started_at
+        self.devices = {address: DeviceState(address, self.rng, now) for address in addresses}
+
+    def handle(self, frame):
+        """处理一个完整的请求帧，返回响应帧；不应答时返回 b''"""
+        if len(frame) < 9 or frame[0] != 0xAA or frame[1] != 0x55:
+            return b''
+        addr, cmd, length = frame[2], frame[3], frame[4]
+        data = frame[5:5 + length]
+
+        if addr == BROADCAST_ADDRESS:
+            targets = list(self.devices.values())
+            if not targets:
+                return b''
+        else:
+            device = self.devices.get(addr)
+            if device is None:
+                return b''  # 地址上没有设备
+            targets = [device]
+        device = targets[0]
+        now = self.clock()
+
+        if cmd == Commands.PASSTHROUGH:  # 透传
+            payload = bytes(data)
+        elif cmd == Commands.SERIAL_CONFIG:  # 串口配置
+            for target in targets:
+                target.serial_config = bytes(data)
+            payload = b'\x01'
+        elif cmd == Commands.SET_CURRENT:  # 设置电流
+            if data:
+                for target in targets:
+                    target.set_current(data[0])
+            payload = b'\x00'
+        elif cmd == Commands.READ_SCR:  # 读SCR
+            payload = bytes([device.scr])
+        elif cmd == Commands.WRITE_SCR:  # 写SCR确认
+            if data:
+                for target in targets:
+                    target.scr = data[0]
+            payload = b'\x06'
+        elif cmd == Commands.GET_RUNTIME:  # 运行时间（秒）
+            payload = int(now - self.started_at).to_bytes(4, 'big')
+        elif cmd == Commands.GET_TEMPERATURE:  # MCU温度（°C）
+            payload = max(0, min(0xFFFF, round(device.temperature.read(now)))).to_bytes(2, 'big')
+        elif cmd == Commands.GET_VOLTAGE:  # MCU电压（mV）
+            payload = max(0, min(0xFFFF, round(device.voltage.read(now)))).to_bytes(2, 'big')
+        else:
+            payload = b'\x00'
+        return frame_codec.encode(addr, cmd, payload)
+
+
+class FaultProfile:
+    """服务端时延和故障注入参数
+
+    latency 为默认处理时延（秒），command_latency 按命令覆盖；jitter 为额外的
+    [0, jitter) 均匀随机时延。各 *_rate 为每个响应发生对应故障的概率。
+    """
+
+    def __init__(self, latency=0.0, command_latency=None, jitter=0.0, drop_rate=0.0,
+                 corrupt_rate=0.0, split_rate=0.0, split_gap=0.002, merge_rate=0.0,
+                 merge_window=0.01, seed=None):
+        self.latency = latency
+        self.command_latency = dict(command_latency or {})
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.split_rate = split_rate
+        self.split_gap = split_gap  # 拆分后两段之间的间隔（秒）
+        self.merge_rate = merge_rate
+        self.merge_window = merge_window  # 被合并的响应最多等待多久（秒）
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_dict(cls, values, seed=None):
+        """从配置字典创建，command_latency 的键可以是 "0xF6" 形式的字符串"""
+        values = dict(values or {})
+        command_latency = {
+            int(key, 0) if isinstance(key, str) else int(key): float(value)
+            for key, value in values.pop("command_latency", {}).items()
+        }
+        values.setdefault("seed", seed)
+        return cls(command_latency=command_latency, **values)
+
+    def to_dict(self):
+        """可序列化的参数（与 from_dict 对应）"""
+        return {
+            "latency": self.latency,
+            "command_latency": {f"0x{cmd:02X}": value for cmd, value in self.command_latency.items()},
+            "jitter": self.jitter,
+            "drop_rate": self.drop_rate,
+            "corrupt_rate": self.corrupt_rate,
+            "split_rate": self.split_rate,
+            "split_gap": self.split_gap,
+            "merge_rate": self.merge_rate,
+            "merge_window": self.merge_window,
+        }
+
+    def is_active(self):
+        return any((self.latency, self.command_latency, self.jitter, self.drop_rate,
+                    self.corrupt_rate, self.split_rate, self.merge_rate))
+
+    def service_delay(self, command):
+        delay = self.command_latency.get(command, self.latency)
+        if self.jitter:
+            delay += self.rng.uniform(0, self.jitter)
+        return delay
+
+    def drop(self):
+        return self.drop_rate > 0 and self.rng.random() < self.drop_rate
+
+    def corrupt(self, frame):
+        """按概率翻转校验和的一位，返回（可能被破坏的）帧"""
+        if self.corrupt_rate > 0 and self.rng.random() < self.corrupt_rate and len(frame) >= 4:
+            frame = bytearray(frame)
+            frame[-3] ^= 1 << self.rng.randrange(8)
+            return bytes(frame)
+        return frame
+
+    def split_point(self, frame):
+        """按概率返回拆分位置（0 表示不拆分）"""
+        if self.split_rate > 0 and len(frame) > 1 and self.rng.random() < self.split_rate:
+            return self.rng.randrange(1, len(frame))
+        return 0
+
+    def merge(self):
+        return self.merge_rate > 0 and self.rng.random() < self.merge_rate
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 轮询调度器
+
+每个 (转发板, 设备地址, 指标) 是一个独立的轮询任务，有自己的周期和相位偏移，
+按截止时间放在小顶堆中：
+- 下一次时间 = 上一次计划时间 + 周期，处理耗时不会累积成漂移
+- 新任务的相位按黄金分割序列错开，请求在时间上均匀分布而不是集中爆发
+- 周期可在运行时修改，下一次时间按新周期重新计算
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+_GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+class PollJob:
+    """一个轮询任务"""
+
+    __slots__ = ("key", "interval", "due", "generation", "runs", "last_run")
+
+    def __init__(self, key, interval, due):
+        self.key = key
+        self.interval = interval
+        self.due = due
+        self.generation = 0  # 重新调度时递增，堆中旧条目惰性失效
+        self.runs = 0
+        self.last_run = None
+
+
+class PollScheduler:
+    """基于截止时间堆的轮询调度器（非线程安全，由轮询线程独占使用）"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._jobs = {}  # key -> PollJob
+        self._heap = []  # (due, seq, generation, PollJob)
+        self._seq = itertools.count()
+        self._phase_index = 0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __contains__(self, key):
+        return key in self._jobs
+
+    def keys(self):
+        return list(self._jobs)
+
+    def job(self, key):
+        return self._jobs.get(key)
+
+    def add(self, key, interval, phase=None, now=None):
+        """添加任务；phase 为首次执行相对现在的偏移（秒），默认自动错开"""
+        if key in self._jobs:
+            return self._jobs[key]
+        now = self._clock() if now is None else now
+        if phase is None:
+            phase = ((self._phase_index * _GOLDEN_RATIO) % 1.0) * interval
+            self._phase_index += 1
+        job = PollJob(key, float(interval), now + phase)
+        self._jobs[key] = job
+        self._push(job)
+        return job
+
+    def remove(self, key):
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.generation += 1
+        return job
+
+    def set_interval(self, key, interval, now=None):
+        """修改任务周期，下一次执行时间 = 上一次执行时间 + 新周期（不早于现在）"""
+        job = self._jobs.get(key)
+        if job is None or job.interval == interval:
+            return
+        now = self._clock() if now is None else now
+        job.interval = float(interval)
+        if job.last_run is not None:
+            job.due = max(now, job.last_run + job.interval)
+        else:
+            job.due = min(job.due, now + job.interval)
+        job.generation += 1
+        self._push(job)
+
+    def next_deadline(self):
+        """最近一个任务的执行时间，没有任务时返回None"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """取出所有已到期的任务并按各自周期安排下一次执行"""
+        now = self._clock() if now is None else now
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, _, job = heapq.heappop(self._heap)
+            due.append(job)
+            job.runs += 1
+            job.last_run = job.due
+            # 按计划时间累加周期；落后超过一个周期（如系统休眠）时跳过错过的轮次
+            job.due += job.interval
+            if job.due <= now:
+                missed = math.floor((now - job.due) / job.interval) + 1
+                job.due += missed * job.interval
+            self._push(job)
+        return due
+
+    def clear(self):
+        self._jobs.clear()
+        self._heap.clear()
+        self._phase_index = 0
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.due, next(self._seq), job.generation, job))
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap:
+            _, _, generation, job = heap[0]
+            if generation == job.generation and self._jobs.get(job.key) is job:
+                return
+            heapq.heappop(heap)
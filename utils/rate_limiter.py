@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 请求速率限制（令牌桶）
+"""
+
+import time
+
+
+class TokenBucket:
+    """令牌桶：平均速率 rate 个/秒，最多积攒 burst 个；rate 为 0 表示不限速（非线程安全）"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self._clock = clock
+        self.rate = 0.0
+        self.burst = 1.0
+        self._tokens = 0.0
+        self._updated = clock()
+        self.set_rate(rate, burst)
+        self._tokens = self.burst
+
+    def set_rate(self, rate, burst=None):
+        self.rate = max(0.0, float(rate or 0))
+        self.burst = float(burst) if burst else max(1.0, self.rate / 10)
+        self._tokens = min(self._tokens, self.burst)
+
+    def try_acquire(self, now=None):
+        """取一个令牌，成功返回True"""
+        if not self.rate:
+            return True
+        self._refill(now)
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def delay(self, now=None):
+        """距离下一个令牌可用的秒数"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (1.0 - self._tokens) / self.rate)
+
+    def _refill(self, now):
+        now = self._clock() if now is None else now
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 自动重连策略
+
+指数退避加随机抖动，避免多块板子同时重启后客户端在同一时刻集中重连；
+以及断线期间每个排队任务的处理方式（保留到重连后发送 / 立即失败）。
+"""
+
+import random
+
+from utils.task_scheduler import BACKGROUND_TYPES
+
+HOLD = "hold"  # 保留在队列中，重连成功后继续发送
+FAIL = "fail"  # 立即失败并通知调用方
+
+
+def disconnect_policy(context):
+    """断线时任务的处理方式
+
+    上下文可用 "on_disconnect" 指定；默认后台轮询立即失败（重连后会重新轮询），
+    操作员命令保留到重连后发送。
+    """
+    if isinstance(context, dict):
+        policy = context.get("on_disconnect")
+        if policy in (HOLD, FAIL):
+            return policy
+        if context.get("type") in BACKGROUND_TYPES:
+            return FAIL
+    return HOLD
+
+
+class ReconnectBackoff:
+    """指数退避计时器"""
+
+    def __init__(self, base_delay=1.0, max_delay=30.0, max_attempts=10, jitter=0.2, rng=None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts  # 0 表示不限次数
+        self.jitter = jitter
+        self.attempt = 0
+        self._rng = rng or random.Random()
+
+    def reset(self):
+        self.attempt = 0
+
+    def exhausted(self):
+        return bool(self.max_attempts) and self.attempt >= self.max_attempts
+
+    def next_delay(self):
+        """返回下一次重连前的等待时间，并累加尝试次数"""
+        delay = min(self.max_delay, self.base_delay * (2 ** self.attempt))
+        self.attempt += 1
+        if self.jitter:
+            delay *= self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, delay)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            base_delay=config.get('network.reconnect_delay', 1),
+            max_delay=config.get('network.reconnect_max_delay', 30),
+            max_attempts=config.get('network.reconnect_attempts', 3),
+            jitter=config.get('network.reconnect_jitter', 0.2),
+        )
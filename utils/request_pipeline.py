@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 流水线请求窗口
+
+允许多个请求同时在途，响应按 (地址, 命令) 和到达顺序匹配回请求上下文，
+每个在途请求有独立的超时时间。
+
+超时重发过的请求，原始发送的响应可能迟到：协议中没有序号，先到的响应匹配该请求，
+之后同一 (地址, 命令) 的多余响应在一个超时周期内按重复响应丢弃（match 返回 DUPLICATE），
+不会被当作主动上报，也不会错配给之后发送的同类请求。
+"""
+
+import heapq
+import itertools
+import time
+from collections import deque
+
+BROADCAST_ADDRESS = 0xFF
+
+# match() 的返回值：已应答请求的多余响应（迟到的原始响应或重发的响应）
+DUPLICATE = object()
+
+
+class PendingRequest:
+    """一个在途请求"""
+
+    __slots__ = ("seq", "key", "frame", "context", "sent_at", "deadline", "attempts", "done")
+
+    def __init__(self, seq, key, frame, context, sent_at, deadline, attempts=0):
+        self.seq = seq
+        self.key = key
+        self.frame = frame
+        self.context = context
+        self.sent_at = sent_at
+        self.deadline = deadline
+        self.attempts = attempts  # 已重发次数
+        self.done = False
+
+
+def request_key(frame):
+    """从请求帧中提取 (地址, 命令)，非标准帧返回None"""
+    if len(frame) >= 5 and frame[0] == 0xAA and frame[1] == 0x55:
+        return frame[2], frame[3]
+    return None
+
+
+def mark_sent(context, now=None):
+    """在上下文中记下首次实际发送的时间 "wire_sent_at"（重发不覆盖），用于不含排队时间的延迟统计"""
+    if isinstance(context, dict) and "wire_sent_at" not in context:
+        context["wire_sent_at"] = time.monotonic() if now is None else now
+
+
+class InFlightWindow:
+    """在途请求窗口"""
+
+    def __init__(self, max_in_flight=4, timeout=3.0):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.timeout = timeout
+        self._by_key = {}  # key -> deque[PendingRequest]，保持发送顺序
+        self._deadlines = []  # (deadline, seq, PendingRequest) 小顶堆，惰性删除
+        self._seq = itertools.count()
+        self._count = 0
+        self._duplicates = {}  # key -> [尚未到达的多余响应数, 截止时间]
+
+        # 统计信息
+        self.duplicates_dropped = 0
+
+    def __len__(self):
+        return self._count
+
+    def is_full(self):
+        return self._count >= self.max_in_flight
+
+    def add(self, frame, context=None, timeout=None, now=None, attempts=0):
+        """登记一个已发送（或重发）的请求"""
+        now = time.monotonic() if now is None else now
+        if timeout is None:
+            timeout = self.timeout
+        key = request_key(frame)
+        pending = PendingRequest(next(self._seq), key, frame, context, now, now + timeout, attempts)
+        self._by_key.setdefault(key, deque()).append(pending)
+        heapq.heappush(self._deadlines, (pending.deadline, pending.seq, pending))
+        self._count += 1
+        return pending
+
+    def match(self, frame, now=None):
+        """为响应帧找到对应的在途请求
+
+        未匹配（主动上报）返回 None；已应答的重发请求的多余响应返回 DUPLICATE。
+        """
+        key = request_key(frame)
+        pending = None
+        if key is not None:
+            if self._duplicates:
+                now = time.monotonic() if now is None else now
+                # 多余响应比之后发送的同类请求的响应先到，先于在途请求消耗
+                if self._take_duplicate(key, now) or (
+                        key not in self._by_key and self._take_duplicate((BROADCAST_ADDRESS, key[1]), now)):
+                    return DUPLICATE
+            pending = self._pop(key)
+            if pending is None:
+                # 广播请求的响应可能带有实际设备地址
+                pending = self._pop((BROADCAST_ADDRESS, key[1]))
+        if pending is None:
+            # 自定义数据等非标准请求，按发送顺序匹配
+            pending = self._pop(None)
+        elif pending.attempts and pending.key is not None:
+            # 之前的每次发送都可能还有一个响应在路上
+            now = time.monotonic() if now is None else now
+            entry = self._duplicates.setdefault(pending.key, [0, 0])
+            entry[0] += pending.attempts
+            entry[1] = max(entry[1], now + pending.deadline - pending.sent_at)
+        return pending
+
+    def _take_duplicate(self, key, now):
+        entry = self._duplicates.get(key)
+        if entry is None:
+            return False
+        if entry[1] <= now:
+            # 超过一个超时周期仍未到达，视为已丢失
+            del self._duplicates[key]
+            return False
+        entry[0] -= 1
+        if not entry[0]:
+            del self._duplicates[key]
+        self.duplicates_dropped += 1
+        return True
+
+    def expire(self, now=None):
+        """取出所有已超时的请求"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, pending = heapq.heappop(self._deadlines)
+            if pending.done:
+                continue
+            self._remove(pending)
+            expired.append(pending)
+        return expired
+
+    def next_deadline(self):
+        """最近一个超时时间点，没有在途请求时返回None"""
+        while self._deadlines and self._deadlines[0][2].done:
+            heapq.heappop(self._deadlines)
+        return self._deadlines[0][0] if self._deadlines else None
+
+    def clear(self):
+        """清空窗口，返回所有未完成的请求（断开连接时调用）"""
+        remaining = [p for _, _, p in self._deadlines if not p.done]
+        remaining.sort(key=lambda p: p.seq)
+        for pending in remaining:
+            pending.done = True
+        self._by_key.clear()
+        self._deadlines.clear()
+        self._duplicates.clear()
+        self._count = 0
+        return remaining
+
+    def _pop(self, key):
+        queue = self._by_key.get(key)
+        if not queue:
+            return None
+        pending = queue.popleft()
+        if not queue:
+            del self._by_key[key]
+        pending.done = True
+        self._count -= 1
+        return pending
+
+    def _remove(self, pending):
+        queue = self._by_key.get(pending.key)
+        if queue is not None:
+            queue.remove(pending)
+            if not queue:
+                del self._by_key[pending.key]
+        pending.done = True
+        self._count -= 1
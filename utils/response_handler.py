@@ -1,79 +1,104 @@
-from utils.serial_board_client import SerialBoardClient
+from config import Commands
+from utils import command_table
 
 
 class ResponseHandler:
-    """负责处理各种类型的响应"""
+    """负责处理各种类型的响应
+
+    响应按命令表解码一次，再按操作码查分发表调用对应的处理方法；命令表中登记了但没有
+    专门处理方法的命令（如运行时间 0xF2）按表中的名称和单位记录日志。
+    """
 
     def __init__(self, main_window):
         self.main_window = main_window
-        self.client = SerialBoardClient()
+        # 操作码 -> 处理方法(spec, 值, 响应帧, 上下文, 端点)
+        self.handlers = [None] * 256
+        self.handlers[Commands.SET_CURRENT] = self.handle_current_setting
+        self.handlers[Commands.READ_SCR] = self.handle_read_scr
+        self.handlers[Commands.WRITE_SCR] = self.handle_write_scr
+        self.handlers[Commands.GET_TEMPERATURE] = self.handle_temperature
+        self.handlers[Commands.GET_VOLTAGE] = self.handle_voltage
+
+    def handle_response(self, response, context, endpoint=None):
+        """处理通信响应
 
-    def handle_response(self, response, context):
-        """处理通信响应"""
+        endpoint 为响应来源的转发板端点；单值状态标签只显示当前活动转发板、当前显示地址的数据。
+        上下文带 "replay" 的是抓包回放出的响应，只更新显示，不计入自适应轮询和遥测归档。
+        """
+        if not isinstance(context, dict):
+            context = {}
         try:
-            # 根据上下文类型处理不同的响应
-            if context and "type" in context:
-                resp_type = context["type"]
+            try:
+                spec, value = command_table.decode(response)
+            except ValueError as e:
+                self.main_window.log(f"响应解析失败: {e} ({response.hex(' ').upper()})")
+                return
+            if spec is None:
+                # 命令表中没有的命令
+                if context:
+                    self.main_window.log(f"未分类响应: {response.hex(' ').upper()}")
+                else:
+                    self.main_window.log(f"收到响应: {response.hex(' ').upper()}")
+                return
+            handler = self.handlers[spec.opcode]
+            if handler is None:
+                self.main_window.fleet_model.record(endpoint, context.get("address", response[2]))
+                self.main_window.log(f"{spec.label}: {spec.format(value)} ({response.hex(' ').upper()})")
+            else:
+                handler(spec, value, response, context, endpoint)
 
-                if resp_type == "current_setting":
-                    # 处理电流设置响应
-                    self.main_window.log(f"电流设置响应: {response.hex(' ').upper()}")
-                    addr = context.get("address", 0)
-                    value = context.get("value", 0)
-                    self.main_window.status_message.setText(f"已设置设备 {addr:02X} 电流值为 {value}")
+        except Exception as e:
+            self.main_window.log(f"响应处理错误: {str(e)}")
 
-                elif resp_type == "read_scr":
-                    # 处理SCR读取响应
-                    try:
-                        parsed = self.client.parse_response(response)
-                        if parsed and "data" in parsed and len(parsed["data"]) > 0:
-                            scr_value = parsed["data"][0]
-                            self.main_window.log(f"SCR值: {scr_value} ({response.hex(' ').upper()})")
-                            addr = context.get("address", 0)
-                            self.main_window.status_message.setText(f"已读取设备 {addr:02X} SCR值: {scr_value}")
-                        else:
-                            self.main_window.log(f"SCR读取响应数据解析错误: {response.hex(' ').upper()}")
-                    except Exception as e:
-                        self.main_window.log(f"SCR读取响应解析失败: {e}")
+    def _is_displayed(self, endpoint, address):
+        """响应是否来自当前活动转发板、当前显示的地址"""
+        return ((endpoint is None or endpoint == self.main_window.connections.active_endpoint)
+                and address == self.main_window.display_address())
 
-                elif resp_type == "write_scr":
-                    # 处理SCR写入响应
-                    self.main_window.log(f"SCR写入响应: {response.hex(' ').upper()}")
-                    addr = context.get("address", 0)
-                    self.main_window.status_message.setText(f"已向设备 {addr:02X} 写入SCR配置")
+    def handle_current_setting(self, spec, value, response, context, endpoint):
+        self.main_window.log(f"电流设置响应: {response.hex(' ').upper()}")
+        addr = context.get("address", response[2])
+        value = context.get("value", 0)
+        self.main_window.fleet_model.record(endpoint, addr, current=value)
+        self.main_window.status_message.setText(f"已设置设备 {addr:02X} 电流值为 {value}")
 
-                elif resp_type == "temperature":
-                    # 处理温度查询响应
-                    try:
-                        parsed = self.client.parse_response(response)
-                        if parsed and "data" in parsed and len(parsed["data"]) > 0:
-                            temp_value = int.from_bytes(parsed["data"], 'big')
-                            self.main_window.temp_label.setText(f"温度: {temp_value} °C")
-                            # 更新历史数据
-                            self.main_window.temperature_history.append(temp_value)
-                            self.main_window.temperature_history = self.main_window.temperature_history[-20:]
-                    except Exception as e:
-                        self.main_window.log(f"温度数据解析失败: {e}")
+    def handle_read_scr(self, spec, value, response, context, endpoint):
+        if value is None:
+            self.main_window.log(f"SCR读取响应数据解析错误: {response.hex(' ').upper()}")
+            return
+        self.main_window.log(f"SCR值: {value} ({response.hex(' ').upper()})")
+        addr = context.get("address", response[2])
+        self.main_window.fleet_model.record(endpoint, addr, scr=value)
+        self.main_window.status_message.setText(f"已读取设备 {addr:02X} SCR值: {value}")
 
-                elif resp_type == "voltage":
-                    # 处理电压查询响应
-                    try:
-                        parsed = self.client.parse_response(response)
-                        if parsed and "data" in parsed and len(parsed["data"]) > 0:
-                            volt_value = int.from_bytes(parsed["data"], 'big')
-                            self.main_window.volt_label.setText(f"电压: {volt_value / 10:.1f} V")
-                            # 更新历史数据
-                            self.main_window.voltage_history.append(volt_value / 10)
-                            self.main_window.voltage_history = self.main_window.voltage_history[-20:]
-                    except Exception as e:
-                        self.main_window.log(f"电压数据解析失败: {e}")
+    def handle_write_scr(self, spec, value, response, context, endpoint):
+        self.main_window.log(f"SCR写入响应: {response.hex(' ').upper()}")
+        addr = context.get("address", response[2])
+        if "value" in context:
+            self.main_window.fleet_model.record(endpoint, addr, scr=context["value"])
+        else:
+            self.main_window.fleet_model.record(endpoint, addr)
+        self.main_window.status_message.setText(f"已向设备 {addr:02X} 写入SCR配置")
 
-                else:
-                    # 处理其他未知类型的响应
-                    self.main_window.log(f"未分类响应: {response.hex(' ').upper()}")
-            else:
-                # 无上下文的响应处理
-                self.main_window.log(f"收到响应: {response.hex(' ').upper()}")
+    def handle_temperature(self, spec, value, response, context, endpoint):
+        if value is None:
+            return  # 空数据区，不是有效读数
+        address = context.get("address", response[2])
+        if not context.get("replay"):
+            self.main_window.status_worker.record_reading(endpoint, address, "temperature", value)
+            # 更新历史数据
+            self.main_window.telemetry.append(endpoint, address, "temperature", value)
+        self.main_window.fleet_model.record(endpoint, address, temperature=value)
+        if self._is_displayed(endpoint, address):
+            self.main_window.ui_updater.set_text(self.main_window.temp_label, f"温度: {value} °C")
 
-        except Exception as e:
-            self.main_window.log(f"响应处理错误: {str(e)}")
\ No newline at end of file
+    def handle_voltage(self, spec, value, response, context, endpoint):
+        if value is None:
+            return
+        address = context.get("address", response[2])
+        if not context.get("replay"):
+            self.main_window.status_worker.record_reading(endpoint, address, "voltage", value)
+            self.main_window.telemetry.append(endpoint, address, "voltage", value)
+        self.main_window.fleet_model.record(endpoint, address, voltage=value)
+        if self._is_displayed(endpoint, address):
+            self.main_window.ui_updater.set_text(self.main_window.volt_label, f"电压: {value:.1f} V")
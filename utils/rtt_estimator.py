@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 自适应超时
+
+按 TCP RTO 的方式（RFC 6298）为每块板、每条命令维护平滑往返时间 SRTT 和偏差 RTTVAR，
+据此计算请求超时；幂等的读命令超时后自动重发。
+局域网内死板可在几十毫秒内被发现，慢速链路也不会被误判超时。
+"""
+
+from utils.command_table import IDEMPOTENT_COMMANDS  # 幂等命令（读温度、电压、SCR等）超时可安全重发
+
+
+class RttEstimator:
+    """单个对象的往返时间估计器"""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, initial_rto=3.0, min_rto=0.02, max_rto=3.0, granularity=0.001):
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.granularity = granularity
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def update(self, rtt):
+        """加入一个往返时间样本（秒）"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+
+    @property
+    def rto(self):
+        """当前超时时间（秒）"""
+        if self.srtt is None:
+            return self.initial_rto
+        rto = self.srtt + max(self.granularity, self.K * self.rttvar)
+        return min(self.max_rto, max(self.min_rto, rto))
+
+
+class AdaptiveTimeouts:
+    """一块转发板的超时与重发策略
+
+    每条命令一个估计器，另有一个整板估计器用于尚无样本的命令。
+    """
+
+    def __init__(self, initial_rto=3.0, min_rto=0.02, max_rto=3.0, max_retries=2, dead_after=3):
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_retries = max_retries
+        self.dead_after = dead_after  # 连续多少个请求最终超时判定连接失效（0 表示不判定）
+        self.board = self._new_estimator()
+        self.commands = {}
+        self.consecutive_timeouts = 0
+
+    def _new_estimator(self):
+        return RttEstimator(self.initial_rto, self.min_rto, self.max_rto)
+
+    def _estimator(self, key):
+        if key is None:
+            return self.board
+        estimator = self.commands.get(key[1])
+        if estimator is None or not estimator.samples:
+            return self.board
+        return estimator
+
+    def timeout_for(self, key, attempts=0):
+        """请求的超时时间；重发时按指数退避加倍"""
+        return min(self.max_rto, self._estimator(key).rto * (2 ** attempts))
+
+    def on_response(self, pending, now):
+        """收到响应：按 Karn 算法只用未重发过的请求更新估计"""
+        self.consecutive_timeouts = 0
+        if pending.attempts:
+            return
+        rtt = now - pending.sent_at
+        self.board.update(rtt)
+        if pending.key is not None:
+            command = pending.key[1]
+            if command not in self.commands:
+                self.commands[command] = self._new_estimator()
+            self.commands[command].update(rtt)
+
+    def should_retry(self, pending):
+        return (pending.key is not None
+                and pending.key[1] in IDEMPOTENT_COMMANDS
+                and pending.attempts < self.max_retries)
+
+    def on_timeout(self):
+        """请求最终超时，返回是否应判定连接失效"""
+        self.consecutive_timeouts += 1
+        return bool(self.dead_after) and self.consecutive_timeouts >= self.dead_after
+
+    def reset_link(self):
+        self.consecutive_timeouts = 0
+
+    @property
+    def srtt(self):
+        return self.board.srtt
+
+    def snapshot(self):
+        """各命令的 (srtt, rttvar, rto, 样本数)，键 None 为整板"""
+        result = {None: (self.board.srtt, self.board.rttvar, self.board.rto, self.board.samples)}
+        for command, est in self.commands.items():
+            result[command] = (est.srtt, est.rttvar, est.rto, est.samples)
+        return result
+
+    @classmethod
+    def from_config(cls, config, request_timeout=None):
+        """request_timeout 为初始/最大超时，未指定时取 network.request_timeout"""
+        if request_timeout is None:
+            request_timeout = config.get('network.request_timeout', 3.0)
+        return cls(
+            initial_rto=request_timeout,
+            min_rto=config.get('network.min_request_timeout', 0.02),
+            max_rto=request_timeout,
+            max_retries=config.get('network.max_retries', 2),
+            dead_after=config.get('network.dead_after_timeouts', 3),
+        )
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 优先级任务调度器
+
+替代先进先出的 queue.Queue：
+- 操作员发起的交互命令优先于后台遥测轮询
+- 仍在排队的同地址 SET_CURRENT 被新值替换（后写者胜出）
+- 重复的待发轮询请求合并为一个
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+from utils.request_pipeline import request_key
+
+# 优先级，数值越小越先发送
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# 按上下文类型划分的默认策略
+BACKGROUND_TYPES = {"temperature", "voltage"}
+COALESCE_REPLACE_TYPES = {"current_setting"}  # 后写者胜出
+COALESCE_DROP_TYPES = {"temperature", "voltage"}  # 已有相同请求排队时丢弃新请求
+
+
+class _Entry:
+    __slots__ = ("frame", "context", "key")
+
+    def __init__(self, frame, context, key):
+        self.frame = frame
+        self.context = context
+        self.key = key
+
+
+def classify(frame, context):
+    """根据上下文确定 (优先级, 合并键, 合并方式)
+
+    上下文中可用 "priority" 覆盖默认优先级，"coalesce": False 表示不参与合并。
+    """
+    req_type = context.get("type") if isinstance(context, dict) else None
+    priority = PRIORITY_BACKGROUND if req_type in BACKGROUND_TYPES else PRIORITY_INTERACTIVE
+    if isinstance(context, dict) and "priority" in context:
+        priority = context["priority"]
+
+    key = request_key(frame)
+    if isinstance(context, dict) and context.get("coalesce") is False:
+        key = None
+    if key is not None and req_type in COALESCE_REPLACE_TYPES:
+        return priority, (req_type,) + key, "replace"
+    if key is not None and req_type in COALESCE_DROP_TYPES:
+        return priority, (req_type,) + key, "drop"
+    return priority, None, None
+
+
+class TaskScheduler:
+    """线程安全的优先级任务队列，接口与 queue.Queue 的 put/get 兼容"""
+
+    def __init__(self, on_coalesced=None):
+        # on_coalesced(被合并掉的上下文, 保留的上下文)，在锁外调用
+        self.on_coalesced = on_coalesced
+        self._heap = []  # (priority, seq, _Entry)
+        self._pending = {}  # 合并键 -> 排队中的 _Entry
+        self._seq = itertools.count()
+        self._size = 0
+        self._cond = threading.Condition()
+
+        # 统计信息
+        self.replaced = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """加入任务 (frame, context)，返回是否新增了排队项"""
+        frame, context = item
+        priority, key, mode = classify(frame, context)
+        coalesced = None
+        with self._cond:
+            existing = self._pending.get(key) if key is not None else None
+            if existing is not None:
+                if mode == "replace":
+                    # 保留原排队位置，只替换内容
+                    coalesced = (existing.context, context)
+                    existing.frame = frame
+                    existing.context = context
+                    self.replaced += 1
+                else:
+                    coalesced = (context, existing.context)
+                    self.dropped += 1
+            else:
+                entry = _Entry(frame, context, key)
+                if key is not None:
+                    self._pending[key] = entry
+                heapq.heappush(self._heap, (priority, next(self._seq), entry))
+                self._size += 1
+                self._cond.notify()
+                return True
+
+        if self.on_coalesced is not None:
+            self.on_coalesced(*coalesced)
+        return False
+
+    def requeue(self, item):
+        """把断线时在途的任务放回队列，返回是否新增了排队项
+
+        与 put 不同，排队中已有相同合并键的任务时总是保留排队中的（它是之后提交的、更新的请求），
+        放回的旧任务被丢弃，结果同样通过 on_coalesced 关联到保留的任务。
+        """
+        frame, context = item
+        priority, key, _ = classify(frame, context)
+        with self._cond:
+            existing = self._pending.get(key) if key is not None else None
+            if existing is None:
+                entry = _Entry(frame, context, key)
+                if key is not None:
+                    self._pending[key] = entry
+                heapq.heappush(self._heap, (priority, next(self._seq), entry))
+                self._size += 1
+                self._cond.notify()
+                return True
+            kept_context = existing.context
+            self.dropped += 1
+
+        if self.on_coalesced is not None:
+            self.on_coalesced(context, kept_context)
+        return False
+
+    def get(self, block=True, timeout=None):
+        """取出优先级最高的任务，行为同 queue.Queue.get"""
+        with self._cond:
+            if not block:
+                if not self._size:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self._size:
+                    self._cond.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self._size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._cond.wait(remaining)
+            return self._pop()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return not self._size
+
+    def clear(self):
+        """丢弃所有排队任务，返回被丢弃的 (frame, context) 列表"""
+        with self._cond:
+            items = [(e.frame, e.context) for _, _, e in sorted(self._heap, key=lambda t: t[:2])]
+            self._heap.clear()
+            self._pending.clear()
+            self._size = 0
+            return items
+
+    def remove_if(self, predicate):
+        """移除所有满足 predicate(frame, context) 的排队任务，按原顺序返回"""
+        with self._cond:
+            kept, removed = [], []
+            for item in sorted(self._heap, key=lambda t: t[:2]):
+                entry = item[2]
+                if predicate(entry.frame, entry.context):
+                    removed.append((entry.frame, entry.context))
+                    if entry.key is not None:
+                        self._pending.pop(entry.key, None)
+                else:
+                    kept.append(item)
+            if removed:
+                self._heap = kept  # 已排序的列表本身就是合法的堆
+                self._size = len(kept)
+            return removed
+
+    def _pop(self):
+        _, _, entry = heapq.heappop(self._heap)
+        if entry.key is not None:
+            self._pending.pop(entry.key, None)
+        self._size -= 1
+        return entry.frame, entry.context
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 遥测数据持久化存档
+
+每个 (转发板, 设备地址, 指标) 一组只追加的二进制文件：
+
+    <目录>/<host>_<port>/<地址>_<指标>.raw   原始样本     <d d      时间戳(time.time()), 数值
+    <目录>/<host>_<port>/<地址>_<指标>.1s    1秒降采样    <d I d d d 桶起点, 样本数, 最小, 最大, 平均
+    <目录>/<host>_<port>/<地址>_<指标>.1m    1分钟降采样
+    <目录>/<host>_<port>/<地址>_<指标>.1h    1小时降采样
+
+写入由后台线程完成：append() 只把样本放入队列，不会阻塞调用方（界面线程或通信线程）。
+读取时用 mmap 映射文件并按时间二分查找，查询一个月的数据时自动选用足够粗的降采样层级。
+"""
+
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+from config import get_config
+
+RAW_RECORD = struct.Struct('<dd')
+TIER_RECORD = struct.Struct('<dIddd')
+
+# 降采样层级：后缀 -> 桶宽度（秒），从细到粗
+TIERS = (("1s", 1), ("1m", 60), ("1h", 3600))
+
+
+def _series_path(root, endpoint, address, metric):
+    host, port = endpoint if endpoint else ("local", 0)
+    return os.path.join(root, f"{host}_{port}", f"{address:02X}_{metric}")
+
+
+class _Bucket:
+    """正在累计的降采样桶"""
+
+    __slots__ = ("start", "count", "min", "max", "sum")
+
+    def __init__(self, start, value):
+        self.start = start
+        self.count = 1
+        self.min = value
+        self.max = value
+        self.sum = value
+
+    def add(self, value):
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sum += value
+
+    def pack(self):
+        return TIER_RECORD.pack(self.start, self.count, self.min, self.max, self.sum / self.count)
+
+
+def _open_append(filename, record):
+    """以追加方式打开定长记录文件，返回 (文件, 最后一条记录的时间)
+
+    上次异常退出留下的不完整记录被截掉，保证之后追加的记录仍按记录长度对齐。
+    """
+    stream = open(filename, "ab")
+    size = stream.tell()
+    whole = size - size % record.size
+    if whole != size:
+        stream.truncate(whole)
+        stream.seek(whole)
+    last_time = None
+    if whole:
+        with open(filename, "rb") as f:
+            f.seek(whole - record.size)
+            last_time = struct.unpack_from('<d', f.read(record.size))[0]
+    return stream, last_time
+
+
+class _SeriesWriter:
+    """单个序列的文件句柄和降采样状态（只在写线程中使用）
+
+    读取按时间二分查找，要求记录时间单调不减。系统时钟回拨（NTP 校时、手动改时间）后的样本
+    时间被钳制为已写入的最后时间，不会打乱文件中的顺序。
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.raw, self.last_time = _open_append(path + ".raw", RAW_RECORD)
+        self.tiers = []
+        for suffix, width in TIERS:
+            stream, last_start = _open_append(f"{path}.{suffix}", TIER_RECORD)
+            self.tiers.append((width, stream))
+            if last_start is not None and (self.last_time is None or last_start > self.last_time):
+                self.last_time = last_start
+        self.buckets = [None] * len(TIERS)
+
+    def write(self, timestamp, value):
+        """写入一个样本，返回时间是否因时钟回拨被钳制"""
+        clamped = self.last_time is not None and timestamp < self.last_time
+        if clamped:
+            timestamp = self.last_time
+        self.last_time = timestamp
+        self.raw.write(RAW_RECORD.pack(timestamp, value))
+        for i, (width, stream) in enumerate(self.tiers):
+            start = timestamp - timestamp % width
+            bucket = self.buckets[i]
+            if bucket is not None and bucket.start == start:
+                bucket.add(value)
+                continue
+            if bucket is not None:
+                stream.write(bucket.pack())
+            self.buckets[i] = _Bucket(start, value)
+        return clamped
+
+    def flush(self):
+        self.raw.flush()
+        for _, stream in self.tiers:
+            stream.flush()
+
+    def close(self):
+        # 未完成的桶也写出；下次运行落入同一桶的数据在读取时合并
+        for (_, stream), bucket in zip(self.tiers, self.buckets):
+            if bucket is not None:
+                stream.write(bucket.pack())
+        self.raw.close()
+        for _, stream in self.tiers:
+            stream.close()
+
+
+class TelemetryArchive:
+    """遥测数据存档，写入在后台线程中进行"""
+
+    def __init__(self, root=None, flush_interval=None):
+        config = get_config()
+        self.root = root or config.get('telemetry.archive_dir', 'telemetry_data')
+        self.flush_interval = flush_interval or config.get('telemetry.flush_interval', 1.0)
+        self._queue = queue.SimpleQueue()
+        self._writers = {}  # (端点, 地址, 指标) -> _SeriesWriter
+        self._closed = False
+        self.written = 0
+        self.clamped = 0  # 因时钟回拨被钳制时间的样本数
+        self.errors = 0
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name="TelemetryArchive", daemon=True)
+        self._thread.start()
+
+    def append(self, endpoint, address, metric, value, timestamp=None):
+        """追加一个样本（线程安全，不阻塞）"""
+        if not self._closed:
+            self._queue.put((endpoint, address, metric, value, time.time() if timestamp is None else timestamp))
+
+    def close(self):
+        """写出队列中剩余的样本并关闭所有文件"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))]
+            except queue.Empty:
+                batch = []
+            # 一次取完队列中已有的样本，批量写入
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for sample in batch:
+                if sample is None:
+                    running = False
+                else:
+                    self._write(*sample)
+            if not running or time.monotonic() >= next_flush:
+                self._flush()
+                next_flush = time.monotonic() + self.flush_interval
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def _write(self, endpoint, address, metric, value, timestamp):
+        key = (endpoint, address, metric)
+        try:
+            writer = self._writers.get(key)
+            if writer is None:
+                writer = self._writers[key] = _SeriesWriter(_series_path(self.root, endpoint, address, metric))
+            if writer.write(timestamp, value):
+                self.clamped += 1
+            self.written += 1
+        except OSError as e:
+            self.errors += 1
+            self.last_error = str(e)
+
+    def _flush(self):
+        for writer in self._writers.values():
+            try:
+                writer.flush()
+            except OSError as e:
+                self.errors += 1
+                self.last_error = str(e)
+
+    # 读取（任意线程，直接读文件，不经过写线程）
+    def read(self, endpoint, address, metric, start=None, end=None, max_points=2000):
+        """读取时间范围 [start, end]（time.time() 时间）的数据
+
+        按范围自动选择层级：原始样本不超过 max_points 时返回 ("raw", [(时间, 数值), ...])，
+        否则返回能满足点数要求的最细层级 (后缀, [(桶起点, 样本数, 最小, 最大, 平均), ...])。
+        """
+        path = _series_path(self.root, endpoint, address, metric)
+        count, first_time, last_time = count_records(path + ".raw", RAW_RECORD, start, end)
+        if count <= max_points:
+            return "raw", read_records(path + ".raw", RAW_RECORD, start, end)
+        span = last_time - first_time
+        for suffix, width in TIERS:
+            if span / width <= max_points or suffix == TIERS[-1][0]:
+                return suffix, read_tier(path + "." + suffix, start, end)
+
+    def read_tier(self, endpoint, address, metric, suffix, start=None, end=None):
+        """读取指定降采样层级"""
+        return read_tier(_series_path(self.root, endpoint, address, metric) + "." + suffix, start, end)
+
+
+def _map_range(filename, record, start, end, reader):
+    """mmap 映射定长记录文件，二分查找首字段在 [start, end] 内的记录下标范围并交给 reader 处理"""
+    try:
+        with open(filename, "rb") as f:
+            count = os.fstat(f.fileno()).st_size // record.size  # 忽略写线程正在写的不完整记录
+            if not count:
+                return reader(None, 0, 0)
+            with mmap.mmap(f.fileno(), count * record.size, access=mmap.ACCESS_READ) as mm:
+                first = 0 if start is None else _search(mm, record, count, start)
+                last = count if end is None else _search(mm, record, count, end, right=True)
+                return reader(mm, first, last)
+    except FileNotFoundError:
+        return reader(None, 0, 0)
+
+
+def read_records(filename, record, start=None, end=None):
+    """读取首字段（时间）在 [start, end] 内的记录"""
+    return _map_range(filename, record, start, end, lambda mm, first, last: [
+        record.unpack_from(mm, i * record.size) for i in range(first, last)
+    ])
+
+
+def count_records(filename, record, start=None, end=None):
+    """范围内的记录数及首尾时间，不解包数据"""
+    def reader(mm, first, last):
+        if last <= first:
+            return 0, 0.0, 0.0
+        first_time = struct.unpack_from('<d', mm, first * record.size)[0]
+        last_time = struct.unpack_from('<d', mm, (last - 1) * record.size)[0]
+        return last - first, first_time, last_time
+    return _map_range(filename, record, start, end, reader)
+
+
+def read_tier(filename, start=None, end=None):
+    """读取降采样层级，合并跨运行写出的同一个桶"""
+    merged = []
+    for bucket_start, count, low, high, mean in read_records(filename, TIER_RECORD, start, end):
+        if merged and merged[-1][0] == bucket_start:
+            _, c, lo, hi, m = merged[-1]
+            total = c + count
+            merged[-1] = (bucket_start, total, min(lo, low), max(hi, high), (m * c + mean * count) / total)
+        else:
+            merged.append((bucket_start, count, low, high, mean))
+    return merged
+
+
+def _search(mm, record, count, timestamp, right=False):
+    """在按时间递增的记录中二分查找"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        t = struct.unpack_from('<d', mm, mid * record.size)[0]
+        if t < timestamp or (right and t == timestamp):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 遥测数据环形缓冲区
+
+每个 (转发板, 设备地址, 指标) 一个固定容量的环形缓冲区，时间戳（time.monotonic()）
+和数值分别存放在 array('d') 中：
+- 追加为 O(1)，写满后覆盖最旧的数据，不再每次切片生成新列表
+- 按时间窗口读取时返回 memoryview 分段（环绕时为两段），不复制数据
+- 底层数组按需倍增到容量上限，稀疏的序列不会预先占满内存
+- 维护按块的 min/max 金字塔（查询前增量并入新样本），任意区间的最值查询为 O(log N)，
+  曲线重绘不需要遍历可见的全部样本
+"""
+
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from config import get_config
+
+DEFAULT_CAPACITY = 100000
+BLOCK = 32  # 金字塔叶子覆盖的样本数
+SCAN_BLOCKS = 2  # 不超过这么多整块的区间直接扫描切片，比遍历树节点更快
+
+
+class _MinMaxPyramid:
+    """按物理下标组织的 min/max 线段树
+
+    叶子是 BLOCK 个连续物理槽位的最值，内部节点合并两个子节点，
+    区间查询只触及 O(log N) 个节点。
+    """
+
+    __slots__ = ("_leaves", "_mins", "_maxs")
+
+    def __init__(self, allocated):
+        blocks = (allocated + BLOCK - 1) // BLOCK
+        leaves = 1
+        while leaves < blocks:
+            leaves *= 2
+        self._leaves = leaves
+        self._mins = array('d', [float('inf')]) * (2 * leaves)
+        self._maxs = array('d', [float('-inf')]) * (2 * leaves)
+
+    def refresh(self, values, begin, end, valid):
+        """物理槽位 [begin, end) 被改写后重算覆盖它们的块及其祖先，valid 为有效槽位的上界"""
+        view = memoryview(values)
+        mins, maxs = self._mins, self._maxs
+        first, last = begin // BLOCK, (end - 1) // BLOCK
+        for block in range(first, last + 1):
+            chunk = view[block * BLOCK:min((block + 1) * BLOCK, valid)]
+            mins[self._leaves + block] = min(chunk)
+            maxs[self._leaves + block] = max(chunk)
+        lo, hi = (self._leaves + first) >> 1, (self._leaves + last) >> 1
+        while lo:
+            for node in range(lo, hi + 1):
+                left = 2 * node
+                mins[node] = min(mins[left], mins[left + 1])
+                maxs[node] = max(maxs[left], maxs[left + 1])
+            lo >>= 1
+            hi >>= 1
+
+    def query(self, values, begin, end):
+        """物理区间 [begin, end) 的 (最小值, 最大值)，首尾不完整的块直接在数组切片上计算"""
+        view = memoryview(values)
+        first = (begin + BLOCK - 1) // BLOCK
+        last = end // BLOCK
+        if last - first < SCAN_BLOCKS:
+            chunk = view[begin:end]
+            return min(chunk), max(chunk)
+        low, high = float('inf'), float('-inf')
+        for a, b in ((begin, first * BLOCK), (last * BLOCK, end)):
+            if b > a:
+                chunk = view[a:b]
+                low, high = min(low, min(chunk)), max(high, max(chunk))
+        mins, maxs = self._mins, self._maxs
+        left, right = first + self._leaves, last + self._leaves
+        while left < right:
+            if left & 1:
+                low, high = min(low, mins[left]), max(high, maxs[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                low, high = min(low, mins[right]), max(high, maxs[right])
+            left >>= 1
+            right >>= 1
+        return low, high
+
+
+class RingBuffer:
+    """(时间戳, 数值) 环形缓冲区（非线程安全，由界面线程使用）
+
+    segments()/window() 返回的 memoryview 直接引用内部数组，后续追加可能覆盖其中的数据，
+    应在使用后立即释放，不要长期保存。
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, initial_size=64):
+        self.capacity = max(1, int(capacity))
+        size = min(self.capacity, initial_size)
+        self._times = array('d', bytes(8 * size))
+        self._values = array('d', bytes(8 * size))
+        self._pyramid = _MinMaxPyramid(size)
+        self._start = 0  # 最旧样本的物理下标
+        self._size = 0
+        self.total = 0  # 累计追加的样本数（含已被覆盖的）
+        self._synced = 0  # 金字塔已反映的 total
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        allocated = len(self._times)
+        if self._size == allocated and allocated < self.capacity:
+            self._grow()
+            allocated = len(self._times)
+        if self._size < allocated:
+            i = (self._start + self._size) % allocated
+            self._size += 1
+        else:
+            # 已满：覆盖最旧的样本
+            i = self._start
+            self._start = (self._start + 1) % allocated
+        self._times[i] = timestamp
+        self._values[i] = value
+        self.total += 1
+
+    def latest(self):
+        """最新样本 (时间戳, 数值)，为空时返回None"""
+        if not self._size:
+            return None
+        i = (self._start + self._size - 1) % len(self._times)
+        return self._times[i], self._values[i]
+
+    def time_at(self, index):
+        """逻辑下标 index（0 为最旧）处的时间戳"""
+        return self._times[(self._start + index) % len(self._times)]
+
+    def first_time(self):
+        return self._times[self._start] if self._size else None
+
+    def segments(self, first=0, last=None):
+        """逻辑下标 [first, last) 范围的数据，返回 [(时间戳视图, 数值视图), ...]（按时间顺序）"""
+        last = self._size if last is None else min(last, self._size)
+        first = max(0, first)
+        if first >= last:
+            return []
+        allocated = len(self._times)
+        begin = (self._start + first) % allocated
+        count = last - first
+        times = memoryview(self._times)
+        values = memoryview(self._values)
+        if begin + count <= allocated:
+            return [(times[begin:begin + count], values[begin:begin + count])]
+        split = allocated - begin
+        return [
+            (times[begin:], values[begin:]),
+            (times[:count - split], values[:count - split]),
+        ]
+
+    def bisect_left(self, timestamp, lo=0, hi=None):
+        """逻辑下标 [lo, hi) 内第一个时间戳 >= timestamp 的位置"""
+        return self._bisect(bisect_left, timestamp, lo, hi)
+
+    def bisect_right(self, timestamp, lo=0, hi=None):
+        """逻辑下标 [lo, hi) 内第一个时间戳 > timestamp 的位置"""
+        return self._bisect(bisect_right, timestamp, lo, hi)
+
+    def bounds(self, start=None, end=None):
+        """时间范围 [start, end] 对应的逻辑下标区间 (first, last)，None 表示不限"""
+        first = 0 if start is None else self.bisect_left(start)
+        last = self._size if end is None else self.bisect_right(end, first)
+        return first, last
+
+    def window(self, start=None, end=None):
+        """时间范围 [start, end] 内的数据（零拷贝分段），None 表示不限"""
+        return self.segments(*self.bounds(start, end))
+
+    def minmax(self, first=0, last=None):
+        """逻辑下标 [first, last) 范围内数值的 (最小值, 最大值)，O(log N)；范围为空时返回None"""
+        last = self._size if last is None else min(last, self._size)
+        first = max(0, first)
+        if first >= last:
+            return None
+        self._sync_pyramid()
+        allocated = len(self._times)
+        begin = (self._start + first) % allocated
+        count = last - first
+        if begin + count <= allocated:
+            return self._pyramid.query(self._values, begin, begin + count)
+        low, high = self._pyramid.query(self._values, begin, allocated)
+        wrap_low, wrap_high = self._pyramid.query(self._values, 0, count - (allocated - begin))
+        return min(low, wrap_low), max(high, wrap_high)
+
+    def tail(self, count):
+        """最新的 count 个样本（零拷贝分段）"""
+        return self.segments(self._size - count)
+
+    def values(self, start=None, end=None):
+        """时间范围内数值的副本列表（便于少量数据的简单使用）"""
+        result = []
+        for _, values in self.window(start, end):
+            result.extend(values)
+        return result
+
+    def _bisect(self, search, timestamp, lo, hi):
+        """在底层数组上二分（环绕时先按分界点选定一段），比逐个按逻辑下标取值快得多"""
+        hi = self._size if hi is None else min(hi, self._size)
+        if lo >= hi:
+            return lo
+        times = memoryview(self._times)
+        allocated = len(self._times)
+        offset = self._start
+        if offset + hi <= allocated:
+            return search(times, timestamp, offset + lo, offset + hi) - offset
+        if offset + lo >= allocated:
+            return search(times, timestamp, offset + lo - allocated, offset + hi - allocated) + allocated - offset
+        split = allocated - offset  # 第一个环绕样本的逻辑下标
+        if search(times, timestamp, allocated - 1, allocated) == allocated - 1:
+            return search(times, timestamp, offset + lo, allocated) - offset
+        return search(times, timestamp, 0, offset + hi - allocated) + split
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+        self._pyramid = _MinMaxPyramid(len(self._times))
+        self._synced = self.total
+
+    def _sync_pyramid(self):
+        """把上次查询以来追加的样本并入金字塔
+
+        追加本身不触及金字塔（保持 O(1)），查询前只重算新样本所在的块，
+        重绘间隔内的追加合并为一次批量更新。未写满时 _start 恒为 0，有效槽位是 [0, _size)。
+        """
+        pending = self.total - self._synced
+        if not pending:
+            return
+        self._synced = self.total
+        allocated = len(self._times)
+        if pending >= self._size:
+            self._pyramid.refresh(self._values, 0, self._size, self._size)
+            return
+        begin = (self._start + self._size - pending) % allocated
+        if begin + pending <= allocated:
+            self._pyramid.refresh(self._values, begin, begin + pending, self._size)
+        else:
+            self._pyramid.refresh(self._values, begin, allocated, self._size)
+            self._pyramid.refresh(self._values, 0, begin + pending - allocated, self._size)
+
+    def _grow(self):
+        """容量倍增：按时间顺序复制到新数组，旧数组上已发出的视图仍然有效"""
+        size = min(self.capacity, len(self._times) * 2)
+        times = array('d', bytes(8 * size))
+        values = array('d', bytes(8 * size))
+        n = 0
+        for t, v in self.segments():
+            times[n:n + len(t)] = array('d', t)
+            values[n:n + len(v)] = array('d', v)
+            n += len(t)
+        self._times = times
+        self._values = values
+        self._start = 0
+        self._pyramid = _MinMaxPyramid(size)
+        self._synced = self.total - n  # 下次查询时整体重建
+
+
+class TelemetryStore:
+    """按 (转发板, 设备地址, 指标) 组织的遥测数据
+
+    archive 为可选的 utils.telemetry_archive.TelemetryArchive，每个样本同时写入磁盘存档。
+    """
+
+    def __init__(self, capacity=None, archive=None):
+        if capacity is None:
+            capacity = get_config().get('telemetry.capacity', DEFAULT_CAPACITY)
+        self.capacity = capacity
+        self.archive = archive
+        self._series = {}
+
+    def append(self, endpoint, address, metric, value, timestamp=None):
+        key = (endpoint, address, metric)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = RingBuffer(self.capacity)
+        series.append(value, timestamp)
+        if self.archive is not None:
+            self.archive.append(endpoint, address, metric, value)
+
+    def series(self, endpoint, address, metric):
+        """对应的 RingBuffer，没有数据时返回None"""
+        return self._series.get((endpoint, address, metric))
+
+    def latest(self, endpoint, address, metric):
+        series = self._series.get((endpoint, address, metric))
+        return series.latest() if series is not None else None
+
+    def keys(self):
+        return list(self._series)
+
+    def remove(self, endpoint=None):
+        """删除某个转发板（默认全部）的数据"""
+        if endpoint is None:
+            self._series.clear()
+            return
+        for key in [k for k in self._series if k[0] == endpoint]:
+            del self._series[key]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 通信抓包文件
+
+文件头 MAGIC + <d（抓包开始时的 time.time()），之后是连续的记录：
+
+    <B d H I H  类型, time.monotonic() 时间戳, 端点编号, 数据长度, 上下文长度
+    数据（发送的帧 / 收到的原始TCP数据块 / 端点名称）
+    上下文（JSON，只保存可序列化的字段）
+
+收到的数据按 recv() 返回的原样记录，回放时经过 FrameDecoder 可以复现拆包/粘包。
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+
+from config import get_config
+
+MAGIC = b"SBCAP1\n"
+FILE_HEADER = struct.Struct('<d')
+RECORD_HEADER = struct.Struct('<BdHIH')
+
+KIND_ENDPOINT = 0  # 定义端点编号，数据为 "host:port"
+KIND_SEND = 1
+KIND_RECV = 2
+
+# 只保存这些上下文字段，Future、批量操作对象等运行时对象不写入
+CONTEXT_FIELDS = ("type", "address", "value", "input", "format", "priority", "timeout")
+
+
+def _encode_context(context):
+    if not isinstance(context, dict):
+        return b""
+    fields = {k: context[k] for k in CONTEXT_FIELDS if k in context}
+    return json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode('utf-8') if fields else b""
+
+
+class WireCapture:
+    """抓包写入器（线程安全，多个连接可以共享一个文件）
+
+    未指定文件名时在配置 capture.dir 下按开始时间命名。
+    """
+
+    def __init__(self, filename=None, buffer_size=1024 * 1024):
+        if filename is None:
+            directory = get_config().get('capture.dir', 'captures')
+            filename = os.path.join(directory, time.strftime("session-%Y%m%d-%H%M%S.sbcap"))
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.filename = filename
+        self._file = open(filename, "wb", buffering=buffer_size)
+        self._file.write(MAGIC + FILE_HEADER.pack(time.time()))
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.records = 0
+
+    def record_send(self, endpoint, frame, context=None):
+        self._write(KIND_SEND, endpoint, frame, _encode_context(context))
+
+    def record_recv(self, endpoint, chunk):
+        self._write(KIND_RECV, endpoint, chunk, b"")
+
+    def _write(self, kind, endpoint, data, context):
+        now = time.monotonic()
+        with self._lock:
+            if self._file is None:
+                return
+            endpoint_id = self._endpoints.get(endpoint)
+            if endpoint_id is None:
+                endpoint_id = self._endpoints[endpoint] = len(self._endpoints)
+                name = f"{endpoint[0]}:{endpoint[1]}".encode('utf-8')
+                self._file.write(RECORD_HEADER.pack(KIND_ENDPOINT, now, endpoint_id, len(name), 0) + name)
+            self._file.write(RECORD_HEADER.pack(kind, now, endpoint_id, len(data), len(context)))
+            self._file.write(data)
+            if context:
+                self._file.write(context)
+            self.records += 1
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CaptureRecord:
+    """一条抓包记录"""
+
+    __slots__ = ("kind", "timestamp", "endpoint", "data", "context")
+
+    def __init__(self, kind, timestamp, endpoint, data, context):
+        self.kind = kind
+        self.timestamp = timestamp
+        self.endpoint = endpoint
+        self.data = data
+        self.context = context
+
+
+def read_capture(filename):
+    """逐条读取抓包文件，返回 (开始时间, CaptureRecord 生成器)；末尾不完整的记录被忽略"""
+    f = open(filename, "rb")
+    header = f.read(len(MAGIC) + FILE_HEADER.size)
+    if not header.startswith(MAGIC):
+        f.close()
+        raise ValueError(f"不是有效的抓包文件: {filename}")
+    started_at = FILE_HEADER.unpack_from(header, len(MAGIC))[0]
+
+    def records():
+        endpoints = {}
+        with f:
+            while True:
+                head = f.read(RECORD_HEADER.size)
+                if len(head) < RECORD_HEADER.size:
+                    return
+                kind, timestamp, endpoint_id, data_len, context_len = RECORD_HEADER.unpack(head)
+                data = f.read(data_len)
+                raw_context = f.read(context_len)
+                if len(data) < data_len or len(raw_context) < context_len:
+                    return
+                if kind == KIND_ENDPOINT:
+                    host, _, port = data.decode('utf-8').rpartition(':')
+                    endpoints[endpoint_id] = (host, int(port))
+                    continue
+                context = json.loads(raw_context) if raw_context else None
+                yield CaptureRecord(kind, timestamp, endpoints.get(endpoint_id), data, context)
+
+    return started_at, records()
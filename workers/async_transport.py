@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - asyncio通信引擎
+
+通信逻辑由 core.async_transport.AsyncBoardTransport 实现，所有连接共享一个事件循环线程。
+对外提供与 CommunicationWorker 相同的 add_task / response_received 接口。
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.async_transport import AsyncBoardTransport, AsyncLoopThread
+from core.transport import TransportListener
+
+
+class AsyncCommunicationWorker(QObject, TransportListener):
+    """基于asyncio的通信工作对象
+
+    信号在事件循环线程中发出，Qt会自动以队列方式投递到接收者所在线程。
+    """
+    response_received = pyqtSignal(bytes, object)  # 信号：返回响应和请求上下文
+    request_timeout = pyqtSignal(object)  # 信号：单个请求超时，返回请求上下文
+    request_failed = pyqtSignal(object, str)  # 信号：请求因断线失败，返回请求上下文和原因
+    reconnecting = pyqtSignal(int, float)  # 信号：第几次自动重连、重连前等待秒数
+    connection_error = pyqtSignal(str)  # 信号：连接错误
+    connection_status_changed = pyqtSignal(bool)  # 信号：连接状态改变
+
+    def __init__(self, max_in_flight=None, request_timeout=None, loop_thread=None):
+        super().__init__()
+        self.transport = AsyncBoardTransport(
+            max_in_flight, request_timeout,
+            loop_thread=loop_thread or AsyncLoopThread.instance(), listener=self
+        )
+
+    @property
+    def timeouts(self):
+        return self.transport.timeouts
+
+    @property
+    def backoff(self):
+        return self.transport.backoff
+
+    def connect(self, ip, port):
+        """连接到服务器（阻塞直到连接成功或失败）"""
+        return self.transport.connect(ip, port)
+
+    def disconnect(self):
+        """断开连接"""
+        self.transport.disconnect()
+
+    def is_connected(self):
+        """检查是否已连接"""
+        return self.transport.is_connected()
+
+    def add_task(self, frame, context=None):
+        """添加通信任务（线程安全，立即唤醒发送协程）"""
+        self.transport.add_task(frame, context)
+
+    def set_max_in_flight(self, max_in_flight):
+        """调整在途请求窗口大小"""
+        self.transport.set_max_in_flight(max_in_flight)
+
+    def run(self):
+        """兼容 CommunicationWorker 接口；事件循环由 AsyncLoopThread 驱动"""
+
+    def stop(self):
+        """停止通信"""
+        self.transport.stop()
+
+    # TransportListener 回调，在事件循环线程中调用
+    def on_response(self, frame, context):
+        self.response_received.emit(frame, context)
+
+    def on_timeout(self, context):
+        self.request_timeout.emit(context)
+
+    def on_failed(self, context, reason):
+        self.request_failed.emit(context, reason)
+
+    def on_reconnecting(self, attempt, delay):
+        self.reconnecting.emit(attempt, delay)
+
+    def on_error(self, message):
+        self.connection_error.emit(message)
+
+    def on_status(self, connected):
+        self.connection_status_changed.emit(connected)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 多板连接管理器
+
+按端点 (ip, port) 维护多个并发的转发板连接，每个连接有独立的任务队列和统计信息。
+命令与轮询按 (端点, 设备地址) 路由；启动时并行建立连接。
+
+线程约定：添加、移除转发板和 connect_all 只在界面线程调用；add_task 可以在任意线程
+（如状态轮询线程）调用。各连接的统计信息由轮询线程和界面线程共同写入，统一经
+BoardConnection.count()/set() 在锁内修改。
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from config import get_config
+from workers.communication_worker import CommunicationWorker
+from workers.async_transport import AsyncCommunicationWorker
+
+
+def parse_endpoints(text, default_port):
+    """解析 "ip[:port], ip[:port] ..." 形式的端点列表"""
+    endpoints = []
+    for item in text.replace(';', ',').replace(' ', ',').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, port = item.rpartition(':')
+        if sep:
+            endpoint = (host, int(port))
+        else:
+            endpoint = (item, int(default_port))
+        if endpoint not in endpoints:
+            endpoints.append(endpoint)
+    return endpoints
+
+
+def format_endpoint(endpoint):
+    """端点显示文本，没有端点（如尚无活动转发板）时为 "--" """
+    if not endpoint:
+        return "--"
+    return f"{endpoint[0]}:{endpoint[1]}"
+
+
+class BoardConnection:
+    """单个转发板连接：通信对象、所在线程和统计信息"""
+
+    def __init__(self, endpoint, worker, thread=None):
+        self.endpoint = endpoint
+        self.worker = worker
+        self.thread = thread
+        self._lock = threading.Lock()
+        self.stats = {
+            "sent": 0,
+            "received": 0,
+            "unsolicited": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "failed": 0,
+            "reconnect_attempts": 0,
+            "connected_at": None,
+            "last_response_at": None,
+        }
+
+    def is_connected(self):
+        return self.worker.is_connected()
+
+    def add_task(self, frame, context=None):
+        self.count("sent")
+        self.worker.add_task(frame, context)
+
+    def count(self, name, n=1):
+        """统计项加 n（线程安全）"""
+        with self._lock:
+            self.stats[name] += n
+
+    def set(self, name, value):
+        """设置统计项（线程安全）"""
+        with self._lock:
+            self.stats[name] = value
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["srtt"] = self.worker.timeouts.srtt
+        return stats
+
+
+class ConnectionManager(QObject):
+    """管理多个转发板连接"""
+    response_received = pyqtSignal(object, bytes, object)  # 信号：端点、响应、请求上下文
+    request_timeout = pyqtSignal(object, object)  # 信号：端点、请求上下文
+    request_failed = pyqtSignal(object, object, str)  # 信号：端点、请求上下文、失败原因
+    reconnecting = pyqtSignal(object, int, float)  # 信号：端点、重连次数、等待秒数
+    connection_error = pyqtSignal(object, str)  # 信号：端点、错误信息
+    connection_status_changed = pyqtSignal(object, bool)  # 信号：端点、连接状态
+
+    def __init__(self, engine=None):
+        super().__init__()
+        self.engine = engine or get_config().engine
+        self.boards = {}  # endpoint -> BoardConnection，保持添加顺序
+        self.active_endpoint = None  # UI中单设备操作的目标端点
+        self.capture = None  # 所有连接共享的 WireCapture
+
+    def add_board(self, ip, port):
+        """添加一个转发板（不建立连接），已存在时直接返回"""
+        endpoint = (ip, int(port))
+        if endpoint in self.boards:
+            return self.boards[endpoint]
+
+        if self.engine == "asyncio":
+            board = BoardConnection(endpoint, AsyncCommunicationWorker())
+        else:
+            worker = CommunicationWorker()
+            thread = QThread()
+            worker.moveToThread(thread)
+            thread.started.connect(worker.run)
+            board = BoardConnection(endpoint, worker, thread)
+
+        worker = board.worker
+        worker.transport.capture = self.capture
+        worker.response_received.connect(partial(self._on_response, endpoint))
+        worker.request_timeout.connect(partial(self._on_timeout, endpoint))
+        worker.request_failed.connect(partial(self._on_failed, endpoint))
+        worker.reconnecting.connect(partial(self._on_reconnecting, endpoint))
+        worker.connection_error.connect(partial(self._on_error, endpoint))
+        worker.connection_status_changed.connect(partial(self._on_status, endpoint))
+
+        if board.thread is not None:
+            board.thread.start()
+
+        self.boards[endpoint] = board
+        if self.active_endpoint is None:
+            self.active_endpoint = endpoint
+        return board
+
+    def remove_board(self, endpoint):
+        """断开并移除一个转发板"""
+        board = self.boards.pop(endpoint, None)
+        if board is None:
+            return
+        self._shutdown(board)
+        if self.active_endpoint == endpoint:
+            self.active_endpoint = next(iter(self.boards), None)
+
+    def set_active(self, endpoint):
+        self.active_endpoint = endpoint
+
+    def set_capture(self, capture):
+        """开始（capture 为 WireCapture）或停止（None）记录所有连接的收发数据"""
+        self.capture = capture
+        for board in self.boards.values():
+            board.worker.transport.capture = capture
+
+    def board(self, endpoint=None):
+        """获取端点对应的连接，默认返回当前活动端点"""
+        return self.boards.get(endpoint if endpoint is not None else self.active_endpoint)
+
+    def endpoints(self):
+        return list(self.boards)
+
+    def connected_endpoints(self):
+        return [ep for ep, board in list(self.boards.items()) if board.is_connected()]
+
+    def connect_all(self, endpoints=None):
+        """并行连接多个转发板，总耗时约等于最慢的一个而不是逐个累加
+
+        指定 endpoints 时，不在列表中的已有转发板会被断开并移除。只在界面线程调用：
+        每个连接的 connect() 在线程池中各由一个线程调用，transport.connect 本身是线程安全的，
+        连接结果通过 Qt 信号回到界面线程。返回 {endpoint: bool}
+        """
+        if endpoints is not None:
+            endpoints = [(ip, int(port)) for ip, port in endpoints]
+            for endpoint in [ep for ep in self.boards if ep not in endpoints]:
+                self.remove_board(endpoint)
+        else:
+            endpoints = self.endpoints()
+        workers = [self.add_board(ip, port).worker for ip, port in endpoints]
+        if not endpoints:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(32, len(endpoints))) as pool:
+            results = pool.map(lambda item: item[0].connect(*item[1]), zip(workers, endpoints))
+            return dict(zip(endpoints, results))
+
+    def disconnect_all(self):
+        for board in self.boards.values():
+            board.worker.disconnect()
+
+    def is_connected(self, endpoint=None):
+        board = self.board(endpoint)
+        return board is not None and board.is_connected()
+
+    def add_task(self, frame, context=None, endpoint=None):
+        """把任务路由到指定端点（默认活动端点）的队列"""
+        board = self.board(endpoint)
+        if board is None:
+            self.connection_error.emit(endpoint, "未知的转发板端点")
+            self.request_failed.emit(endpoint, context, "未知的转发板端点")
+            return
+        board.add_task(frame, context)
+
+    def stats(self, endpoint=None):
+        """获取统计信息（含平滑往返时间 srtt，秒），未指定端点时返回所有端点"""
+        if endpoint is not None:
+            return self.boards[endpoint].snapshot()
+        return {ep: board.snapshot() for ep, board in self.boards.items()}
+
+    def stop(self):
+        """停止所有连接和线程"""
+        for board in self.boards.values():
+            self._shutdown(board)
+
+    def _shutdown(self, board):
+        board.worker.stop()
+        if board.thread is not None:
+            board.thread.quit()
+            board.thread.wait()
+
+    def _on_response(self, endpoint, response, context):
+        board = self.boards.get(endpoint)
+        if board is not None:
+            board.count("received" if context is not None else "unsolicited")
+            board.set("last_response_at", time.time())
+        self.response_received.emit(endpoint, response, context)
+
+    def _on_timeout(self, endpoint, context):
+        board = self.boards.get(endpoint)
+        if board is not None:
+            board.count("timeouts")
+        self.request_timeout.emit(endpoint, context)
+
+    def _on_failed(self, endpoint, context, reason):
+        board = self.boards.get(endpoint)
+        if board is not None:
+            board.count("failed")
+        self.request_failed.emit(endpoint, context, reason)
+
+    def _on_reconnecting(self, endpoint, attempt, delay):
+        board = self.boards.get(endpoint)
+        if board is not None:
+            board.count("reconnect_attempts")
+        self.reconnecting.emit(endpoint, attempt, delay)
+
+    def _on_error(self, endpoint, message):
+        board = self.boards.get(endpoint)
+        if board is not None:
+            board.count("errors")
+        self.connection_error.emit(endpoint, message)
+
+    def _on_status(self, endpoint, connected):
+        board = self.boards.get(endpoint)
+        if board is not None:
+            board.set("connected_at", time.time() if connected else None)
+        self.connection_status_changed.emit(endpoint, connected)
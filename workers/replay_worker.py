@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+串口转发板控制系统 - 抓包回放工作线程类
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.replay import CaptureReplay, ReplayListener
+
+
+class ReplayWorker(QObject, ReplayListener):
+    """在工作线程中回放抓包文件，把解码出的响应按原始时间轴以信号发出
+
+    回放逻辑由 core.replay.CaptureReplay 实现，response_received 与
+    ConnectionManager.response_received 参数相同，可直接接到主窗口的响应处理。
+    """
+    response_received = pyqtSignal(object, bytes, object)  # 信号：端点、响应、请求上下文
+    finished = pyqtSignal(dict)  # 信号：回放结束，返回统计信息
+    error = pyqtSignal(str)  # 信号：回放失败
+
+    def __init__(self, filename, speed=1.0):
+        super().__init__()
+        self.replay = CaptureReplay(filename, speed, listener=self)
+
+    def run(self):
+        """工作线程主函数"""
+        try:
+            stats = self.replay.run()
+        except (OSError, ValueError) as e:
+            self.error.emit(str(e))
+            return
+        self.finished.emit(stats)
+
+    def stop(self):
+        self.replay.stop()
+
+    # ReplayListener 回调，在工作线程中调用
+    def on_response(self, endpoint, frame, context, rtt):
+        self.response_received.emit(endpoint, frame, context)